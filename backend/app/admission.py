@@ -0,0 +1,234 @@
+"""
+Admission control: per-lane concurrency limits with fast 503s.
+
+Every request is sorted into a *lane* before routing. Each lane admits a
+limited number of requests at a time; a few more may wait briefly in a
+bounded queue, and anything beyond that is answered at once with
+``503 Service Unavailable`` and ``Retry-After`` instead of piling onto the
+threadpool and the database. ``/health`` and ``/metrics`` are never
+limited, and cheap reads have their own lane, so expensive work (bcrypt in
+login and register, deep feed pages) cannot crowd them out.
+
+Limits adapt to observed latency (AIMD): a lane whose requests complete
+slower than its target shrinks its limit by 10%, at most once per target
+interval, and grows it back by one slot per limit's worth of fast
+completions while it is actually busy.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Mapping, Optional
+from urllib.parse import parse_qsl
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.observability.metrics import MetricFamily, registry
+
+
+# Never limited: health checks must answer while the service sheds load
+EXEMPT_PATHS = frozenset({"/health", "/metrics"})
+AUTH_PATHS = frozenset({"/auth/login", "/auth/register"})
+FEED_PATHS = frozenset({"/feed", "/likes/feed"})
+
+_BACKOFF = 0.9
+
+admission_rejected = registry.counter(
+    "admission_rejected",
+    "Requests answered with 503 by admission control",
+    ("lane", "reason"),
+)
+
+
+@dataclass(frozen=True)
+class LanePolicy:
+    """Concurrency limit, wait queue and latency target of one lane."""
+    max_limit: int
+    target_latency: float
+    min_limit: int = 1
+    queue_size: int = 16
+    queue_timeout: float = 1.0
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit between ``min_limit`` and ``max_limit``.
+
+    Starts at ``max_limit``. ``observe`` feeds it one completed request.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, target_latency: float) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self._limit = float(max_limit)
+        self._next_decrease = 0.0
+
+    @property
+    def current(self) -> int:
+        return int(self._limit)
+
+    def observe(self, latency: float, in_flight: int, now: Optional[float] = None) -> None:
+        """Adjust the limit after a request that took ``latency`` with ``in_flight`` others running."""
+        now = time.monotonic() if now is None else now
+        if latency > self.target_latency:
+            # Requests admitted under the old limit finish slow too; count them as one signal
+            if now >= self._next_decrease:
+                self._limit = max(float(self.min_limit), self._limit * _BACKOFF)
+                self._next_decrease = now + self.target_latency
+        elif in_flight * 2 >= self._limit:
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+
+class Lane:
+    """Admits requests up to its adaptive limit; waiters are served in order."""
+
+    def __init__(self, name: str, policy: LanePolicy) -> None:
+        self.name = name
+        self.policy = policy
+        self.limit = AdaptiveLimit(policy.min_limit, policy.max_limit, policy.target_latency)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; return None once admitted, or why the request was rejected."""
+        if self.in_flight < self.limit.current and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.policy.queue_size:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait((waiter,), timeout=self.policy.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        if waiter.done():
+            # release() handed its slot over, possibly just as the wait timed out
+            return None
+        self._waiters.remove(waiter)
+        return "timeout"
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """Free a slot, feeding the request's latency to the limit, and admit waiters."""
+        if latency is not None:
+            self.limit.observe(latency, self.in_flight)
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.limit.current:
+            self._waiters.popleft().set_result(None)
+            self.in_flight += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit.current,
+            "max_limit": self.policy.max_limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "target_latency_ms": self.policy.target_latency * 1000,
+        }
+
+
+def classify(scope: Scope, deep_feed_page: int) -> Optional[str]:
+    """Return the lane for a request, or None for requests that are never limited."""
+    path = scope["path"]
+    method = scope["method"]
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    if path in AUTH_PATHS and method == "POST":
+        return "auth"
+    if method in ("GET", "HEAD"):
+        if path in FEED_PATHS:
+            query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            try:
+                page = int(query.get("page", 1))
+            except ValueError:
+                page = 1
+            if page > deep_feed_page:
+                return "deep_feed"
+        return "read"
+    return "write"
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that limits concurrent requests per lane.
+
+    Lanes are ``read``, ``write``, ``auth`` and ``deep_feed`` (feed pages
+    past ``deep_feed_page``); ``policies`` configures each. Rejected
+    requests get a 503 with ``Retry-After`` without reaching the app.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        policies: Mapping[str, LanePolicy],
+        deep_feed_page: int = 10,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.deep_feed_page = deep_feed_page
+        self.retry_after = retry_after
+        self.lanes = {name: Lane(name, policy) for name, policy in policies.items()}
+        admission_lanes.clear()
+        admission_lanes.update(self.lanes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        lane = self.lanes.get(classify(scope, self.deep_feed_page))
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await lane.acquire()
+        if rejected is not None:
+            admission_rejected.inc(lane=lane.name, reason=rejected)
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release(time.perf_counter() - started)
+
+
+# Lanes of the installed middleware, by name, for metrics and /admin/admission
+admission_lanes: Dict[str, Lane] = {}
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the limit, load and queue of every lane."""
+    return {name: lane.stats() for name, lane in admission_lanes.items()}
+
+
+def _collect_lanes() -> List[MetricFamily]:
+    limits = MetricFamily("admission_limit", "gauge", "Current concurrency limit of each admission lane")
+    in_flight = MetricFamily("admission_in_flight", "gauge", "Requests admitted and running, by lane")
+    queued = MetricFamily("admission_queued", "gauge", "Requests waiting for a slot, by lane")
+    for name, lane in admission_lanes.items():
+        labels = {"lane": name}
+        limits.samples.append(("admission_limit", labels, float(lane.limit.current)))
+        in_flight.samples.append(("admission_in_flight", labels, float(lane.in_flight)))
+        queued.samples.append(("admission_queued", labels, float(lane.queued)))
+    return [limits, in_flight, queued]
+
+
+registry.add_collector(_collect_lanes)
@@ -1,5 +1,6 @@
 """API routes package."""
 
+from app.api.admin import router as admin_router
 from app.api.auth import router as auth_router
 from app.api.profile import router as profile_router
 from app.api.like import router as like_router
@@ -7,6 +8,7 @@ from app.api.settings import router as settings_router
 from app.api.feed import router as feed_router
 
 __all__ = [
+    "admin_router",
     "auth_router",
     "profile_router",
     "like_router",
@@ -0,0 +1,235 @@
+"""Admin router exposing runtime diagnostics (requires ADMIN_TOKEN)."""
+
+import secrets
+from typing import Annotated, Any, Dict, List, Literal, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.admission import admission_stats
+from app.cache import registered_caches
+from app.cache.shared import host_cache
+from app.compression import compression_report
+from app.config import settings
+from app.db.session import engine
+from app.observability.context import get_route_stats
+from app.observability import loop_lag, memory, slow_queries, tracing
+from app.observability.pool import pool_status
+from app.observability.profiler import Profile, profiler
+from app.observability.tracing import TracedRoute
+from app.schemas.auth import MessageResponse
+
+
+def require_admin(
+    x_admin_token: Annotated[Union[str, None], Header()] = None,
+) -> None:
+    """Allow the request only if it carries the configured admin token."""
+    if not settings.admin_token:
+        # Diagnostics are switched off entirely unless a token is configured
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token",
+        )
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)], route_class=TracedRoute)
+
+
+@router.get("/db/pool")
+async def get_pool_stats() -> Dict[str, Any]:
+    """Return pool occupancy, checkout totals and per-route checkout counts."""
+    return {
+        "pool": pool_status(engine),
+        "routes": get_route_stats(),
+    }
+
+
+@router.get("/caches")
+async def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the size, hit counters and hit rate of every registered cache."""
+    stats = {}
+    for name, cache in registered_caches().items():
+        hits = getattr(cache, "hits", None)
+        misses = getattr(cache, "misses", None)
+        lookups = (hits or 0) + (misses or 0)
+        stats[name] = {
+            "size": len(cache),
+            "bytes": getattr(cache, "total_bytes", None),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if hits is not None and lookups else None,
+        }
+    return stats
+
+
+@router.get("/caches/host")
+async def get_host_cache_stats() -> Dict[str, Any]:
+    """Return the age, contents and hit counters of the shared-memory host cache."""
+    return host_cache.stats()
+
+
+@router.get("/admission")
+async def get_admission_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the current limit, running and queued requests of every admission lane."""
+    return admission_stats()
+
+
+@router.get("/compression")
+async def get_compression_stats() -> List[Dict[str, Any]]:
+    """Return compression CPU time against bytes saved, per route and coding."""
+    return compression_report()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = 50) -> List[Dict[str, Any]]:
+    """Return slow-query fingerprints ordered by total time, with captured plans."""
+    if slow_queries.recorder is None:
+        return []
+    return slow_queries.recorder.entries()[:limit]
+
+
+@router.delete("/slow-queries", response_model=MessageResponse)
+async def reset_slow_queries() -> MessageResponse:
+    """Forget all recorded slow queries."""
+    if slow_queries.recorder is not None:
+        slow_queries.recorder.clear()
+    return MessageResponse(message="Slow-query log cleared")
+
+
+@router.get("/loop-lag")
+async def get_loop_lag() -> Dict[str, Any]:
+    """Return recent event-loop lag quantiles and the stalls that exceeded the threshold."""
+    monitor = loop_lag.monitor
+    if monitor is None:
+        return {"enabled": False, "quantiles_ms": {}, "stalls": []}
+    return {
+        "enabled": True,
+        "threshold_ms": monitor.threshold * 1000,
+        "quantiles_ms": {str(q): round(v * 1000, 3) for q, v in monitor.quantiles().items()},
+        "stalls": monitor.stalls(),
+    }
+
+
+@router.get("/traces")
+async def list_traces(
+    limit: Annotated[int, Query(ge=1, le=1000)] = 50,
+    min_ms: Annotated[float, Query(ge=0)] = 0.0,
+    route: Union[str, None] = None,
+) -> List[Dict[str, Any]]:
+    """List kept traces, newest first, optionally only slow ones or one route."""
+    if tracing.store is None:
+        return []
+    return [trace.summary() for trace in tracing.store.recent(limit, min_ms / 1000, route)]
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str) -> Dict[str, Any]:
+    """Return one trace with its spans ordered by start time."""
+    trace = tracing.store.get(trace_id) if tracing.store is not None else None
+    if trace is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found")
+    return trace.as_dict()
+
+
+def _get_profile(profile_id: int) -> Profile:
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiler")
+async def list_profiles() -> List[Dict[str, Any]]:
+    """List running and recently finished profiles."""
+    return profiler.profiles()
+
+
+@router.post("/profiler/start")
+async def start_profile(
+    seconds: Annotated[float, Query(gt=0)] = 30.0,
+) -> Dict[str, Any]:
+    """Sample every thread of this worker for ``seconds``."""
+    if seconds > settings.profiler_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profiles are limited to {settings.profiler_max_seconds:g} seconds",
+        )
+    return profiler.start(f"worker sample ({seconds:g}s)", seconds=seconds).summary()
+
+
+@router.post("/profiler/{profile_id}/stop")
+async def stop_profile(profile_id: int) -> Dict[str, Any]:
+    """Stop a running profile early."""
+    return profiler.stop(_get_profile(profile_id)).summary()
+
+
+@router.get("/profiler/{profile_id}", response_model=None)
+async def get_profile(
+    profile_id: int,
+    format: Literal["collapsed", "speedscope"] = "collapsed",
+) -> Union[PlainTextResponse, Dict[str, Any]]:
+    """
+    Return a profile as collapsed stacks (for flamegraph.pl / inferno)
+    or as a speedscope JSON document.
+    """
+    profile = _get_profile(profile_id)
+    if format == "speedscope":
+        return profile.speedscope()
+    return PlainTextResponse(profile.collapsed())
+
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+@router.get("/memory")
+def get_memory_report(types: Annotated[int, Query(ge=0, le=200)] = 20) -> Dict[str, Any]:
+    """Return RSS, tracemalloc state, gc counts, ORM session sizes and the largest object types."""
+    return memory.memory_report(types_limit=types)
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(frames: Annotated[int, Query(ge=1, le=50)] = 1) -> Dict[str, Any]:
+    """Start tracing allocations; more frames cost more memory and CPU."""
+    return memory.start_tracing(frames)
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc() -> Dict[str, Any]:
+    """Stop tracing allocations and discard stored snapshots."""
+    return memory.stop_tracing()
+
+
+@router.post("/memory/snapshots/{name}")
+def take_memory_snapshot(
+    name: str,
+    limit: Annotated[int, Query(ge=0, le=500)] = 20,
+    group_by: GroupBy = "lineno",
+) -> Dict[str, Any]:
+    """Store a tracemalloc snapshot under ``name`` and return its top allocation sites."""
+    try:
+        return memory.take_snapshot(name, limit=limit, group_by=group_by)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+@router.get("/memory/diff")
+def diff_memory_snapshots(
+    before: str,
+    after: str,
+    limit: Annotated[int, Query(ge=0, le=500)] = 20,
+    group_by: GroupBy = "lineno",
+) -> Dict[str, Any]:
+    """Return the allocation sites that grew the most between two snapshots."""
+    try:
+        return memory.diff_snapshots(before, after, limit=limit, group_by=group_by)
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {exc} not found")
+
+
+@router.delete("/memory/snapshots", response_model=MessageResponse)
+async def clear_memory_snapshots() -> MessageResponse:
+    """Discard stored snapshots."""
+    memory.clear_snapshots()
+    return MessageResponse(message="Memory snapshots cleared")
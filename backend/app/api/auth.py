@@ -1,8 +1,9 @@
 """Authentication router for handling user registration, login, logout, and profile."""
 
+import math
 from typing import Annotated, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, Cookie
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
@@ -13,9 +14,12 @@ from app.auth import (
     revoke_token,
     verify_token,
 )
+from app.config import settings
 from app.db.session import get_db
 from app.models.user import User
 from app.models.profile import Profile
+from app.observability.tracing import TracedRoute, traced
+from app.ratelimit import login_throttle
 from app.schemas.auth import (
     AuthResponse,
     AuthUser,
@@ -24,7 +28,7 @@ from app.schemas.auth import (
     RegisterRequest,
 )
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TracedRoute)
 security = HTTPBearer()
 
 
@@ -63,6 +67,7 @@ def get_current_user_from_cookie(
     return user
 
 
+@traced()
 def get_current_user(
     token: Annotated[Union[str, None], Cookie()] = None,
     credentials: Annotated[Union[HTTPAuthorizationCredentials, None], Depends(security)] = None,
@@ -93,8 +98,10 @@ def get_current_user(
     return user
 
 
+# Plain functions, so bcrypt runs in the threadpool instead of stalling the
+# event loop; admission control bounds how many run at once
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def register(
+def register(
     user_data: RegisterRequest,
     db: Session = Depends(get_db),
 ) -> AuthResponse:
@@ -148,11 +155,24 @@ async def register(
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(
+def login(
     user_data: LoginRequest,
+    request: Request,
     db: Session = Depends(get_db),
 ) -> AuthResponse:
     """Authenticate user and return access token."""
+    address = request.client.host if request.client else "unknown"
+    if settings.login_throttle_enabled:
+        # Reserved before the user lookup and bcrypt, so guessing costs us
+        # nothing once the budget is spent, however many guesses run at once
+        retry_after = login_throttle.reserve(user_data.email, address)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+    
     user = authenticate_user(db, user_data.email, user_data.password)
     
     if user is None:
@@ -160,6 +180,8 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+    if settings.login_throttle_enabled:
+        login_throttle.succeeded(user_data.email, address)
     
     # Create access token
     token = create_access_token(user.id, db)
@@ -0,0 +1,62 @@
+"""Entity tags and the If-None-Match / If-Match checks built on them."""
+
+from typing import Optional
+
+from fastapi import Response, status
+
+
+# Profiles are readable by anyone but change at any time: caches may keep
+# a copy but must revalidate it with the ETag before every use
+PUBLIC_REVALIDATE = "public, no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+# CompressionMiddleware tags compressed representations as "<tag>-<coding>"
+CODING_SUFFIXES = ("-gzip", "-br", "-zstd")
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in CODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def _matches(header: str, etag: str, *, weak: bool) -> bool:
+    current = _opaque(etag)
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if not weak and tag.startswith("W/"):
+            continue
+        if _opaque(tag) == current:
+            return True
+    return False
+
+
+def none_match(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an ``If-None-Match`` header lists ``etag`` (weak comparison)."""
+    return bool(if_none_match) and _matches(if_none_match, etag, weak=True)
+
+
+def precondition_met(if_match: Optional[str], etag: str) -> bool:
+    """Return True if there is no ``If-Match`` header or it lists ``etag`` (strong comparison)."""
+    return not if_match or _matches(if_match, etag, weak=False)
+
+
+def set_validators(response: Response, etag: str, cache_control: str) -> None:
+    """Attach ``ETag`` and ``Cache-Control`` to a full response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Return an empty 304 carrying the validators the client already holds."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -4,27 +4,33 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.api.ratelimit import limit_swipes
+from app.api.responses import EncodedJSONResponse
 from app.db.session import get_db
 from app.models.user import User
+from app.observability.tracing import TracedRoute
 from app.schemas.like import FeedResponse, LikeResponse, MatchesResponse
 from app.schemas.auth import MessageResponse
-from app.services.feed import get_feed, like_profile, get_matches, skip_profile
+from app.services.feed import feed_json, like_profile, matches_json, skip_profile
 
-router = APIRouter(prefix="/feed", tags=["feed"])
+router = APIRouter(prefix="/feed", tags=["feed"], route_class=TracedRoute)
 
 
-@router.get("", response_model=FeedResponse)
-async def fetch_feed(
+# Read endpoints are plain functions, so FastAPI runs them in its threadpool:
+# the database work stays off the event loop, and duplicate requests overlap
+# and can share one computation (see feed_json)
+@router.get("", response_model=FeedResponse, response_class=EncodedJSONResponse)
+def fetch_feed(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-) -> FeedResponse:
+) -> EncodedJSONResponse:
     """Return paginated feed results for the current user."""
-    return get_feed(current_user=current_user, db=db, page=page, size=size)
+    return EncodedJSONResponse(feed_json(current_user=current_user, db=db, page=page, size=size))
 
 
-@router.post("/{target_id}/like", response_model=LikeResponse)
+@router.post("/{target_id}/like", response_model=LikeResponse, dependencies=[Depends(limit_swipes)])
 async def like_from_feed(
     target_id: int,
     current_user: User = Depends(get_current_user),
@@ -34,7 +40,7 @@ async def like_from_feed(
     return like_profile(target_id=target_id, current_user=current_user, db=db)
 
 
-@router.post("/{target_id}/skip", response_model=MessageResponse)
+@router.post("/{target_id}/skip", response_model=MessageResponse, dependencies=[Depends(limit_swipes)])
 async def skip_from_feed(
     target_id: int,
     current_user: User = Depends(get_current_user),
@@ -44,10 +50,10 @@ async def skip_from_feed(
     return skip_profile(target_id=target_id, current_user=current_user, db=db)
 
 
-@router.get("/matches", response_model=MatchesResponse)
-async def list_matches(
+@router.get("/matches", response_model=MatchesResponse, response_class=EncodedJSONResponse)
+def list_matches(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> MatchesResponse:
+) -> EncodedJSONResponse:
     """Return mutual matches for the current user."""
-    return get_matches(current_user=current_user, db=db)
+    return EncodedJSONResponse(matches_json(current_user=current_user, db=db))
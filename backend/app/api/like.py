@@ -4,30 +4,33 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.api.ratelimit import limit_swipes
+from app.api.responses import EncodedJSONResponse
 from app.db.session import get_db
 from app.models.user import User
+from app.observability.tracing import TracedRoute
 from app.schemas.like import FeedResponse, LikeResponse, MatchesResponse
 from app.services.feed import (
-    get_feed as fetch_feed,
+    feed_json,
     like_profile as perform_like,
-    get_matches as fetch_matches,
+    matches_json,
 )
 
-router = APIRouter(prefix="/likes", tags=["likes"])
+router = APIRouter(prefix="/likes", tags=["likes"], route_class=TracedRoute)
 
 
-@router.get("/feed", response_model=FeedResponse)
-async def get_feed(
+@router.get("/feed", response_model=FeedResponse, response_class=EncodedJSONResponse)
+def get_feed(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-) -> FeedResponse:
+) -> EncodedJSONResponse:
     """Get paginated feed of active profiles (excluding current user)."""
-    return fetch_feed(current_user=current_user, db=db, page=page, size=size)
+    return EncodedJSONResponse(feed_json(current_user=current_user, db=db, page=page, size=size))
 
 
-@router.post("/{target_id}", response_model=LikeResponse)
+@router.post("/{target_id}", response_model=LikeResponse, dependencies=[Depends(limit_swipes)])
 async def create_like(
     target_id: int,
     current_user: User = Depends(get_current_user),
@@ -37,10 +40,10 @@ async def create_like(
     return perform_like(target_id=target_id, current_user=current_user, db=db)
 
 
-@router.get("/matches", response_model=MatchesResponse)
-async def get_matches(
+@router.get("/matches", response_model=MatchesResponse, response_class=EncodedJSONResponse)
+def get_matches(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> MatchesResponse:
+) -> EncodedJSONResponse:
     """Get list of mutual matches with minimal profile info."""
-    return fetch_matches(current_user=current_user, db=db)
+    return EncodedJSONResponse(matches_json(current_user=current_user, db=db))
@@ -1,9 +1,11 @@
 """Profile router for handling user profile management."""
 
+from datetime import datetime
 from typing import Annotated, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, Cookie
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.auth import verify_token
@@ -11,22 +13,45 @@ from app.db.session import get_db
 from app.models.user import User
 from app.models.profile import Profile
 from app.api.auth import get_current_user
+from app.api.etags import (
+    PRIVATE_REVALIDATE,
+    PUBLIC_REVALIDATE,
+    none_match,
+    not_modified,
+    precondition_met,
+    set_validators,
+)
+from app.observability.tracing import TracedRoute
 from app.schemas.profile import (
     ProfileResponse,
     ProfileUpdate,
     ProfilePublicResponse,
 )
+from app.services.profiles import (
+    get_profile,
+    get_profile_version,
+    profile_changed,
+    profile_etag,
+    publish_profile_change,
+)
 
-router = APIRouter(prefix="/profile", tags=["profile"])
+router = APIRouter(prefix="/profile", tags=["profile"], route_class=TracedRoute)
 
 
 @router.get("/me", response_model=ProfileResponse)
-async def get_current_user_profile(
+def get_current_user_profile(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    if_none_match: Annotated[Union[str, None], Header()] = None,
 ) -> ProfileResponse:
-    """Get current authenticated user's profile."""
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    """Get current authenticated user's profile (answers If-None-Match with 304)."""
+    if if_none_match:
+        version = get_profile_version(db, current_user.id)
+        if version is not None and none_match(if_none_match, version.etag):
+            return not_modified(version.etag, PRIVATE_REVALIDATE)
+    
+    profile = get_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -34,16 +59,24 @@ async def get_current_user_profile(
             detail="Profile not found"
         )
     
+    set_validators(response, profile_etag(profile.id, profile.updated_at), PRIVATE_REVALIDATE)
     return ProfileResponse.model_validate(profile)
 
 
 @router.put("/me", response_model=ProfileResponse)
-async def update_current_user_profile(
+def update_current_user_profile(
     profile_update: ProfileUpdate,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    if_match: Annotated[Union[str, None], Header()] = None,
 ) -> ProfileResponse:
-    """Update current authenticated user's profile (partial updates supported)."""
+    """
+    Update current authenticated user's profile (partial updates supported).
+    
+    With ``If-Match``, the update is applied only if the profile still has
+    that ETag; otherwise 412 is returned and nothing changes.
+    """
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
     
     if not profile:
@@ -52,33 +85,57 @@ async def update_current_user_profile(
             detail="Profile not found"
         )
     
-    # Update only provided fields
+    precondition_failed = HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Profile was modified since it was read"
+    )
+    if not precondition_met(if_match, profile_etag(profile.id, profile.updated_at)):
+        raise precondition_failed
+    
+    # Update only provided fields. With If-Match the row must still be the
+    # version checked above, so of two writers holding one ETag only the
+    # first to commit gets through.
     update_data = profile_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(profile, field, value)
+    statement = update(Profile).where(Profile.id == profile.id)
+    if if_match:
+        statement = statement.where(Profile.updated_at == profile.updated_at)
+    result = db.execute(
+        statement.values(**update_data, updated_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False},
+    )
+    if result.rowcount == 0:
+        db.rollback()
+        raise precondition_failed
     
-    db.add(profile)
+    publish_profile_change(db, profile)
     db.commit()
     db.refresh(profile)
+    profile_changed(profile)
     
+    set_validators(response, profile_etag(profile.id, profile.updated_at), PRIVATE_REVALIDATE)
     return ProfileResponse.model_validate(profile)
 
 
 @router.get("/profiles/{user_id}", response_model=ProfilePublicResponse)
-async def get_public_profile(
+def get_public_profile(
     user_id: int,
+    response: Response,
     db: Session = Depends(get_db),
+    if_none_match: Annotated[Union[str, None], Header()] = None,
 ) -> ProfilePublicResponse:
     """Get public profile of a user (limited fields, excludes inactive profiles)."""
-    profile = db.query(Profile).filter(
-        Profile.user_id == user_id,
-        Profile.is_active == True
-    ).first()
+    if if_none_match:
+        version = get_profile_version(db, user_id)
+        if version is not None and version.is_active and none_match(if_none_match, version.etag):
+            return not_modified(version.etag, PUBLIC_REVALIDATE)
     
-    if not profile:
+    profile = get_profile(db, user_id)
+    
+    if not profile or not profile.is_active:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
     
+    set_validators(response, profile_etag(profile.id, profile.updated_at), PUBLIC_REVALIDATE)
     return ProfilePublicResponse.model_validate(profile)
@@ -0,0 +1,48 @@
+"""Per-user swipe quota enforced on the like and skip routes."""
+
+import math
+from typing import AsyncIterator, Dict
+
+from fastapi import Depends, HTTPException, Response, status
+
+from app.api.auth import get_current_user
+from app.config import settings
+from app.models.user import User
+from app.ratelimit import Decision, swipe_limiter
+
+
+# Sent on every limited route, so clients can pace themselves before a 429
+RATE_LIMIT_HEADERS = ("X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset")
+
+
+def _headers(decision: Decision) -> Dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(decision.limit),
+        "X-RateLimit-Remaining": str(decision.remaining),
+        "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+    }
+
+
+async def limit_swipes(response: Response, current_user: User = Depends(get_current_user)) -> AsyncIterator[None]:
+    """
+    Count a swipe against the caller's quota, or answer 429 with ``Retry-After``.
+
+    A swipe the route then rejects (inactive target, self-swipe, failed
+    write) is refunded, and only successful swipes carry the quota headers.
+    """
+    if not settings.swipe_limit_enabled:
+        yield
+        return
+    decision = swipe_limiter.check(current_user.id)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many swipes, slow down",
+            headers={**_headers(decision), "Retry-After": str(math.ceil(decision.retry_after))},
+        )
+    response.headers.update(_headers(decision))
+    try:
+        yield
+    except Exception:
+        swipe_limiter.refund(current_user.id)
+        raise
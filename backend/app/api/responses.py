@@ -0,0 +1,16 @@
+"""Response classes for payloads the service layer has already shaped."""
+
+from fastapi.responses import Response
+
+
+class EncodedJSONResponse(Response):
+    """
+    Response for a body that is already encoded JSON bytes.
+
+    Used for bodies spliced together from cached fragments (see
+    ``app.services.feed.feed_json``). Returning a response object skips
+    FastAPI's ``response_model`` validation and serialization; keep
+    ``response_model`` on the route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
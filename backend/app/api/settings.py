@@ -9,9 +9,11 @@ from app.api.auth import get_current_user
 from app.db.session import get_db
 from app.models.user import User
 from app.models.profile import Profile
+from app.observability.tracing import TracedRoute
 from app.schemas.like import CloseProfileResponse
+from app.services.profiles import profile_changed, publish_profile_change
 
-router = APIRouter(prefix="/settings", tags=["settings"])
+router = APIRouter(prefix="/settings", tags=["settings"], route_class=TracedRoute)
 
 
 @router.post("/close-profile", response_model=CloseProfileResponse)
@@ -34,8 +36,10 @@ async def close_profile(
     
     try:
         db.add(profile)
+        publish_profile_change(db, profile)
         db.commit()
         db.refresh(profile)
+        profile_changed(profile)
         
     except Exception as e:
         db.rollback()
@@ -71,8 +75,10 @@ async def reopen_profile(
     
     try:
         db.add(profile)
+        publish_profile_change(db, profile)
         db.commit()
         db.refresh(profile)
+        profile_changed(profile)
         
     except Exception as e:
         db.rollback()
@@ -1,29 +1,70 @@
 """Authentication utilities for password hashing and token management."""
 
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.cache import TTLCache, register_cache
+from app.cache.bus import publish, subscribe
+from app.cache.shared import host_cache
+from app.cache.singleflight import SingleFlight
 from app.config import settings
 from app.models.user import User
 from app.models.session import Session as SessionModel
+from app.observability.context import current_request
+from app.observability.instruments import time_bcrypt
+from app.observability.tracing import traced
 
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Validated sessions keyed by token digest, so repeat requests skip the database
+session_cache: TTLCache[bytes, User] = register_cache(
+    "sessions",
+    TTLCache(max_size=settings.session_cache_size, ttl=settings.session_cache_ttl_seconds),
+)
+# Concurrent misses for one token share a single validation
+session_loads = SingleFlight("session_load")
+# Invalidation topic for revoked sessions, keyed by hex token digest
+SESSION_TOPIC = "session"
+# Digests revoked since the host cache snapshot was built, which may still
+# list them. Entries outlive any snapshot the host cache would accept. Not
+# registered: clearing it would let those snapshots revive the sessions.
+revoked_sessions: TTLCache[bytes, bool] = TTLCache(
+    max_size=settings.session_cache_size, ttl=settings.host_cache_max_age + settings.host_cache_interval
+)
+
+
+def _token_digest(token: str) -> bytes:
+    """Return the cache key for a session token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _detached_user(user: User) -> User:
+    """Copy a loaded user into a detached instance safe to share across sessions."""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with time_bcrypt("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    with time_bcrypt("hash"):
+        return pwd_context.hash(password)
 
 
 def create_access_token(user_id: int, db: Session) -> str:
@@ -46,8 +87,23 @@ def create_access_token(user_id: int, db: Session) -> str:
     return token
 
 
-def verify_token(token: str, db: Session) -> Optional[User]:
-    """Verify a token and return the associated user if valid."""
+def _note_caller(user: User) -> None:
+    """Attribute the current request to ``user`` for request-level instrumentation."""
+    stats = current_request.get()
+    if stats is not None:
+        stats.user_id = user.id
+
+
+def _load_session(token: str, digest: bytes, db: Session) -> Optional[User]:
+    """Validate a token missing from the session cache and cache its detached user."""
+    shared = host_cache.session(digest)
+    if shared is not None and revoked_sessions.get(digest) is None:
+        user = db.get(User, shared[0])
+        if user is not None:
+            cached_user = _detached_user(user)
+            session_cache.set(digest, cached_user, ttl=shared[1] - time.time())
+            return cached_user
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
         user_id: str = payload.get("sub")
@@ -67,23 +123,68 @@ def verify_token(token: str, db: Session) -> Optional[User]:
     
     # Get user
     user = db.query(User).filter(User.id == int(user_id)).first()
+    if user is None:
+        return None
+    cached_user = _detached_user(user)
+    remaining = (session.expires_at - datetime.utcnow()).total_seconds()
+    session_cache.set(digest, cached_user, ttl=remaining)
+    return cached_user
+
+
+@traced()
+def verify_token(token: str, db: Session) -> Optional[User]:
+    """
+    Verify a token and return the associated (detached) user if valid.
+    
+    Recently validated tokens are answered from the session cache without
+    touching the database. Tokens in the host cache, shared by every
+    worker, skip the session query. Concurrent misses for one token (a
+    burst of requests from a fresh tab) share a single validation.
+    """
+    digest = _token_digest(token)
+    user = session_cache.get(digest)
+    if user is None:
+        user = session_loads.do(digest, lambda: _load_session(token, digest, db))
+    if user is not None:
+        _note_caller(user)
     return user
 
 
 def revoke_token(token: str, db: Session) -> bool:
-    """Revoke a session token."""
+    """Revoke a session token in this worker and, through the invalidation bus, in every other."""
+    digest = _token_digest(token)
+    session_cache.discard(digest)
+    revoked_sessions.set(digest, True)
     session = db.query(SessionModel).filter(SessionModel.token == token).first()
     if session:
         db.delete(session)
+        publish(db, SESSION_TOPIC, digest.hex())
         db.commit()
         return True
     return False
 
 
+def _forget_sessions(keys: list[str]) -> None:
+    for key in keys:
+        digest = bytes.fromhex(key)
+        session_cache.discard(digest)
+        revoked_sessions.set(digest, True)
+
+
+subscribe(SESSION_TOPIC, _forget_sessions)
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return get_password_hash(secrets.token_urlsafe(16))
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password."""
     user = db.query(User).filter(User.email == email).first()
     if not user:
+        # Spend a full verify anyway, so response time does not reveal which emails exist
+        verify_password(password, _dummy_hash())
         return None
     if not verify_password(password, user.hashed_password):
         return None
@@ -0,0 +1,5 @@
+"""In-process caches and the registry used to inspect and reset them."""
+
+from app.cache.lru import Cache, SizedLRUCache, TTLCache, clear_all, register_cache, registered_caches
+
+__all__ = ["Cache", "SizedLRUCache", "TTLCache", "clear_all", "register_cache", "registered_caches"]
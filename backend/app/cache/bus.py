@@ -0,0 +1,170 @@
+"""
+Cross-worker cache invalidation through the ``cache_invalidations`` table.
+
+Writers add an invalidation row in the same transaction as the change it
+describes, so the row commits if and only if the change does. Every
+worker tails the table by id from a background thread and hands the keys
+to the handlers subscribed to each topic. A change made by one worker is
+therefore dropped from every other worker's caches within about one
+poll interval, with no service beyond the database.
+"""
+
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session
+
+from app.cache.lru import clear_all
+from app.models.cache_invalidation import CacheInvalidation
+from app.observability.metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process's own rows, which it has already applied
+ORIGIN = f"{socket.gethostname()[:40]}:{os.getpid()}:{secrets.token_hex(4)}"
+
+# Ids are allocated at insert but become visible at commit, so a lower id
+# can appear after a higher one; missing ids are re-checked this long
+GAP_TIMEOUT = 10.0
+MAX_GAPS = 1000
+
+Handler = Callable[[List[str]], None]
+
+_subscribers: Dict[str, List[Handler]] = {}
+
+invalidations_applied = registry.counter(
+    "cache_invalidations_applied",
+    "Invalidations received from other workers and applied to local caches",
+    ("topic",),
+)
+invalidation_poll_failures = registry.counter(
+    "cache_invalidation_poll_failures",
+    "Failed reads of the cache invalidation table",
+)
+
+
+def subscribe(topic: str, handler: Handler) -> None:
+    """Call ``handler`` with the keys of every invalidation published on ``topic`` by another worker."""
+    handlers = _subscribers.setdefault(topic, [])
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def publish(db: Session, topic: str, key: object) -> None:
+    """
+    Record that ``key`` under ``topic`` is stale for every worker.
+
+    The row joins the session's transaction and is delivered only if the
+    caller commits. Apply the change to this worker's own caches directly.
+    """
+    db.add(CacheInvalidation(topic=topic, key=str(key), origin=ORIGIN))
+
+
+def _dispatch(rows: Iterable[Row]) -> None:
+    keys: Dict[str, List[str]] = {}
+    for row in rows:
+        if row.origin != ORIGIN:
+            keys.setdefault(row.topic, []).append(row.key)
+    for topic, topic_keys in keys.items():
+        for handler in _subscribers.get(topic, ()):
+            try:
+                handler(topic_keys)
+            except Exception:  # pragma: no cover - one bad handler must not stop the others
+                logger.exception("Cache invalidation handler failed for topic %s", topic)
+        invalidations_applied.inc(len(topic_keys), topic=topic)
+
+
+class InvalidationListener:
+    """
+    Background thread tailing ``cache_invalidations`` for one worker.
+
+    Each poll reads rows after the last id seen, plus ids skipped earlier
+    that may still commit. If the table cannot be read for longer than
+    ``max_lag`` seconds, every registered cache is cleared, so cached data
+    is never staler than that bound even while the database is unreachable.
+    Rows older than ``retention`` seconds are pruned.
+    """
+
+    def __init__(self, engine: Engine, *, interval: float, max_lag: float, retention: float) -> None:
+        self.engine = engine
+        self.interval = interval
+        self.max_lag = max_lag
+        self.retention = retention
+        self.last_id = 0
+        self.last_success = time.monotonic()
+        self._gaps: Dict[int, float] = {}
+        self._cleared = False
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with Session(self.engine) as db:
+            self.last_id = db.scalar(select(func.max(CacheInvalidation.id))) or 0
+        self.last_success = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    def tick(self) -> None:
+        """Poll once, clearing every cache if invalidations have been unreadable for too long."""
+        try:
+            self.poll()
+        except Exception:
+            invalidation_poll_failures.inc()
+            if time.monotonic() - self.last_success > self.max_lag and not self._cleared:
+                logger.warning("Cache invalidations unreadable for over %.1fs; clearing caches", self.max_lag)
+                clear_all()
+                self._cleared = True
+
+    def poll(self) -> int:
+        """Read and apply new invalidations once; return how many rows were read."""
+        now = time.monotonic()
+        condition = CacheInvalidation.id > self.last_id
+        if self._gaps:
+            condition = or_(condition, CacheInvalidation.id.in_(list(self._gaps)))
+        with Session(self.engine) as db:
+            rows = db.execute(
+                select(CacheInvalidation.id, CacheInvalidation.topic, CacheInvalidation.key, CacheInvalidation.origin)
+                .where(condition)
+                .order_by(CacheInvalidation.id)
+            ).all()
+            if self.retention and now - self._last_prune > self.retention / 10:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+                db.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff))
+                db.commit()
+                self._last_prune = now
+
+        for row in rows:
+            if self._gaps.pop(row.id, None) is None and row.id > self.last_id:
+                for missing in range(self.last_id + 1, row.id):
+                    self._gaps[missing] = now + GAP_TIMEOUT
+                self.last_id = row.id
+        self._gaps = {gap: deadline for gap, deadline in self._gaps.items() if deadline > now}
+        if len(self._gaps) > MAX_GAPS:
+            self._gaps = dict(sorted(self._gaps.items())[-MAX_GAPS:])
+
+        _dispatch(rows)
+        self.last_success = now
+        self._cleared = False
+        return len(rows)
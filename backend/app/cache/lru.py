@@ -0,0 +1,160 @@
+"""Bounded LRU caches: per-entry expiry, or a total size budget."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Protocol, Tuple, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Cache(Protocol):
+    """Minimal interface shared by every registered cache."""
+    
+    def clear(self) -> None: ...
+    
+    def __len__(self) -> int: ...
+
+
+_registry: Dict[str, Cache] = {}
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache where every entry also carries a deadline.
+    
+    Reads refresh recency; expired entries are dropped lazily on access
+    and the least recently used entry is evicted once ``max_size`` is hit.
+    """
+    
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: K) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            deadline, value = entry
+            if deadline <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Store a value for ``ttl`` seconds (defaults to the cache TTL)."""
+        if self.max_size <= 0:
+            return
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + lifetime, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def discard(self, key: K) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SizedLRUCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache bounded by the total size of its values.
+    
+    ``weigh`` returns the size of one value (``len`` by default, i.e. bytes
+    for encoded payloads); least recently used entries are evicted until
+    the total fits ``max_bytes``. A value larger than the whole budget is
+    not stored.
+    """
+    
+    def __init__(self, max_bytes: int, weigh: Callable[[V], int] = len) -> None:
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[K, Tuple[int, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: K) -> Optional[V]:
+        """Return the cached value, or None if missing."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the oldest entries to stay within budget."""
+        weight = self.weigh(value)
+        if weight > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[0]
+            self._data[key] = (weight, value)
+            self.total_bytes += weight
+            while self.total_bytes > self.max_bytes:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self.total_bytes -= evicted
+    
+    def discard(self, key: K) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[0]
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def register_cache(name: str, cache: Cache) -> Cache:
+    """Register a cache so diagnostics and tests can find it by name."""
+    _registry[name] = cache
+    return cache
+
+
+def registered_caches() -> Dict[str, Cache]:
+    """Return all registered caches keyed by name."""
+    return dict(_registry)
+
+
+def clear_all() -> None:
+    """Empty every registered cache."""
+    for cache in _registry.values():
+        cache.clear()
@@ -0,0 +1,428 @@
+"""
+Host-wide cache tier in shared memory, built by one worker and read by all.
+
+Every uvicorn worker on a host attaches the same ``SharedMemory`` segment.
+It holds a fixed-slot hash table of session token digests (user id and
+expiry) and sorted, packed arrays of active profile and celebrity user
+ids. Lookups read the segment in place: no copy per worker, and a freshly
+started worker answers from a warm table at once.
+
+The segment has two halves. The builder writes the inactive half and then
+bumps the generation counter in the header; the half in use is
+``generation & 1``. Readers use it as a seqlock: read the generation, read
+the half, re-read the generation, and retry if it moved, because a
+rebuild may then have overwritten what they read. Readers take no lock
+and never block the builder. This relies on aligned 8-byte stores being
+atomic and on stores becoming visible in program order (x86-64, and
+ARM64 in practice for the one-word header).
+
+Answers are hints bounded by the snapshot age: callers check anything
+missing or negative against the database.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from array import array
+from datetime import datetime
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from typing import IO, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.profile import Profile
+from app.models.session import Session as SessionModel
+from app.models.user import User
+
+try:  # pragma: no cover - builder election needs POSIX file locks
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_MAGIC = 0x414E4344  # "ANCD"
+_LAYOUT_VERSION = 1
+# The segment is read as int64 words, which index far faster than struct
+# unpacking. Header: magic and layout version, session slots, id capacity,
+# generation.
+_HEADER = Struct("<IIqqq")
+_HEADER_WORDS = 8
+_GENERATION_WORD = 3
+# Per half: built_at (unix ms), max user id covered, active id count,
+# celebrity id count (-1 when over capacity), sessions stored
+_META_WORDS = 8
+# Per slot: first 16 bytes of the token digest as two words, user id
+# (0 marks an empty slot), expires_at (unix seconds)
+_SLOT_WORDS = 4
+# Sessions beyond this share of the slots are left to the database
+_MAX_LOAD = 0.75
+_READ_RETRIES = 8
+_ATTACH_RETRIES = 100
+
+
+def _round_up_pow2(value: int) -> int:
+    return 1 << max(value - 1, 1).bit_length()
+
+
+def _unix(moment: datetime) -> float:
+    return (moment - _EPOCH).total_seconds()
+
+
+def _digest_words(digest: bytes) -> Tuple[int, int]:
+    return int.from_bytes(digest[:8], "little", signed=True), int.from_bytes(digest[8:16], "little", signed=True)
+
+
+def open_segment(name: str, size: int, magic: int) -> Tuple[SharedMemory, bool]:
+    """
+    Create the named segment, or attach to it once its creator has initialized it.
+
+    Layouts start with ``magic`` as a little-endian 32-bit word, written
+    last by the creator. Returns the segment and whether this call created it.
+    """
+    for _ in range(_ATTACH_RETRIES):
+        try:
+            shm, created = SharedMemory(name=name, create=True, size=size), True
+        except FileExistsError:
+            shm, created = SharedMemory(name=name), False
+        if os.name == "posix":
+            # The segment outlives any one worker; stop this process's
+            # resource tracker from unlinking it at exit under the others
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        if created or (shm.size >= 4 and int.from_bytes(shm.buf[:4], "little") == magic):
+            return shm, created
+        shm.close()
+        time.sleep(0.01)
+    raise TimeoutError(f"Shared memory segment {name!r} was never initialized")
+
+
+class HostCache:
+    """
+    Reader and writer for one shared-memory segment.
+
+    Unattached, every lookup returns None, so callers always fall back to
+    their regular path. Lookups also return None for snapshots older than
+    ``max_age`` seconds, e.g. after the builder stopped.
+    """
+
+    def __init__(self) -> None:
+        self.shm: Optional[SharedMemory] = None
+        self.slots = 0
+        self.capacity = 0
+        self.max_age = 0.0
+        self.created = False
+        # Lookups answered from the snapshot, and those left to the caller
+        self.hits = 0
+        self.misses = 0
+        self._words: Optional[memoryview] = None
+        self._half_words = 0
+
+    @property
+    def attached(self) -> bool:
+        return self._words is not None
+
+    def attach(self, name: str, *, session_slots: int, id_capacity: int, max_age: float) -> None:
+        """Open the named segment, creating it if no worker on this host has yet."""
+        self.detach()
+        slots = _round_up_pow2(session_slots)
+        half_words = _META_WORDS + slots * _SLOT_WORDS + 2 * id_capacity
+        shm, created = open_segment(name, (_HEADER_WORDS + 2 * half_words) * 8, _MAGIC)
+        if created:
+            _HEADER.pack_into(shm.buf, 0, _MAGIC, _LAYOUT_VERSION, slots, id_capacity, 0)
+        elif _HEADER.unpack_from(shm.buf, 0)[:4] != (_MAGIC, _LAYOUT_VERSION, slots, id_capacity):
+            shm.close()
+            raise ValueError(f"Shared memory segment {name!r} has a different layout; unlink it or rename")
+        self.shm = shm
+        self.slots = slots
+        self.capacity = id_capacity
+        self.max_age = max_age
+        self.created = created
+        self._words = shm.buf.cast("q")
+        self._half_words = half_words
+
+    def detach(self) -> None:
+        """Release the mapping; the segment stays for the other workers."""
+        if self.shm is None:
+            return
+        self._words.release()
+        self.shm.close()
+        self.shm = None
+        self._words = None
+
+    def unlink(self) -> None:
+        """Detach and remove the segment from the host."""
+        if self.shm is None:
+            return
+        name = self.shm.name
+        self.detach()
+        try:
+            shm = SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    def generation(self) -> int:
+        return self._words[_GENERATION_WORD] if self.attached else 0
+
+    def _half(self, generation: int) -> int:
+        return _HEADER_WORDS + (generation & 1) * self._half_words
+
+    def _current(self) -> int:
+        """Return the generation to read (seqlock begin), or 0 without a usable snapshot."""
+        words = self._words
+        if words is None:
+            return 0
+        generation = words[_GENERATION_WORD]
+        built_ms = words[_HEADER_WORDS + (generation & 1) * self._half_words]
+        if generation and time.time() - built_ms / 1000 > self.max_age:
+            return 0
+        return generation
+
+    def session(self, digest: bytes) -> Optional[Tuple[int, float]]:
+        """Return ``(user_id, expires_at)`` for a live session token digest, or None."""
+        words = self._words
+        key, key_tail = _digest_words(digest)
+        mask = self.slots - 1
+        for _ in range(_READ_RETRIES):
+            generation = self._current()
+            if not generation:
+                break
+            slots_at = self._half(generation) + _META_WORDS
+            index = key & mask
+            found = None
+            for _ in range(self.slots):
+                slot = slots_at + index * _SLOT_WORDS
+                user_id = words[slot + 2]
+                if user_id == 0:
+                    break
+                if words[slot] == key and words[slot + 1] == key_tail:
+                    found = (user_id, words[slot + 3])
+                    break
+                index = (index + 1) & mask
+            if words[_GENERATION_WORD] != generation:
+                continue  # rebuilt while reading: retry on the new snapshot
+            if found is not None and found[1] > time.time():
+                self.hits += 1
+                return found
+            break
+        self.misses += 1
+        return None
+
+    def _contains(self, user_id: int, which: int) -> Optional[bool]:
+        words = self._words
+        for _ in range(_READ_RETRIES):
+            generation = self._current()
+            if not generation:
+                break
+            base = self._half(generation)
+            count = words[base + 2 + which]
+            found = None
+            # Unknown when over capacity, or for users created after the snapshot
+            if count >= 0 and user_id <= words[base + 1]:
+                start = base + _META_WORDS + self.slots * _SLOT_WORDS + which * self.capacity
+                end = start + min(count, self.capacity)
+                position = bisect.bisect_left(words, user_id, start, end)
+                found = position < end and words[position] == user_id
+            if words[_GENERATION_WORD] != generation:
+                continue
+            if found is not None:
+                self.hits += 1
+                return found
+            break
+        self.misses += 1
+        return None
+
+    def is_active(self, user_id: int) -> Optional[bool]:
+        """Whether the user has an active profile, or None if the snapshot cannot tell."""
+        return self._contains(user_id, 0)
+
+    def is_celebrity(self, user_id: int) -> Optional[bool]:
+        """Whether the user is a celebrity, or None if the snapshot cannot tell."""
+        return self._contains(user_id, 1)
+
+    def publish(
+        self,
+        *,
+        sessions: Iterable[Tuple[bytes, int, float]],
+        active_ids: Sequence[int],
+        celebrity_ids: Sequence[int],
+        max_user_id: int,
+        built_at: Optional[float] = None,
+    ) -> int:
+        """
+        Write a new snapshot into the inactive half and make it current.
+
+        Only one process may publish at a time (see ``HostCacheBuilder``).
+        Id lists longer than the capacity are marked unknown rather than
+        truncated. Returns the number of sessions stored.
+        """
+        words = self._words
+        generation = self.generation() + 1
+        base = self._half(generation)
+        slots_at = base + _META_WORDS
+        ids_at = slots_at + self.slots * _SLOT_WORDS
+        words[slots_at:ids_at] = array("q", bytes((ids_at - slots_at) * 8))
+        mask = self.slots - 1
+        limit = int(self.slots * _MAX_LOAD)
+        stored = 0
+        for digest, user_id, expires_at in sessions:
+            if stored >= limit:
+                break
+            key, key_tail = _digest_words(digest)
+            index = key & mask
+            while words[slots_at + index * _SLOT_WORDS + 2] != 0:
+                index = (index + 1) & mask
+            slot = slots_at + index * _SLOT_WORDS
+            words[slot:slot + _SLOT_WORDS] = array("q", (key, key_tail, user_id, int(expires_at)))
+            stored += 1
+
+        counts = []
+        for which, ids in enumerate((active_ids, celebrity_ids)):
+            if len(ids) > self.capacity:
+                counts.append(-1)
+                continue
+            start = ids_at + which * self.capacity
+            words[start:start + len(ids)] = array("q", sorted(ids))
+            counts.append(len(ids))
+
+        built_ms = int((time.time() if built_at is None else built_at) * 1000)
+        words[base:base + 5] = array("q", (built_ms, max_user_id, *counts, stored))
+        # Publishing the generation last makes the half visible to readers
+        words[_GENERATION_WORD] = generation
+        return stored
+
+    def stats(self) -> dict:
+        """Describe the current snapshot for diagnostics."""
+        if not self.attached:
+            return {"attached": False}
+        generation = self.generation()
+        if generation == 0:
+            return {"attached": True, "generation": 0, "bytes": self.shm.size}
+        built_ms, max_user_id, active, celebrities, sessions = self._words[self._half(generation):][:5].tolist()
+        return {
+            "attached": True,
+            "builder": self.created,
+            "generation": generation,
+            "age_seconds": round(time.time() - built_ms / 1000, 3),
+            "sessions": sessions,
+            "active_profiles": active,
+            "celebrities": celebrities,
+            "max_user_id": max_user_id,
+            "bytes": self.shm.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def try_host_lock(path: str) -> Optional[IO]:
+    """
+    Take an exclusive lock on ``path`` without waiting, electing this worker.
+
+    Returns the open lock file, which holds the lock until closed (or the
+    process exits), or None if another process holds it.
+    """
+    if fcntl is None:  # pragma: no cover
+        return None
+    lock_file = open(path, "a+")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+# The tier shared by every worker on this host; attached in the app lifespan
+host_cache = HostCache()
+
+
+def load_snapshot(db: Session) -> dict:
+    """Read everything a host cache snapshot holds from the database."""
+    # Taken before reading, so the age covers every row in the snapshot
+    built_at = time.time()
+    now = datetime.utcnow()
+    sessions = [
+        # Keyed like app.auth's session cache: the SHA-256 digest of the token
+        (hashlib.sha256(token.encode()).digest(), user_id, _unix(expires_at))
+        for token, user_id, expires_at in db.execute(
+            select(SessionModel.token, SessionModel.user_id, SessionModel.expires_at)
+            .where(SessionModel.expires_at > now)
+        )
+    ]
+    return {
+        "sessions": sessions,
+        "active_ids": db.scalars(select(Profile.user_id).where(Profile.is_active == True)).all(),  # noqa: E712
+        "celebrity_ids": db.scalars(select(User.id).where(User.is_celebrity == True)).all(),  # noqa: E712
+        "max_user_id": db.scalar(select(User.id).order_by(User.id.desc()).limit(1)) or 0,
+        "built_at": built_at,
+    }
+
+
+class HostCacheBuilder:
+    """
+    Background thread electing one worker per host to rebuild the host cache.
+
+    Every worker runs one; whichever holds an exclusive lock on
+    ``lock_path`` reloads the snapshot every ``interval`` seconds. If that
+    worker exits, the operating system releases the lock and another
+    worker takes over on its next attempt.
+    """
+
+    def __init__(self, cache: HostCache, engine: Engine, *, interval: float, lock_path: Optional[str] = None) -> None:
+        self.cache = cache
+        self.engine = engine
+        self.interval = interval
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), f"{cache.shm.name.lstrip('/')}.lock")
+        self._lock_file: Optional[IO] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_builder(self) -> bool:
+        return self._lock_file is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="host-cache-builder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Host cache rebuild failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def tick(self) -> bool:
+        """Rebuild the snapshot if this worker is (or becomes) the builder; return whether it did."""
+        if self._lock_file is None:
+            self._lock_file = try_host_lock(self.lock_path)
+        if self._lock_file is None:
+            return False
+        with Session(self.engine) as db:
+            snapshot = load_snapshot(db)
+        self.cache.publish(**snapshot)
+        return True
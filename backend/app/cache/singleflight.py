@@ -0,0 +1,79 @@
+"""
+Single-flight: concurrent identical calls share one execution.
+
+The first caller for a key runs the function; callers arriving while it
+runs wait for it and receive the same result (or exception) instead of
+repeating the work. Use it for duplicate reads from the same client and
+for cache misses on hot keys, where every concurrent miss would otherwise
+hit the database.
+
+Nothing is kept once the call returns, but a joining caller gets a result
+that may have been read before it arrived: data committed while the
+leader runs can be missing from it, so results can be up to one call's
+duration old. Callers that must see their own writes put a version in the
+key that the write bumps (see ``app.services.feed``), so reads issued
+after the write start a new call instead of joining an older one.
+
+Results are shared between threads, so they must be immutable or
+detached (encoded bytes, detached ORM copies).
+"""
+
+import threading
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+from app.observability.metrics import registry
+
+
+T = TypeVar("T")
+
+coalesced_calls = registry.counter(
+    "singleflight_coalesced",
+    "Calls answered by joining an identical call already in flight",
+    ("group",),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """A named group of keys; ``name`` labels the ``singleflight_coalesced`` metric."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, or the result of the call for ``key`` already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            coalesced_calls.inc(group=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result  # type: ignore[return-value]
+
+    def __len__(self) -> int:
+        """Calls currently in flight."""
+        return len(self._calls)
@@ -0,0 +1,300 @@
+"""Response compression negotiated from ``Accept-Encoding``."""
+
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import SizedLRUCache, register_cache
+from app.config import settings
+from app.observability.context import route_template
+from app.observability.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is an optional codec
+    zstandard = None
+
+
+# Codec levels behind each named level; names keep route settings
+# meaningful across codecs whose numeric scales differ
+LEVELS: Dict[str, Dict[str, int]] = {
+    "fast": {"zstd": 1, "br": 1, "gzip": 1},
+    "default": {"zstd": 3, "br": 5, "gzip": 6},
+    "best": {"zstd": 19, "br": 11, "gzip": 9},
+}
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _available_codecs() -> Dict[str, Callable[[bytes, int], bytes]]:
+    codecs: Dict[str, Callable[[bytes, int], bytes]] = {}
+    if zstandard is not None:
+        codecs["zstd"] = lambda body, level: zstandard.ZstdCompressor(level=level).compress(body)
+    if brotli is not None:
+        codecs["br"] = lambda body, level: brotli.compress(body, quality=level)
+    codecs["gzip"] = _gzip
+    return codecs
+
+
+# Installed codecs in server preference order, used to break ties in q-values
+CODECS = _available_codecs()
+
+# (body digest, encoding, codec level) -> compressed body, for RoutePolicy.reuse
+compressed_responses: SizedLRUCache[Tuple[bytes, str, int], bytes] = register_cache(
+    "compressed_responses", SizedLRUCache(max_bytes=settings.compression_cache_bytes)
+)
+
+compressed_bytes_in = registry.counter(
+    "http_compression_bytes_in",
+    "Response bytes before compression",
+    ("route", "encoding"),
+)
+compressed_bytes_out = registry.counter(
+    "http_compression_bytes_out",
+    "Response bytes after compression",
+    ("route", "encoding"),
+)
+compression_cpu_seconds = registry.counter(
+    "http_compression_cpu_seconds",
+    "CPU time spent compressing responses",
+    ("route", "encoding"),
+)
+compression_reused = registry.counter(
+    "http_compression_reused",
+    "Responses served from already compressed bodies",
+    ("route", "encoding"),
+)
+
+
+def negotiate(accept_encoding: str, available: Mapping[str, object] = CODECS) -> Optional[str]:
+    """
+    Pick the content coding to use for a request.
+
+    Args:
+        accept_encoding: The request's ``Accept-Encoding`` header
+        available: Codings the server can produce, most preferred first
+
+    Returns:
+        The acceptable coding with the highest q-value (ties go to the
+        server's preference), or None to send the body as is
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding] = quality
+
+    best: Optional[str] = None
+    best_quality = 0.0
+    for coding in available:
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _is_strong(etag: Optional[str]) -> bool:
+    return etag is not None and not etag.startswith("W/") and etag.endswith('"')
+
+
+def _coded(etag: str, encoding: str) -> str:
+    """Return the strong tag of ``etag``'s representation compressed with ``encoding``."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """How responses of one route template are compressed."""
+    level: str = "default"
+    # Keep compressed bodies for byte-identical responses served again
+    reuse: bool = False
+    enabled: bool = True
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses single-message responses.
+
+    The coding is negotiated from ``Accept-Encoding`` among zstd, brotli
+    and gzip (zstd and brotli only when their packages are installed).
+    Bodies below ``minimum_size``, non-text content types, streamed
+    responses and responses that already set ``Content-Encoding`` are sent
+    unchanged, so a handler can serve bytes it stored compressed itself.
+
+    Routes with ``reuse`` keep compressed bodies in ``compressed_responses``
+    keyed by a digest of the uncompressed body, so payloads served
+    repeatedly are compressed once per process.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        level: str = "default",
+        routes: Optional[Mapping[str, RoutePolicy]] = None,
+    ) -> None:
+        if level not in LEVELS:
+            raise ValueError(f"Unknown compression level {level!r}; expected one of {sorted(LEVELS)}")
+        self.app = app
+        self.minimum_size = minimum_size
+        self.default_policy = RoutePolicy(level=level)
+        self.routes = dict(routes or {})
+        for route, policy in self.routes.items():
+            if policy.level not in LEVELS:
+                raise ValueError(f"Unknown compression level {policy.level!r} for {route}")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether compression applies
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            response_start, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=response_start)
+            if response_start["status"] == 304:
+                self._tag_not_modified(headers, request_headers.get("if-none-match", ""), encoding)
+                await send(response_start)
+                await send(message)
+                return
+            if message.get("more_body", False) or not self._compressible(headers):
+                await send(response_start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            route = route_template(scope)
+            # Starlette routes such as /openapi.json have no template; match their path
+            policy = self.routes.get(route) or self.routes.get(scope["path"], self.default_policy)
+            if not policy.enabled or len(body) < self.minimum_size:
+                await send(response_start)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding, LEVELS[policy.level][encoding], route, policy.reuse)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if _is_strong(etag):
+                # Each coding is a different representation and needs its own
+                # strong tag; app.api.etags strips the suffix when comparing
+                headers["ETag"] = _coded(etag, encoding)
+            await send(response_start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _tag_not_modified(headers: MutableHeaders, if_none_match: str, encoding: str) -> None:
+        """
+        Give a 304 the tag of the coded representation the client holds.
+
+        The handler validates against the bare tag and answers with it. A
+        client whose copy came compressed in ``encoding`` stored the
+        suffixed tag, so that is the validator to echo; a client holding an
+        uncompressed copy (a body under ``minimum_size``) keeps the bare one.
+        """
+        etag = headers.get("etag")
+        if not _is_strong(etag):
+            return
+        coded = _coded(etag, encoding)
+        if coded in (tag.strip() for tag in if_none_match.split(",")):
+            headers["ETag"] = coded
+            headers.add_vary_header("Accept-Encoding")
+
+    @staticmethod
+    def _compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+    def compress(self, body: bytes, encoding: str, level: int, route: str, reuse: bool) -> bytes:
+        """Compress ``body``, recording CPU time and bytes saved per route."""
+        key = None
+        if reuse:
+            key = (hashlib.blake2b(body, digest_size=16).digest(), encoding, level)
+            cached = compressed_responses.get(key)
+            if cached is not None:
+                compression_reused.inc(route=route, encoding=encoding)
+                compressed_bytes_in.inc(len(body), route=route, encoding=encoding)
+                compressed_bytes_out.inc(len(cached), route=route, encoding=encoding)
+                return cached
+
+        started = time.thread_time()
+        compressed = CODECS[encoding](body, level)
+        compression_cpu_seconds.inc(time.thread_time() - started, route=route, encoding=encoding)
+        compressed_bytes_in.inc(len(body), route=route, encoding=encoding)
+        compressed_bytes_out.inc(len(compressed), route=route, encoding=encoding)
+        if key is not None:
+            compressed_responses.set(key, compressed)
+        return compressed
+
+
+def compression_report() -> List[Dict[str, object]]:
+    """
+    Summarize CPU spent against bytes saved, per route and coding.
+
+    Returns:
+        One row per (route, encoding), largest savings first
+    """
+    rows = []
+    for _, labels, bytes_in in compressed_bytes_in.collect().samples:
+        route, encoding = labels["route"], labels["encoding"]
+        bytes_out = compressed_bytes_out.value(route=route, encoding=encoding)
+        cpu = compression_cpu_seconds.value(route=route, encoding=encoding)
+        saved = bytes_in - bytes_out
+        rows.append({
+            "route": route,
+            "encoding": encoding,
+            "bytes_in": int(bytes_in),
+            "bytes_out": int(bytes_out),
+            "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+            "cpu_ms": round(cpu * 1000, 3),
+            "reused": int(compression_reused.value(route=route, encoding=encoding)),
+            "kib_saved_per_cpu_ms": round(saved / 1024 / (cpu * 1000), 1) if cpu else None,
+        })
+    return sorted(rows, key=lambda row: row["bytes_in"] - row["bytes_out"], reverse=True)
@@ -1,7 +1,7 @@
 """Configuration management for the application."""
 
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Literal, Optional, List
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -28,6 +28,28 @@ class Settings(BaseSettings):
         default="sqlite:///./data/app.db",
         description="Database connection URL"
     )
+    db_pool_size: int = Field(default=10, description="Persistent connections kept in the pool")
+    db_max_overflow: int = Field(default=20, description="Extra connections allowed above the pool size")
+    db_pool_timeout: float = Field(default=10.0, description="Seconds to wait for a pooled connection")
+    db_pool_recycle: int = Field(default=1800, description="Recycle pooled connections after N seconds")
+    db_statement_timeout_ms: int = Field(
+        default=5000,
+        description="PostgreSQL statement_timeout applied to every connection (0 disables)"
+    )
+    db_prepare_threshold: Optional[int] = Field(
+        default=5,
+        description="Executions before psycopg switches a query to a server-side prepared statement"
+    )
+    
+    @field_validator('database_url', mode='before')
+    @classmethod
+    def normalize_database_url(cls, v):
+        # Plain postgres URLs would pick psycopg2; we ship with psycopg 3
+        if isinstance(v, str):
+            for prefix in ("postgres://", "postgresql://"):
+                if v.startswith(prefix):
+                    return "postgresql+psycopg://" + v[len(prefix):]
+        return v
     
     # Security settings
     secret_key: str = Field(
@@ -35,6 +57,219 @@ class Settings(BaseSettings):
         description="Secret key for security"
     )
     
+    admin_token: Optional[str] = Field(
+        default=None,
+        description="Token required in X-Admin-Token for /admin endpoints (unset disables them)"
+    )
+    
+    # Instrumentation settings
+    query_budget: int = Field(
+        default=15,
+        description="Log a warning when a request runs more SQL statements than this (0 disables)"
+    )
+    
+    slow_query_threshold_ms: float = Field(
+        default=100.0,
+        description="Record statements slower than this many milliseconds (0 disables)"
+    )
+    slow_query_explain: bool = Field(default=True, description="Capture a query plan for new slow queries")
+    slow_query_explain_queue_size: int = Field(
+        default=100,
+        description="Slow queries waiting for a background EXPLAIN; plans beyond this are skipped"
+    )
+    slow_query_max_entries: int = Field(default=500, description="Distinct slow-query fingerprints kept in memory")
+    slow_query_log_path: Optional[str] = Field(
+        default=None,
+        description="Rotating JSONL file for slow queries (unset keeps them in memory only)"
+    )
+    slow_query_log_max_bytes: int = Field(default=10_485_760, description="Rotate the slow-query log at this size")
+    slow_query_log_backups: int = Field(default=5, description="Rotated slow-query log files to keep")
+    metrics_enabled: bool = Field(default=True, description="Serve Prometheus metrics on /metrics")
+    metrics_dir: Optional[str] = Field(
+        default=None,
+        description="Shared directory for merging metrics across worker processes"
+    )
+    metrics_flush_interval: float = Field(
+        default=5.0,
+        description="Seconds between metric snapshots written to metrics_dir"
+    )
+    tracing_enabled: bool = Field(default=True, description="Record request traces with per-layer spans")
+    trace_sample_rate: float = Field(default=0.01, description="Fraction of requests whose traces are always kept")
+    trace_slow_ms: float = Field(default=250.0, description="Keep the trace of every request slower than this")
+    trace_buffer_size: int = Field(default=200, description="Kept traces held in memory for /admin/traces")
+    trace_max_spans: int = Field(default=500, description="Spans recorded per trace before the rest are dropped")
+    trace_log_path: Optional[str] = Field(
+        default=None,
+        description="Rotating JSONL file for kept traces (unset keeps them in memory only)"
+    )
+    trace_log_max_bytes: int = Field(default=10_485_760, description="Rotate the trace log at this size")
+    trace_log_backups: int = Field(default=5, description="Rotated trace log files to keep")
+    loop_lag_monitor_enabled: bool = Field(default=True, description="Measure event-loop lag and log blocking handlers")
+    loop_lag_interval_ms: float = Field(default=50.0, description="Event-loop heartbeat interval in milliseconds")
+    loop_lag_threshold_ms: float = Field(
+        default=100.0,
+        description="Log the blocking stack when the loop is late by more than this"
+    )
+    profiler_interval_ms: float = Field(default=5.0, description="Sampling profiler interval in milliseconds")
+    profiler_max_seconds: float = Field(default=300.0, description="Longest profile /admin/profiler/start may request")
+    traffic_capture_enabled: bool = Field(default=False, description="Record sanitized request traces for replay")
+    traffic_capture_dir: str = Field(
+        default="./data/traffic",
+        description="Directory for compressed capture files (one per worker process)"
+    )
+    traffic_capture_secret: Optional[str] = Field(
+        default=None,
+        description="Key for user pseudonyms in captured traffic (defaults to SECRET_KEY)"
+    )
+    
+    # Session cache settings
+    session_cache_size: int = Field(default=10000, description="Validated session tokens kept in memory")
+    session_cache_ttl_seconds: float = Field(
+        default=60.0,
+        description="Seconds a validated session is trusted before re-checking the database"
+    )
+    profile_card_cache_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        description="Total bytes of pre-encoded feed and match profile cards kept in memory (0 disables)"
+    )
+    profile_cache_size: int = Field(default=50000, description="Profiles kept in memory for lookups by user id")
+    profile_cache_ttl_seconds: float = Field(
+        default=30.0,
+        description="Seconds a cached profile is served before it is read from the database again"
+    )
+    profile_version_cache_size: int = Field(
+        default=100000,
+        description="Profile versions (id, updated_at, is_active) kept in memory to answer If-None-Match"
+    )
+    profile_version_ttl_seconds: float = Field(
+        default=10.0,
+        description="Seconds a remembered profile version is trusted before re-checking the database"
+    )
+    
+    # Cross-worker cache invalidation settings
+    cache_invalidation_enabled: bool = Field(
+        default=True,
+        description="Tail the cache_invalidations table so writes in other workers evict local cache entries"
+    )
+    cache_invalidation_interval: float = Field(default=0.5, description="Seconds between invalidation table polls")
+    cache_invalidation_max_lag: float = Field(
+        default=5.0,
+        description="Clear every cache if invalidations cannot be read for this many seconds"
+    )
+    cache_invalidation_retention: float = Field(
+        default=600.0,
+        description="Seconds invalidation rows are kept before being pruned"
+    )
+    host_cache_enabled: bool = Field(
+        default=False,
+        description="Share sessions, active profile ids and celebrity ids between workers through shared memory"
+    )
+    host_cache_name: str = Field(default="anecdote-host-cache", description="Shared memory segment name")
+    host_cache_session_slots: int = Field(
+        default=131072,
+        description="Session hash table slots (rounded up to a power of two, filled to 75%)"
+    )
+    host_cache_id_capacity: int = Field(
+        default=262144,
+        description="Most active profile or celebrity ids stored; beyond it lookups fall back to the database"
+    )
+    host_cache_interval: float = Field(default=5.0, description="Seconds between host cache rebuilds")
+    host_cache_max_age: float = Field(
+        default=30.0,
+        description="Ignore host cache snapshots older than this, e.g. while no worker can rebuild them"
+    )
+    feed_snapshot_enabled: bool = Field(
+        default=False,
+        description="Pick feed pages from a memory-mapped snapshot of active profiles instead of scanning in SQL"
+    )
+    feed_snapshot_path: str = Field(default="./data/feed_snapshot.bin", description="Feed snapshot file")
+    feed_snapshot_interval: float = Field(default=2.0, description="Seconds between incremental snapshot refreshes")
+    feed_snapshot_full_interval: float = Field(
+        default=300.0,
+        description="Seconds between full snapshot rebuilds (keep below cache_invalidation_retention)"
+    )
+    feed_snapshot_max_age: float = Field(
+        default=30.0,
+        description="Fall back to the SQL feed query when the snapshot is older than this"
+    )
+    
+    # Response compression settings
+    compression_enabled: bool = Field(default=True, description="Compress responses negotiated from Accept-Encoding")
+    compression_min_size: int = Field(default=1024, description="Smallest response body (bytes) worth compressing")
+    compression_level: Literal["fast", "default", "best"] = Field(
+        default="default",
+        description="Compression level for routes without their own policy"
+    )
+    compression_cache_bytes: int = Field(
+        default=16 * 1024 * 1024,
+        description="Total bytes of compressed bodies kept for routes that reuse them"
+    )
+    
+    # Swipe rate limit settings
+    swipe_limit_enabled: bool = Field(default=True, description="Limit likes and skips per user, answering 429 past the quota")
+    swipe_limit_per_minute: float = Field(default=60.0, description="Sustained swipes per minute allowed per user")
+    swipe_limit_burst: int = Field(default=30, description="Swipes a user may make back to back before the rate applies")
+    swipe_limit_slots: int = Field(
+        default=65536,
+        description="Users tracked at once (rounded up to a power of two, 16 bytes each); users beyond it go unlimited"
+    )
+    swipe_limit_shared: bool = Field(
+        default=False,
+        description="Keep the per-user budgets in shared memory so every worker on the host enforces one quota"
+    )
+    swipe_limit_name: str = Field(default="anecdote-swipe-limit", description="Shared memory segment name")
+    swipe_limit_lock_path: str = Field(
+        default="./data/swipe_limit.lock",
+        description="Lock file serializing updates to the shared budgets"
+    )
+    
+    # Login throttle settings
+    login_throttle_enabled: bool = Field(
+        default=True,
+        description="Refuse logins without checking the password once an email or address used up its failures"
+    )
+    login_throttle_email_failures: int = Field(
+        default=5,
+        description="Failed logins allowed per email from one client address per window"
+    )
+    login_throttle_address_failures: int = Field(
+        default=20,
+        description="Failed logins allowed per client address per window, across all emails"
+    )
+    login_throttle_window_seconds: float = Field(
+        default=900.0,
+        description="Seconds over which a spent failure budget refills completely"
+    )
+    login_throttle_slots: int = Field(
+        default=65536,
+        description="Email/address pairs and addresses tracked at once per worker (16 bytes each)"
+    )
+    
+    # Admission control settings
+    admission_enabled: bool = Field(
+        default=True,
+        description="Limit concurrent requests per lane and answer excess ones with 503 and Retry-After"
+    )
+    admission_read_limit: int = Field(default=64, description="Most concurrent cheap reads (GET requests)")
+    admission_write_limit: int = Field(default=32, description="Most concurrent writes (likes, skips, profile edits)")
+    admission_auth_limit: int = Field(
+        default=4,
+        description="Most concurrent logins and registrations; each spends a core on bcrypt"
+    )
+    admission_deep_feed_limit: int = Field(default=4, description="Most concurrent deep feed pages")
+    admission_deep_feed_page: int = Field(default=10, description="Feed pages past this one count as deep")
+    admission_queue_size: int = Field(default=16, description="Requests allowed to wait for a slot, per lane")
+    admission_queue_timeout: float = Field(default=0.5, description="Seconds a request may wait for a slot")
+    admission_target_latency_ms: float = Field(
+        default=250.0,
+        description="Latency above which read, write and deep feed limits shrink"
+    )
+    admission_auth_target_latency_ms: float = Field(
+        default=1000.0,
+        description="Latency above which the login and registration limit shrinks"
+    )
+    admission_retry_after: int = Field(default=1, description="Retry-After seconds sent with 503 responses")
+    
     # CORS settings
     cors_origins: str | list[str] = Field(
         default=["http://localhost:3000", "http://localhost:8080"],
@@ -0,0 +1,115 @@
+"""Bulk loading helpers for seeding and imports."""
+
+from itertools import islice
+from typing import Any, Iterable, Iterator, Mapping
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def _batches(rows: Iterable[Mapping[str, Any]], size: int) -> Iterator[list[Mapping[str, Any]]]:
+    """Split an iterable of rows into lists of at most ``size`` rows."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def supports_copy(connection: Connection) -> bool:
+    """Return True when the connection can stream rows with ``COPY FROM STDIN``."""
+    return connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg"
+
+
+def _copy_rows(
+    connection: Connection,
+    table: Table,
+    rows: Iterable[Mapping[str, Any]],
+    columns: list[str],
+) -> int:
+    """Stream rows into ``table`` with PostgreSQL ``COPY``."""
+    dialect = connection.dialect
+    processors = []
+    defaults = []
+    for name in columns:
+        column = table.c[name]
+        processors.append(column.type.dialect_impl(dialect).bind_processor(dialect))
+        default = column.default
+        if default is not None and default.is_scalar:
+            defaults.append(lambda arg=default.arg: arg)
+        elif default is not None and default.is_callable:
+            defaults.append(lambda fn=default.arg: fn(None))
+        else:
+            defaults.append(lambda: None)
+
+    column_list = ", ".join(dialect.identifier_preparer.quote(name) for name in columns)
+    statement = f"COPY {dialect.identifier_preparer.format_table(table)} ({column_list}) FROM STDIN"
+
+    # Reuse the DBAPI connection so COPY joins the caller's transaction
+    raw_connection = connection.connection.driver_connection
+    count = 0
+    with raw_connection.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for row in rows:
+                values = []
+                for name, process, default in zip(columns, processors, defaults):
+                    value = row[name] if name in row else default()
+                    values.append(process(value) if process is not None else value)
+                copy.write_row(values)
+                count += 1
+    return count
+
+
+def bulk_insert(
+    connection: Connection,
+    table: Table,
+    rows: Iterable[Mapping[str, Any]],
+    *,
+    columns: list[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Insert many rows as fast as the backend allows.
+
+    PostgreSQL with psycopg streams rows through ``COPY FROM STDIN``; every
+    other backend falls back to batched Core ``executemany`` inserts. Column
+    defaults declared on the model are applied in both paths. The caller owns
+    the transaction.
+
+    Args:
+        connection: Connection with an open transaction
+        table: Target table
+        rows: Row mappings keyed by column name
+        columns: Columns to load (defaults to the keys of the first row)
+        batch_size: Rows per ``executemany`` round trip
+
+    Returns:
+        Number of rows inserted
+    """
+    iterator = iter(rows)
+    first = next(iterator, None)
+    if first is None:
+        return 0
+
+    if columns is None:
+        columns = list(first.keys())
+
+    def all_rows() -> Iterator[Mapping[str, Any]]:
+        yield first
+        yield from iterator
+
+    if supports_copy(connection):
+        with_defaults = columns + [
+            column.name
+            for column in table.columns
+            if column.name not in columns and column.default is not None
+        ]
+        return _copy_rows(connection, table, all_rows(), with_defaults)
+
+    count = 0
+    statement = table.insert()
+    for batch in _batches(all_rows(), batch_size):
+        connection.execute(statement, batch)
+        count += len(batch)
+    return count
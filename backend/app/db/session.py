@@ -1,19 +1,63 @@
 """Database session management."""
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
+from app.observability.memory import install_session_tracking
+from app.observability.pool import install_pool_listeners
+from app.observability.queries import install_query_listeners
+from app.observability.slow_queries import install_slow_query_recorder
+
+
+def engine_options(database_url: str) -> dict[str, Any]:
+    """
+    Build backend-specific keyword arguments for ``create_engine``.
+    
+    SQLite keeps the single-file defaults. Server databases get a sized
+    queue pool, and PostgreSQL additionally gets a per-connection
+    ``statement_timeout`` and psycopg server-side prepared statements.
+    
+    Args:
+        database_url: SQLAlchemy database URL
+        
+    Returns:
+        Keyword arguments for ``create_engine``
+    """
+    if database_url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    
+    options: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+    
+    if database_url.startswith("postgresql"):
+        connect_args: dict[str, Any] = {"application_name": settings.app_name}
+        if settings.db_statement_timeout_ms > 0:
+            connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+        if database_url.startswith("postgresql+psycopg:"):
+            connect_args["prepare_threshold"] = settings.db_prepare_threshold
+        options["connect_args"] = connect_args
+    
+    return options
 
 
 # Create database engine
 engine = create_engine(
     settings.database_url,
     echo=settings.debug,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+    **engine_options(settings.database_url),
 )
+install_pool_listeners(engine)
+install_query_listeners(engine)
+install_slow_query_recorder(engine)
+install_session_tracking()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -23,6 +67,10 @@ def get_db() -> Session:
     """
     Get a database session.
     
+    The session is lazy: it autobegins on the first statement, so a pool
+    connection is only checked out if the request actually queries, and
+    closing an unused session never touches the pool.
+    
     Returns:
         Database session instance
     """
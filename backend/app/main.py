@@ -1,14 +1,37 @@
 """Main FastAPI application entry point."""
 
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.api import auth_router, profile_router, like_router, settings_router, feed_router
+from app.admission import AdmissionMiddleware, LanePolicy
+from app.api import (
+    admin_router,
+    auth_router,
+    profile_router,
+    like_router,
+    settings_router,
+    feed_router,
+)
+from app.api.ratelimit import RATE_LIMIT_HEADERS
+from app.cache.bus import InvalidationListener
+from app.cache.shared import HostCacheBuilder, host_cache
+from app.compression import CompressionMiddleware, RoutePolicy
 from app.config import settings
-from app.db.session import create_tables
+from app.db.session import create_tables, engine
+from app.observability.capture import install_traffic_capture
+from app.observability.context import RequestContextMiddleware
+from app.observability.instruments import install_metrics
+from app.observability.loop_lag import start_loop_lag_monitor
+from app.observability.metrics import SnapshotWriter, merge_snapshots, registry, render, write_snapshot
+from app.observability.profiler import ProfilerMiddleware
+from app.observability.tracing import TracedRoute, TracingMiddleware, install_tracing
+from app.ratelimit import swipe_limiter
+from app.services.feed_snapshot import FeedSnapshotBuilder, feed_snapshot
 
 
 @asynccontextmanager
@@ -16,8 +39,69 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     # Startup
     create_tables()
+    snapshot_writer = None
+    if settings.metrics_enabled and settings.metrics_dir:
+        snapshot_writer = SnapshotWriter(Path(settings.metrics_dir), settings.metrics_flush_interval)
+        snapshot_writer.start()
+    lag_monitor = None
+    if settings.loop_lag_monitor_enabled:
+        lag_monitor = start_loop_lag_monitor(
+            interval=settings.loop_lag_interval_ms / 1000,
+            threshold=settings.loop_lag_threshold_ms / 1000,
+        )
+    traffic_capture = None
+    if settings.traffic_capture_enabled:
+        traffic_capture = install_traffic_capture(
+            settings.traffic_capture_dir, settings.traffic_capture_secret or settings.secret_key
+        )
+    invalidation_listener = None
+    if settings.cache_invalidation_enabled:
+        invalidation_listener = InvalidationListener(
+            engine,
+            interval=settings.cache_invalidation_interval,
+            max_lag=settings.cache_invalidation_max_lag,
+            retention=settings.cache_invalidation_retention,
+        )
+        invalidation_listener.start()
+    host_cache_builder = None
+    if settings.host_cache_enabled:
+        host_cache.attach(
+            settings.host_cache_name,
+            session_slots=settings.host_cache_session_slots,
+            id_capacity=settings.host_cache_id_capacity,
+            max_age=settings.host_cache_max_age,
+        )
+        host_cache_builder = HostCacheBuilder(host_cache, engine, interval=settings.host_cache_interval)
+        host_cache_builder.start()
+    if settings.swipe_limit_shared:
+        swipe_limiter.attach(settings.swipe_limit_name, settings.swipe_limit_lock_path)
+    feed_snapshot_builder = None
+    if settings.feed_snapshot_enabled:
+        feed_snapshot.open(settings.feed_snapshot_path, max_age=settings.feed_snapshot_max_age)
+        feed_snapshot_builder = FeedSnapshotBuilder(
+            engine,
+            settings.feed_snapshot_path,
+            interval=settings.feed_snapshot_interval,
+            full_interval=settings.feed_snapshot_full_interval,
+        )
+        feed_snapshot_builder.start()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    if feed_snapshot_builder is not None:
+        feed_snapshot_builder.stop()
+        feed_snapshot.close()
+    swipe_limiter.detach()
+    if host_cache_builder is not None:
+        host_cache_builder.stop()
+        host_cache.detach()
+    if invalidation_listener is not None:
+        invalidation_listener.stop()
+    if traffic_capture is not None:
+        traffic_capture.stop()
+    if lag_monitor is not None:
+        await lag_monitor.stop()
+    if snapshot_writer is not None:
+        snapshot_writer.stop()
 
 
 # Create FastAPI application
@@ -27,6 +111,25 @@ app = FastAPI(
     debug=settings.debug,
     lifespan=lifespan,
 )
+app.router.route_class = TracedRoute
+
+if settings.admission_enabled:
+    # Inside CORS, so 503s carry CORS headers and preflights are never shed
+    read_target = settings.admission_target_latency_ms / 1000
+    queue = dict(queue_size=settings.admission_queue_size, queue_timeout=settings.admission_queue_timeout)
+    app.add_middleware(
+        AdmissionMiddleware,
+        policies={
+            "read": LanePolicy(settings.admission_read_limit, read_target, **queue),
+            "write": LanePolicy(settings.admission_write_limit, read_target, **queue),
+            "auth": LanePolicy(
+                settings.admission_auth_limit, settings.admission_auth_target_latency_ms / 1000, **queue
+            ),
+            "deep_feed": LanePolicy(settings.admission_deep_feed_limit, read_target, **queue),
+        },
+        deep_feed_page=settings.admission_deep_feed_page,
+        retry_after=settings.admission_retry_after,
+    )
 
 # Add CORS middleware
 app.add_middleware(
@@ -35,14 +138,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend send If-Match with the ETag of the profile it edits,
+    # and pace swipes from the remaining quota
+    expose_headers=["ETag", "Retry-After", *RATE_LIMIT_HEADERS],
 )
 
+# Expose per-request stats to database instrumentation
+app.add_middleware(RequestContextMiddleware)
+# Per-layer latency spans with head and tail sampling
+app.add_middleware(TracingMiddleware)
+install_tracing()
+# Opt-in per-request sampling (X-Profile: <admin token>)
+app.add_middleware(ProfilerMiddleware)
+install_metrics(engine)
+if settings.compression_enabled:
+    # Outermost, so timing and query headers describe the uncompressed work
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        level=settings.compression_level,
+        routes={
+            # Unique per user and per page: the fast level keeps nearly all
+            # of the savings at well under half the CPU (benchmarks.compression)
+            "/feed": RoutePolicy(level="fast"),
+            "/likes/feed": RoutePolicy(level="fast"),
+            "/feed/matches": RoutePolicy(level="fast"),
+            "/likes/matches": RoutePolicy(level="fast"),
+            # Identical for every client: compress hard, once per process
+            "/openapi.json": RoutePolicy(level="best", reuse=True),
+        },
+    )
+
 # Include API routers
 app.include_router(auth_router)
 app.include_router(profile_router)
 app.include_router(like_router)
 app.include_router(feed_router)
 app.include_router(settings_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -60,6 +193,30 @@ async def health_check() -> dict[str, str]:
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """
+    Prometheus metrics endpoint.
+    
+    With ``metrics_dir`` configured, samples from every worker writing to
+    that directory are merged into one exposition.
+    
+    Returns:
+        Metrics in the text exposition format
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    if settings.metrics_dir:
+        directory = Path(settings.metrics_dir)
+        write_snapshot(directory)
+        families = merge_snapshots(directory)
+    else:
+        families = registry.collect()
+    
+    return PlainTextResponse(render(families), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/")
 async def root() -> dict[str, str]:
     """
@@ -5,5 +5,6 @@ from app.models.user import User
 from app.models.profile import Profile, GenderEnum
 from app.models.like import Like
 from app.models.profile_view import ProfileView, InteractionType
+from app.models.cache_invalidation import CacheInvalidation
 
-__all__ = ["User", "Session", "Profile", "GenderEnum", "Like", "ProfileView", "InteractionType"]
\ No newline at end of file
+__all__ = ["User", "Session", "Profile", "GenderEnum", "Like", "ProfileView", "InteractionType", "CacheInvalidation"]
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""Cache invalidation log shared by every worker process."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CacheInvalidation(Base):
+    """One cached key that a write made stale, in commit-sequence order."""
+    
+    __tablename__ = "cache_invalidations"
+    # Never reuse ids on SQLite once old rows are pruned; workers tail by id
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    topic: Mapped[str] = mapped_column(String(32), nullable=False)
+    key: Mapped[str] = mapped_column(String(128), nullable=False)
+    # Worker that published it, which has already applied it locally
+    origin: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<CacheInvalidation(id={self.id}, topic={self.topic}, key={self.key})>"
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import String, DateTime, Boolean, ForeignKey, Index, Integer, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -32,6 +32,13 @@ class Like(Base):
     # Prevent duplicate likes and self-likes
     __table_args__ = (
         UniqueConstraint('liker_id', 'target_id', name='unique_like_pair'),
+        # PostgreSQL-only partial indexes for the OR filter in get_matches
+        Index("ix_likes_mutual_liker", "liker_id", postgresql_where=text("mutual")).ddl_if(
+            dialect="postgresql"
+        ),
+        Index("ix_likes_mutual_target", "target_id", postgresql_where=text("mutual")).ddl_if(
+            dialect="postgresql"
+        ),
     )
     
     def __repr__(self) -> str:
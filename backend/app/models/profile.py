@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Integer, Enum as SQLEnum
+from sqlalchemy import String, DateTime, Boolean, ForeignKey, Index, Integer, Enum as SQLEnum, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -48,5 +48,21 @@ class Profile(Base):
     # Relationships
     user = relationship("User", uselist=False, foreign_keys=[user_id])
     
+    # PostgreSQL-only indexes: the feed scans active profiles in id order,
+    # and created_at grows with insertion order so a BRIN index stays tiny
+    __table_args__ = (
+        Index(
+            "ix_profiles_active_id",
+            "id",
+            "user_id",
+            postgresql_where=text("is_active"),
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_profiles_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     def __repr__(self) -> str:
         return f"<Profile(id={self.id}, user_id={self.user_id}, display_name={self.display_name})>"
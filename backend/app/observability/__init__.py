@@ -0,0 +1 @@
+"""Request instrumentation and runtime diagnostics."""
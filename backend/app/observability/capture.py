@@ -0,0 +1,138 @@
+"""Opt-in capture of sanitized request traces for later replay."""
+
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from app.observability.context import RequestStats, on_request_finished
+
+
+# Path parameters holding user ids; they are pseudonymized like the caller
+USER_ID_PARAMS = frozenset({"target_id", "user_id"})
+# Query parameters recorded verbatim; anything else is dropped
+SAFE_QUERY_PARAMS = frozenset({"page", "size"})
+# Route prefixes never recorded
+EXCLUDED_PREFIXES = ("/admin", "/metrics", "/health", "<unmatched>")
+
+
+def pseudonym(user_id: int, secret: str) -> str:
+    """Return a stable, keyed pseudonym for a user id."""
+    return hmac.new(secret.encode(), str(user_id).encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def sanitize(stats: RequestStats, secret: str) -> Optional[Dict[str, Any]]:
+    """
+    Turn a finished request into a capture record, or None if it is excluded.
+
+    Only the route template, pseudonymized path parameters, allow-listed
+    query parameters, the caller's pseudonym, status and latency are kept;
+    bodies, headers and other query values never reach the file.
+    """
+    route = stats.route_name()
+    if route.startswith(EXCLUDED_PREFIXES):
+        return None
+    scope = stats.scope or {}
+    params = {}
+    for name, value in (scope.get("path_params") or {}).items():
+        if name in USER_ID_PARAMS:
+            try:
+                value = pseudonym(int(value), secret)
+            except (TypeError, ValueError):
+                continue
+        params[name] = str(value)
+    query = {
+        name: value
+        for name, value in parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+        if name in SAFE_QUERY_PARAMS
+    }
+    return {
+        "ts": round(time.time() - stats.duration, 6),
+        "method": stats.method,
+        "route": route,
+        "params": params,
+        "query": query,
+        "user": pseudonym(stats.user_id, secret) if stats.user_id is not None else None,
+        "status": stats.status_code,
+        "ms": round(stats.duration * 1000, 3),
+    }
+
+
+class TrafficCapture:
+    """
+    Buffer capture records and append them to ``traffic-<pid>.jsonl.gz``.
+
+    Each flush writes one complete gzip member, so the file stays readable
+    (``gzip`` concatenates members) and a crash loses at most one interval.
+    Every worker process writes its own file.
+    """
+
+    def __init__(self, directory: Path, secret: str, flush_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.secret = secret
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"traffic-{os.getpid()}.jsonl.gz"
+
+    def record(self, stats: RequestStats) -> None:
+        if self._thread is None:
+            return
+        record = sanitize(stats, self.secret)
+        if record is None:
+            return
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._buffer.append(line)
+            self.recorded += 1
+
+    def flush(self) -> int:
+        """Write buffered records; return how many were written."""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if lines:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+def install_traffic_capture(directory: str, secret: str, flush_interval: float = 1.0) -> TrafficCapture:
+    """Record every finished request into ``directory`` until ``stop()``."""
+    capture = TrafficCapture(Path(directory), secret, flush_interval)
+    on_request_finished(capture.record)
+    capture.start()
+    return capture
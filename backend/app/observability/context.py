@@ -0,0 +1,162 @@
+"""Request-scoped statistics shared by the instrumentation hooks."""
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class RequestStats:
+    """Counters collected while a single HTTP request is being served."""
+    method: str
+    path: str
+    route: Optional[str] = None
+    status_code: int = 0
+    started_at: float = 0.0
+    duration: float = 0.0
+    pool_checkouts: int = 0
+    db_queries: int = 0
+    db_time: float = 0.0
+    # Authenticated caller, once a dependency has resolved the session
+    user_id: Optional[int] = None
+    scope: Optional[Scope] = field(default=None, repr=False)
+
+    def route_name(self) -> str:
+        """Return the route template, resolving it from the scope if still running."""
+        if self.route is not None:
+            return self.route
+        return route_template(self.scope) if self.scope is not None else self.path
+
+
+@dataclass
+class RouteStats:
+    """Aggregated counters for every request served by one route template."""
+    requests: int = 0
+    pool_checkouts: int = 0
+    requests_with_checkout: int = 0
+    db_queries: int = 0
+    db_time: float = 0.0
+    max_db_queries: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "pool_checkouts": self.pool_checkouts,
+            "requests_with_checkout": self.requests_with_checkout,
+            "db_queries": self.db_queries,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "avg_db_queries": round(self.db_queries / self.requests, 2) if self.requests else 0,
+            "max_db_queries": self.max_db_queries,
+        }
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+_route_stats: Dict[str, RouteStats] = {}
+_route_stats_lock = threading.Lock()
+
+# Callbacks run with the finished RequestStats, in registration order
+_request_finished_hooks: List[Callable[[RequestStats], None]] = []
+
+# Requests currently being served by this process (event loop only)
+_in_flight = 0
+
+
+def route_template(scope: Scope) -> str:
+    """Return the matched route template (e.g. ``/feed/{target_id}/like``)."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path is not None else "<unmatched>"
+
+
+def on_request_finished(hook: Callable[[RequestStats], None]) -> None:
+    """Register a callback invoked once per finished request."""
+    if hook not in _request_finished_hooks:
+        _request_finished_hooks.append(hook)
+
+
+def requests_in_flight() -> int:
+    """Return the number of HTTP requests this process is serving right now."""
+    return _in_flight
+
+
+def get_route_stats() -> Dict[str, Dict[str, Any]]:
+    """Return a snapshot of per-route aggregates keyed by ``"METHOD template"``."""
+    with _route_stats_lock:
+        return {key: stats.as_dict() for key, stats in sorted(_route_stats.items())}
+
+
+def reset_route_stats() -> None:
+    """Forget all per-route aggregates."""
+    with _route_stats_lock:
+        _route_stats.clear()
+
+
+def _record(stats: RequestStats) -> None:
+    key = f"{stats.method} {stats.route}"
+    with _route_stats_lock:
+        aggregate = _route_stats.get(key)
+        if aggregate is None:
+            aggregate = _route_stats[key] = RouteStats()
+        aggregate.requests += 1
+        aggregate.pool_checkouts += stats.pool_checkouts
+        if stats.pool_checkouts:
+            aggregate.requests_with_checkout += 1
+        aggregate.db_queries += stats.db_queries
+        aggregate.db_time += stats.db_time
+        aggregate.max_db_queries = max(aggregate.max_db_queries, stats.db_queries)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that exposes a ``RequestStats`` for the current request.
+
+    The stats object lives in a context variable, so database event hooks
+    running on the event loop or in the threadpool update the right request.
+    Query totals are reported in ``X-DB-Queries`` and ``Server-Timing``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        stats = RequestStats(
+            method=scope["method"],
+            path=scope["path"],
+            started_at=time.perf_counter(),
+            scope=scope,
+        )
+        token = current_request.set(stats)
+        _in_flight += 1
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats.status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.db_queries))
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.db_queries} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight -= 1
+            stats.duration = time.perf_counter() - stats.started_at
+            stats.route = route_template(scope)
+            _record(stats)
+            for hook in _request_finished_hooks:
+                hook(stats)
+            current_request.reset(token)
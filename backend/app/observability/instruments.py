@@ -0,0 +1,137 @@
+"""Application metrics and the collectors that feed them."""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy.engine import Engine
+
+from app.cache import registered_caches
+from app.observability.context import RequestStats, on_request_finished, requests_in_flight
+from app.observability.metrics import MetricFamily, registry
+from app.observability.tracing import span
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0)
+
+http_requests = registry.counter(
+    "http_requests",
+    "HTTP requests served, by route template and status",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, by route template and status",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+db_queries = registry.counter(
+    "db_queries",
+    "SQL statements executed while serving requests",
+    ("method", "route"),
+)
+db_query_seconds = registry.counter(
+    "db_query_seconds",
+    "Time spent in SQL statements while serving requests",
+    ("method", "route"),
+)
+db_pool_checkouts = registry.counter(
+    "db_pool_checkouts",
+    "Connection pool checkouts made while serving requests",
+    ("method", "route"),
+)
+bcrypt_duration = registry.histogram(
+    "bcrypt_duration_seconds",
+    "Time spent hashing or verifying passwords",
+    ("operation",),
+    buckets=BCRYPT_BUCKETS,
+)
+
+
+def _record_request(stats: RequestStats) -> None:
+    status = str(stats.status_code or 500)
+    route = stats.route or "<unmatched>"
+    http_requests.inc(method=stats.method, route=route, status=status)
+    http_request_duration.observe(stats.duration, method=stats.method, route=route, status=status)
+    if stats.db_queries:
+        db_queries.inc(stats.db_queries, method=stats.method, route=route)
+        db_query_seconds.inc(stats.db_time, method=stats.method, route=route)
+    if stats.pool_checkouts:
+        db_pool_checkouts.inc(stats.pool_checkouts, method=stats.method, route=route)
+
+
+@contextmanager
+def time_bcrypt(operation: str) -> Iterator[None]:
+    """Observe the duration of a bcrypt hash or verify call."""
+    started = time.perf_counter()
+    try:
+        with span(f"bcrypt.{operation}"):
+            yield
+    finally:
+        bcrypt_duration.observe(time.perf_counter() - started, operation=operation)
+
+
+def _collect_in_flight() -> List[MetricFamily]:
+    return [
+        MetricFamily(
+            "http_requests_in_flight",
+            "gauge",
+            "HTTP requests currently being served",
+            [("http_requests_in_flight", {}, float(requests_in_flight()))],
+        )
+    ]
+
+
+def _collect_caches() -> List[MetricFamily]:
+    entries = MetricFamily(
+        "cache_entries", "gauge", "Entries held by each in-process cache", multiprocess_mode="pid"
+    )
+    hits = MetricFamily("cache_hits", "counter", "Cache lookups answered from memory")
+    misses = MetricFamily("cache_misses", "counter", "Cache lookups that fell through")
+    sizes = MetricFamily(
+        "cache_bytes", "gauge", "Bytes held by size-bounded caches", multiprocess_mode="pid"
+    )
+    ratios = MetricFamily(
+        "cache_hit_ratio", "gauge", "Share of lookups answered from memory since start", multiprocess_mode="pid"
+    )
+    for name, cache in registered_caches().items():
+        labels = {"cache": name}
+        entries.samples.append(("cache_entries", labels, float(len(cache))))
+        if hasattr(cache, "hits"):
+            hits.samples.append(("cache_hits_total", labels, float(cache.hits)))
+            misses.samples.append(("cache_misses_total", labels, float(cache.misses)))
+            lookups = cache.hits + cache.misses
+            if lookups:
+                ratios.samples.append(("cache_hit_ratio", labels, cache.hits / lookups))
+        if hasattr(cache, "total_bytes"):
+            sizes.samples.append(("cache_bytes", labels, float(cache.total_bytes)))
+    return [entries, hits, misses, sizes, ratios]
+
+
+def _pool_collector(engine: Engine):
+    def collect() -> List[MetricFamily]:
+        pool = engine.pool
+        families = []
+        for attribute, name, help in (
+            ("size", "db_pool_size", "Configured persistent connections"),
+            ("checkedout", "db_pool_checked_out", "Connections currently checked out"),
+            ("checkedin", "db_pool_checked_in", "Idle connections in the pool"),
+            ("overflow", "db_pool_overflow", "Connections opened above the pool size"),
+        ):
+            method = getattr(pool, attribute, None)
+            if callable(method):
+                # QueuePool reports overflow as negative until the pool is full
+                value = max(float(method()), 0.0)
+                families.append(MetricFamily(name, "gauge", help, [(name, {}, value)], "pid"))
+        return families
+
+    return collect
+
+
+def install_metrics(engine: Engine) -> None:
+    """Record request metrics and register scrape-time collectors."""
+    on_request_finished(_record_request)
+    registry.add_collector(_collect_in_flight)
+    registry.add_collector(_collect_caches)
+    registry.add_collector(_pool_collector(engine))
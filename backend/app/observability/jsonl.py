@@ -0,0 +1,32 @@
+"""Rotating JSON-lines log files shared by the diagnostics exporters."""
+
+import logging
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+
+class _LazyRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that creates its directory and file on the first record."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int) -> None:
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+def jsonl_logger(path: str, max_bytes: int, backups: int) -> logging.Logger:
+    """
+    Build a logger writing one pre-serialized JSON object per line to a rotating file.
+
+    Nothing is created on disk until the first line is logged.
+    """
+    jsonl = logging.getLogger(f"{__name__}.{path}")
+    jsonl.setLevel(logging.INFO)
+    jsonl.propagate = False
+    if not jsonl.handlers:
+        handler = _LazyRotatingFileHandler(path, max_bytes, backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        jsonl.addHandler(handler)
+    return jsonl
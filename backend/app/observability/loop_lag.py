@@ -0,0 +1,198 @@
+"""Event-loop lag monitor that reports which request blocked the loop."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from app.observability.context import RequestStats
+from app.observability.metrics import MetricFamily, registry
+
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the loop heartbeat was due and when it ran",
+    buckets=LAG_BUCKETS,
+)
+loop_stalls = registry.counter(
+    "event_loop_stalls",
+    "Times the event loop was blocked longer than the stall threshold",
+    ("method", "route"),
+)
+
+
+@dataclass
+class Stall:
+    """One period during which the event loop was blocked."""
+    started_at: float
+    lag: float = 0.0
+    route: Optional[str] = None
+    stack: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "lag_ms": round(self.lag * 1000, 3),
+            "route": self.route,
+            "stack": self.stack,
+        }
+
+
+def _blocking_request(frame: Any) -> Optional[RequestStats]:
+    """Find the request whose middleware frame is on the blocked stack."""
+    while frame is not None:
+        if frame.f_code.co_name == "__call__":
+            stats = frame.f_locals.get("stats")
+            if isinstance(stats, RequestStats):
+                return stats
+        frame = frame.f_back
+    return None
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop scheduling lag and capture the stacks of long stalls.
+
+    A heartbeat coroutine sleeps for ``interval`` and records how late it
+    wakes up. A watchdog thread notices when the heartbeat is overdue by
+    more than ``threshold`` and, while the loop is still blocked, captures
+    the loop thread's stack and the route of the request on it. When the
+    loop recovers the stall is logged with its full duration.
+    """
+
+    def __init__(self, interval: float, threshold: float, window: int = 1024, keep: int = 100) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._stalls: Deque[Stall] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        self._pending: Optional[Stall] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat(), name="loop-lag-heartbeat")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2 + 1)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._observe(max(now - due, 0.0), now)
+
+    def _observe(self, lag: float, now: float) -> None:
+        loop_lag.observe(lag)
+        with self._lock:
+            self._last_beat = now
+            self._samples.append(lag)
+            stall, self._pending = self._pending, None
+            if lag < self.threshold:
+                return
+            if stall is None:
+                # Blocked for less than a watchdog tick; no stack was captured
+                stall = Stall(started_at=time.time() - lag)
+            stall.lag = lag
+            self._stalls.append(stall)
+
+        method, _, route = (stall.route or "").partition(" ")
+        loop_stalls.inc(method=method or "-", route=route or "<unknown>")
+        logger.warning(
+            "Event loop blocked for %.1f ms%s%s",
+            lag * 1000,
+            f" by {stall.route}" if stall.route else "",
+            ":\n" + "".join(stall.stack) if stall.stack else "",
+        )
+
+    def _watch(self) -> None:
+        tick = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(tick):
+            with self._lock:
+                overdue = time.monotonic() - self._last_beat - self.interval
+                if overdue < self.threshold or self._pending is not None:
+                    continue
+            stall = self._capture(overdue)
+            with self._lock:
+                if self._pending is None:
+                    self._pending = stall
+
+    def _capture(self, overdue: float) -> Stall:
+        stall = Stall(started_at=time.time() - overdue)
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is not None:
+            request = _blocking_request(frame)
+            if request is not None:
+                stall.route = f"{request.method} {request.route_name()}"
+            stall.stack = traceback.format_stack(frame)
+        del frame
+        return stall
+
+    def quantiles(self) -> Dict[float, float]:
+        """Return lag quantiles over the most recent heartbeats."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {}
+        return {q: samples[min(int(q * len(samples)), len(samples) - 1)] for q in QUANTILES}
+
+    def stalls(self) -> List[Dict[str, Any]]:
+        """Return recent stalls, newest first."""
+        with self._lock:
+            return [stall.as_dict() for stall in reversed(self._stalls)]
+
+    def collect(self) -> List[MetricFamily]:
+        family = MetricFamily(
+            "event_loop_lag_quantile_seconds",
+            "gauge",
+            "Event loop lag quantiles over the recent heartbeat window",
+            multiprocess_mode="pid",
+        )
+        for q, value in self.quantiles().items():
+            family.samples.append((family.name, {"quantile": str(q)}, value))
+        return [family]
+
+
+monitor: Optional[LoopLagMonitor] = None
+
+
+def start_loop_lag_monitor(interval: float, threshold: float) -> LoopLagMonitor:
+    """Start the process-wide monitor on the running loop and export its quantiles."""
+    global monitor
+    if monitor is None:
+        monitor = LoopLagMonitor(interval=interval, threshold=threshold)
+        registry.add_collector(monitor.collect)
+    monitor.start()
+    return monitor
@@ -0,0 +1,287 @@
+"""Memory diagnostics: tracemalloc snapshots, gc state and ORM session sizes."""
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+import weakref
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+
+MAX_SNAPSHOTS = 10
+
+# Allocations made by the diagnostics themselves are noise in every diff
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+_lock = threading.Lock()
+
+# Every ORM session that has begun a transaction and is still referenced
+_sessions: "weakref.WeakSet[Session]" = weakref.WeakSet()
+
+
+def _track_session(session: Session, transaction: Any, connection: Any) -> None:
+    _sessions.add(session)
+
+
+def install_session_tracking() -> None:
+    """Track every ORM session once it begins, for identity-map reporting."""
+    if not event.contains(Session, "after_begin", _track_session):
+        event.listen(Session, "after_begin", _track_session)
+
+
+# tracemalloc -----------------------------------------------------------------
+
+
+def start_tracing(frames: int = 1) -> Dict[str, Any]:
+    """Start tracemalloc, keeping ``frames`` frames per allocation traceback."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return tracing_status()
+
+
+def stop_tracing() -> Dict[str, Any]:
+    """Stop tracemalloc and drop stored snapshots, releasing their memory."""
+    tracemalloc.stop()
+    with _lock:
+        _snapshots.clear()
+    return tracing_status()
+
+
+def tracing_status() -> Dict[str, Any]:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    with _lock:
+        names = list(_snapshots)
+    return {
+        "tracing": tracing,
+        "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+        "traced_bytes": current,
+        "peak_traced_bytes": peak,
+        "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+        "snapshots": names,
+    }
+
+
+def take_snapshot(name: str, limit: int = 20, group_by: str = "lineno") -> Dict[str, Any]:
+    """
+    Take and store a named snapshot.
+
+    Args:
+        name: Key to diff against later; an existing snapshot is replaced
+        limit: Number of top allocation sites to return
+        group_by: ``lineno``, ``filename`` or ``traceback``
+
+    Returns:
+        Total traced size and the largest allocation sites
+
+    Raises:
+        RuntimeError: If tracemalloc is not running
+    """
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    with _lock:
+        _snapshots.pop(name, None)
+        _snapshots[name] = snapshot
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    statistics = snapshot.statistics(group_by)
+    return {
+        "name": name,
+        "total_bytes": sum(stat.size for stat in statistics),
+        "blocks": sum(stat.count for stat in statistics),
+        "top": [_statistic(stat) for stat in statistics[:limit]],
+    }
+
+
+def diff_snapshots(before: str, after: str, limit: int = 20, group_by: str = "lineno") -> Dict[str, Any]:
+    """
+    Compare two stored snapshots.
+
+    Returns:
+        Net growth and the sites whose allocated size changed the most
+
+    Raises:
+        KeyError: If either snapshot does not exist
+    """
+    with _lock:
+        old, new = _snapshots[before], _snapshots[after]
+    differences = new.compare_to(old, group_by)
+    return {
+        "before": before,
+        "after": after,
+        "size_diff_bytes": sum(stat.size_diff for stat in differences),
+        "count_diff": sum(stat.count_diff for stat in differences),
+        "top": [_statistic_diff(stat) for stat in differences[:limit]],
+    }
+
+
+def clear_snapshots() -> None:
+    with _lock:
+        _snapshots.clear()
+
+
+def _location(traceback: tracemalloc.Traceback) -> Dict[str, Any]:
+    frame = traceback[0]
+    location: Dict[str, Any] = {"file": frame.filename, "line": frame.lineno}
+    if len(traceback) > 1:
+        location["traceback"] = [f"{f.filename}:{f.lineno}" for f in traceback]
+    return location
+
+
+def _statistic(stat: tracemalloc.Statistic) -> Dict[str, Any]:
+    return {**_location(stat.traceback), "size": stat.size, "count": stat.count}
+
+
+def _statistic_diff(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    return {
+        **_location(stat.traceback),
+        "size": stat.size,
+        "size_diff": stat.size_diff,
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+    }
+
+
+# gc, objects and process ------------------------------------------------------
+
+
+def gc_stats() -> Dict[str, Any]:
+    """Return per-generation counts, thresholds and collection totals."""
+    return {
+        "counts": list(gc.get_count()),
+        "thresholds": list(gc.get_threshold()),
+        "generations": gc.get_stats(),
+        "tracked_objects": len(gc.get_objects()),
+        "uncollectable": len(gc.garbage),
+        "frozen": gc.get_freeze_count(),
+    }
+
+
+def largest_types(limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Return the object types holding the most memory among gc-tracked objects.
+
+    Sizes are shallow (``sys.getsizeof``), so containers do not include the
+    objects they reference.
+    """
+    counts: Counter = Counter()
+    sizes: Counter = Counter()
+    for obj in gc.get_objects():
+        kind = type(obj)
+        name = f"{kind.__module__}.{kind.__qualname__}"
+        counts[name] += 1
+        try:
+            sizes[name] += sys.getsizeof(obj)
+        except TypeError:
+            pass
+    return [
+        {"type": name, "count": counts[name], "shallow_bytes": size}
+        for name, size in sizes.most_common(limit)
+    ]
+
+
+def session_stats() -> Dict[str, Any]:
+    """Return live ORM sessions and the objects held in their identity maps."""
+    sessions = list(_sessions)
+    by_class: Counter = Counter()
+    total = 0
+    for session in sessions:
+        for obj in list(session.identity_map.values()):
+            by_class[type(obj).__name__] += 1
+            total += 1
+    return {
+        "live_sessions": len(sessions),
+        "active_transactions": sum(1 for session in sessions if session.in_transaction()),
+        "identity_map_objects": total,
+        "identity_map_by_class": dict(by_class.most_common()),
+    }
+
+
+def process_memory() -> Dict[str, Any]:
+    """Return the current and peak resident set size of this process."""
+    peak_bytes: Optional[int] = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+    rss_bytes: Optional[int] = None
+    try:
+        with open("/proc/self/statm") as statm:
+            rss_bytes = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    return {"pid": os.getpid(), "rss_bytes": rss_bytes, "peak_rss_bytes": peak_bytes}
+
+
+def memory_report(types_limit: int = 20) -> Dict[str, Any]:
+    """Collect every memory figure into one JSON-ready report."""
+    return {
+        "process": process_memory(),
+        "tracemalloc": tracing_status(),
+        "gc": gc_stats(),
+        "sessions": session_stats(),
+        "largest_types": largest_types(types_limit),
+    }
+
+
+def measure_growth(
+    workload: Callable[[], Any],
+    iterations: int,
+    warmup: int = 10,
+    limit: int = 20,
+    group_by: str = "lineno",
+) -> Dict[str, Any]:
+    """
+    Run ``workload`` repeatedly and report memory it left behind.
+
+    The warmup runs first so caches, pools and lazy imports fill up before
+    the baseline snapshot. tracemalloc is started if needed and stopped
+    again afterwards if it was not running before.
+
+    Args:
+        workload: Callable exercising the code under test
+        iterations: Measured runs between the two snapshots
+        warmup: Unmeasured runs before the baseline
+        limit: Number of allocation sites to report
+        group_by: ``lineno``, ``filename`` or ``traceback``
+
+    Returns:
+        ``diff_snapshots`` output plus the growth per iteration
+    """
+    was_tracing = tracemalloc.is_tracing()
+    start_tracing()
+    try:
+        for _ in range(warmup):
+            workload()
+        take_snapshot("growth-before", limit=0, group_by=group_by)
+        for _ in range(iterations):
+            workload()
+        take_snapshot("growth-after", limit=0, group_by=group_by)
+        report = diff_snapshots("growth-before", "growth-after", limit=limit, group_by=group_by)
+    finally:
+        with _lock:
+            _snapshots.pop("growth-before", None)
+            _snapshots.pop("growth-after", None)
+        if not was_tracing:
+            tracemalloc.stop()
+    report["iterations"] = iterations
+    report["bytes_per_iteration"] = report["size_diff_bytes"] / iterations if iterations else 0.0
+    return report
@@ -0,0 +1,384 @@
+"""In-process metrics registry with Prometheus text exposition."""
+
+import json
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class MetricFamily:
+    """All samples of one metric, ready to be rendered or merged."""
+    name: str
+    type: str
+    help: str
+    samples: List[Sample] = field(default_factory=list)
+    # How gauges from several worker processes combine: "sum" or "pid"
+    multiprocess_mode: str = "sum"
+
+
+class _Metric(ABC):
+    """Base class holding per-label-set values behind one lock."""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def collect(self) -> MetricFamily:
+        """Return every sample of this metric."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every recorded value."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = list(self._values.items())
+        samples = [(f"{self.name}_total", self._labels(key), value) for key, value in items]
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        multiprocess_mode: str = "sum",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = list(self._values.items())
+        samples = [(self.name, self._labels(key), value) for key, value in items]
+        return MetricFamily(self.name, self.type, self.help, samples, self.multiprocess_mode)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)..., sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            slots = self._values.get(key)
+            if slots is None:
+                slots = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            slots[index] += 1
+            slots[-1] += value
+
+    def count(self, **labels: str) -> float:
+        slots = self._values.get(self._key(labels))
+        return sum(slots[:-1]) if slots else 0.0
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = [(key, list(slots)) for key, slots in self._values.items()]
+        samples: List[Sample] = []
+        for key, slots in items:
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets + (math.inf,), slots[:-1]):
+                cumulative += hits
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, slots[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors for one process."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        multiprocess_mode: str = "sum",
+    ) -> Gauge:
+        return self._register(Gauge(name, help, labelnames, multiprocess_mode))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def add_collector(self, collector: Collector) -> None:
+        """Register a callback that produces metric families at scrape time."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        families = [metric.collect() for metric in list(self._metrics.values())]
+        for collector in list(self._collectors):
+            families.extend(collector())
+        return families
+
+    def clear(self) -> None:
+        """Reset every metric value (collectors are kept)."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+
+registry = MetricsRegistry()
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if float(value).is_integer():
+        return f"{value:.1f}"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """Render metric families in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for family in sorted(families, key=lambda f: f.name):
+        if not family.samples:
+            continue
+        lines.append(f"# HELP {family.name} {_escape(family.help)}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for name, labels, value in family.samples:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Multi-process support ------------------------------------------------------
+#
+# With several uvicorn workers, each process periodically dumps its own
+# samples to ``<metrics_dir>/metrics_<pid>.json``. Whichever worker serves
+# /metrics merges every file, so a scrape sees the whole host.
+
+
+def _snapshot_path(directory: Path, pid: int) -> Path:
+    return directory / f"metrics_{pid}.json"
+
+
+def write_snapshot(directory: Path, families: Optional[List[MetricFamily]] = None) -> None:
+    """Atomically write this process's samples into ``directory``."""
+    directory.mkdir(parents=True, exist_ok=True)
+    pid = os.getpid()
+    payload = {
+        "pid": pid,
+        "written_at": time.time(),
+        "families": [
+            {
+                "name": family.name,
+                "type": family.type,
+                "help": family.help,
+                "mode": family.multiprocess_mode,
+                "samples": family.samples,
+            }
+            for family in (families if families is not None else registry.collect())
+        ],
+    }
+    target = _snapshot_path(directory, pid)
+    temporary = target.with_suffix(f".{threading.get_ident()}.tmp")
+    temporary.write_text(json.dumps(payload))
+    os.replace(temporary, target)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(directory: Path) -> List[MetricFamily]:
+    """
+    Merge the snapshots of every worker that has written to ``directory``.
+
+    Counters and histograms are summed, including those of exited workers,
+    so totals never go backwards. Gauges only count live workers; gauges in
+    ``pid`` mode keep one series per worker.
+    """
+    merged: Dict[str, MetricFamily] = {}
+    values: Dict[str, Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]] = {}
+
+    for path in sorted(directory.glob("metrics_*.json")):
+        try:
+            payload = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        pid = payload["pid"]
+        alive = _pid_alive(pid)
+        for raw in payload["families"]:
+            if raw["type"] == "gauge" and not alive:
+                continue
+            family = merged.get(raw["name"])
+            if family is None:
+                family = merged[raw["name"]] = MetricFamily(
+                    raw["name"], raw["type"], raw["help"], multiprocess_mode=raw["mode"]
+                )
+                values[raw["name"]] = {}
+            bucket = values[raw["name"]]
+            for sample_name, labels, value in raw["samples"]:
+                if raw["type"] == "gauge" and raw["mode"] == "pid":
+                    labels = {**labels, "pid": str(pid)}
+                key = (sample_name, tuple(sorted(labels.items())))
+                bucket[key] = bucket.get(key, 0.0) + value
+
+    for name, family in merged.items():
+        family.samples = [
+            (sample_name, dict(labels), value)
+            for (sample_name, labels), value in values[name].items()
+        ]
+    return list(merged.values())
+
+
+class SnapshotWriter:
+    """Background thread flushing this process's metrics to the shared directory."""
+
+    def __init__(self, directory: Path, interval: float) -> None:
+        self.directory = directory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        write_snapshot(self.directory)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                write_snapshot(self.directory)
+            except OSError:
+                pass
@@ -0,0 +1,42 @@
+"""Connection pool checkout accounting."""
+
+import threading
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.observability.context import current_request
+
+
+_lock = threading.Lock()
+_totals = {"checkouts": 0, "checkouts_outside_request": 0}
+
+
+def _on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+    stats = current_request.get()
+    with _lock:
+        _totals["checkouts"] += 1
+        if stats is None:
+            _totals["checkouts_outside_request"] += 1
+    if stats is not None:
+        stats.pool_checkouts += 1
+
+
+def install_pool_listeners(engine: Engine) -> None:
+    """Count pool checkouts globally and against the current request."""
+    if not event.contains(engine, "checkout", _on_checkout):
+        event.listen(engine, "checkout", _on_checkout)
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Return checkout totals plus the pool's own occupancy figures."""
+    pool = engine.pool
+    with _lock:
+        status: Dict[str, Any] = dict(_totals)
+    status["pool_class"] = type(pool).__name__
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
@@ -0,0 +1,303 @@
+"""Sampling profiler producing collapsed stacks and speedscope profiles."""
+
+import asyncio
+import itertools
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+
+# Leaf frames meaning "this thread is waiting, not working"
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("base_events.py", "_run_once"),
+}
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class RequestScope:
+    """
+    The threads working for one profiled request.
+
+    The event-loop thread counts only while the request's own task is
+    running on it; a worker thread counts while it runs the request's
+    route function (see ``request_thread``).
+    """
+    loop: asyncio.AbstractEventLoop
+    loop_thread: int
+    task: Optional["asyncio.Task[Any]"]
+    workers: Set[int] = field(default_factory=set)
+
+    def includes(self, thread_id: int) -> bool:
+        if thread_id == self.loop_thread:
+            return asyncio.current_task(self.loop) is self.task
+        return thread_id in self.workers
+
+
+def _frame_label(code: Any) -> str:
+    """Return a compact ``module/file.py:function`` label for a code object."""
+    path = code.co_filename
+    for marker in (f"{os.sep}site-packages{os.sep}", f"{os.sep}backend{os.sep}"):
+        index = path.rfind(marker)
+        if index != -1:
+            path = path[index + len(marker):]
+            break
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{code.co_name}".replace(";", ",")
+
+
+def _collapse(frame: Any) -> Optional[str]:
+    """Return a root-first ``a;b;c`` stack for ``frame``, or None if idle."""
+    leaf = frame.f_code
+    if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+        return None
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+@dataclass
+class Profile:
+    """Samples collected for one profiling session."""
+    id: int
+    name: str
+    interval: float
+    started_at: float = field(default_factory=time.time)
+    deadline: Optional[float] = None
+    stopped_at: Optional[float] = None
+    stacks: Counter = field(default_factory=Counter)
+    samples: int = 0
+    scope: Optional[RequestScope] = None
+
+    def collapsed(self) -> str:
+        """Render in Brendan Gregg's collapsed format, one ``stack count`` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self) -> Dict[str, Any]:
+        """Render as a speedscope sampled profile."""
+        frame_index: Dict[str, int] = {}
+        frames: List[Dict[str, str]] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.stacks.most_common():
+            indices = []
+            for label in stack.split(";"):
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    file, _, name = label.rpartition(":")
+                    frames.append({"name": name, "file": file})
+                indices.append(frame_index[label])
+            samples.append(indices)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "anecdote-backend",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "running": self.stopped_at is None,
+            "scope": "process" if self.scope is None else "request",
+        }
+
+
+_request_profile: ContextVar[Optional[Profile]] = ContextVar("request_profile", default=None)
+
+
+@contextmanager
+def request_thread() -> Iterator[None]:
+    """Count the calling thread towards the profiled request, if any, while the block runs."""
+    profile = _request_profile.get()
+    if profile is None or profile.scope is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profile.scope.workers.add(thread_id)
+    try:
+        yield
+    finally:
+        profile.scope.workers.discard(thread_id)
+
+
+class SamplingProfiler:
+    """
+    Sample the Python stacks of every thread from a background thread.
+
+    The sampler thread only exists while at least one profile is running,
+    so an idle profiler costs nothing. Every tick reads
+    ``sys._current_frames()`` once and adds each busy thread's stack to
+    the running profiles: all of them for process-wide profiles, only the
+    request's own threads for request profiles. Threads parked in waits
+    and selects are skipped.
+    """
+
+    def __init__(self, interval: float, keep: int = 20) -> None:
+        self.interval = interval
+        self.keep = keep
+        self._active: Dict[int, Profile] = {}
+        self._finished: "OrderedDict[int, Profile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._active)
+
+    def start(
+        self, name: str, seconds: Optional[float] = None, scope: Optional[RequestScope] = None
+    ) -> Profile:
+        """Begin a profile, optionally stopping itself after ``seconds`` or limited to ``scope``."""
+        profile = Profile(next(_ids), name, self.interval, scope=scope)
+        if seconds is not None:
+            profile.deadline = time.monotonic() + seconds
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile) -> Profile:
+        """Finish a profile and keep it for later retrieval."""
+        with self._lock:
+            self._finish(profile)
+        return profile
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        with self._lock:
+            return self._active.get(profile_id) or self._finished.get(profile_id)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            everything = list(self._finished.values()) + list(self._active.values())
+        return [profile.summary() for profile in everything]
+
+    def _finish(self, profile: Profile) -> None:
+        if self._active.pop(profile.id, None) is None:
+            return
+        profile.stopped_at = time.time()
+        self._finished[profile.id] = profile
+        while len(self._finished) > self.keep:
+            self._finished.popitem(last=False)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                for profile in list(self._active.values()):
+                    if profile.deadline is not None and profile.deadline <= now:
+                        self._finish(profile)
+                if not self._active:
+                    self._thread = None
+                    return
+                active = list(self._active.values())
+
+            stacks: List[Tuple[int, str]] = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack is not None:
+                    stacks.append((thread_id, stack))
+            del frame
+
+            for profile in active:
+                profile.samples += 1
+                scope = profile.scope
+                profile.stacks.update(
+                    stack for thread_id, stack in stacks if scope is None or scope.includes(thread_id)
+                )
+
+
+profiler = SamplingProfiler(interval=settings.profiler_interval_ms / 1000)
+
+
+class ProfilerMiddleware:
+    """
+    Profile single requests that send ``X-Profile: <admin token>``.
+
+    Only the request's own stacks are kept: its task on the event loop
+    and the worker thread running its route function. The response
+    carries ``X-Profile-Id``; fetch the result from
+    ``/admin/profiler/{id}``. Requests without the header pass
+    straight through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.admin_token:
+            await self.app(scope, receive, send)
+            return
+
+        requested = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                requested = value.decode("latin-1")
+                break
+        if requested is None or not secrets.compare_digest(requested, settings.admin_token):
+            await self.app(scope, receive, send)
+            return
+
+        request_scope = RequestScope(
+            loop=asyncio.get_running_loop(), loop_thread=threading.get_ident(), task=asyncio.current_task()
+        )
+        profile = profiler.start(f"{scope['method']} {scope['path']}", scope=request_scope)
+        token = _request_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profiler.stop(profile)
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Profile-Id", str(profile.id))
+                headers.append("X-Profile-Samples", str(profile.samples))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_profile.reset(token)
+            profiler.stop(profile)
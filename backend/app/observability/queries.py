@@ -0,0 +1,128 @@
+"""SQL statement counting and timing."""
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.observability.context import RequestStats, current_request, on_request_finished
+
+
+logger = logging.getLogger(__name__)
+
+_START_KEY = "query_start_time"
+
+# Callbacks run after every statement with its timing, in registration order
+StatementHook = Callable[[Any, str, Any, bool, float], None]
+_statement_hooks: List[StatementHook] = []
+
+
+def on_statement_executed(hook: StatementHook) -> None:
+    """
+    Register a callback run after each statement on instrumented engines.
+
+    The hook receives ``(connection, statement, parameters, executemany,
+    duration_seconds)`` and runs synchronously on the executing thread.
+    """
+    if hook not in _statement_hooks:
+        _statement_hooks.append(hook)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    conn.info[_START_KEY] = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    started = conn.info.pop(_START_KEY, None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    stats = current_request.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += duration
+    for hook in _statement_hooks:
+        hook(conn, statement, parameters, executemany, duration)
+
+
+def install_query_listeners(engine: Engine) -> None:
+    """Attribute every statement's count and duration to the current request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    on_request_finished(check_query_budget)
+
+
+def check_query_budget(stats: RequestStats) -> None:
+    """Log a warning if a finished request ran more queries than allowed."""
+    budget = settings.query_budget
+    if budget and stats.db_queries > budget:
+        logger.warning(
+            "Query budget exceeded: %s %s ran %d queries in %.1f ms (budget %d)",
+            stats.method,
+            stats.route or stats.path,
+            stats.db_queries,
+            stats.db_time * 1000,
+            budget,
+        )
+
+
+@dataclass
+class QueryCounter:
+    """Statements captured by ``count_queries``."""
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """
+    Record every statement executed on ``engine`` inside the block.
+
+    Args:
+        engine: Engine to watch (defaults to the application engine)
+
+    Yields:
+        Counter whose ``statements`` grows as queries run
+    """
+    if engine is None:
+        from app.db.session import engine as app_engine
+
+        engine = app_engine
+
+    counter = QueryCounter()
+
+    def _record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """
+    Fail if the block executes more than ``limit`` statements.
+
+    Intended for tests guarding against N+1 regressions.
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        executed = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {limit} queries, got {counter.count}:\n{executed}")
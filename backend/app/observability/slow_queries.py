@@ -0,0 +1,287 @@
+"""Slow-query recorder with query-plan capture."""
+
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.observability.context import current_request
+from app.observability.jsonl import jsonl_logger
+from app.observability.queries import on_statement_executed
+
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Replace literals and placeholders with ``?`` and collapse ``IN`` lists."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def fingerprint(statement: str) -> str:
+    """Return a short stable identifier shared by structurally equal statements."""
+    return hashlib.sha1(normalize_sql(statement).encode()).hexdigest()[:16]
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> Any:
+    """Describe bound parameters by type only, never by value."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "row": parameter_shape(first, False)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def detects_full_scan(plan: List[str]) -> bool:
+    """Return True if a query plan scans a whole table instead of an index."""
+    for line in plan:
+        detail = line.strip()
+        if "Seq Scan" in detail:
+            return True
+        # SQLite: "SCAN profiles" is a full scan, "SCAN profiles USING INDEX ..." is not
+        if detail.startswith("SCAN ") and " USING " not in detail and "CONSTANT ROW" not in detail:
+            return True
+    return False
+
+
+@dataclass
+class SlowQuery:
+    """Aggregate of every slow execution sharing one fingerprint."""
+    fingerprint: str
+    sql: str
+    example: str
+    parameters: Any
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    routes: Dict[str, int] = field(default_factory=dict)
+    plan: Optional[List[str]] = None
+    full_scan: Optional[bool] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "sql": self.sql,
+            "example": self.example,
+            "parameters": self.parameters,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_seen": self.last_seen,
+            "routes": dict(self.routes),
+            "plan": self.plan,
+            "full_scan": self.full_scan,
+        }
+
+
+class SlowQueryRecorder:
+    """
+    Capture statements slower than a threshold.
+
+    Repeats collapse onto one entry per fingerprint. The first time a
+    fingerprint is seen its plan is queued for capture with ``EXPLAIN QUERY
+    PLAN`` (SQLite) or ``EXPLAIN`` (PostgreSQL). A background thread runs
+    the queue on a separate, unpooled connection, so the request that hit
+    the slow query neither waits for the plan nor shares its transaction
+    or the pool with it. When the queue is full the plan is skipped and
+    captured on the fingerprint's next slow execution.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        threshold_ms: float,
+        max_entries: int = 500,
+        log_path: Optional[str] = None,
+        explain: bool = True,
+        explain_queue_size: int = 100,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.max_entries = max_entries
+        self.explain = explain and engine.url.database not in (None, "", ":memory:")
+        self._entries: "OrderedDict[str, SlowQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._explains: "queue.Queue[Tuple[SlowQuery, str, Any]]" = queue.Queue(maxsize=explain_queue_size)
+        self._explaining: Set[str] = set()
+        self._explainer: Optional[threading.Thread] = None
+        self._dialect = engine.dialect.name
+        self._side_engine = create_engine(
+            engine.url, poolclass=NullPool, **_side_connect_args(engine)
+        )
+        self._log = (
+            jsonl_logger(log_path, settings.slow_query_log_max_bytes, settings.slow_query_log_backups)
+            if log_path
+            else None
+        )
+
+    def record(
+        self,
+        connection: Any,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration: float,
+    ) -> None:
+        duration_ms = duration * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        key = fingerprint(statement)
+        stats = current_request.get()
+        route = f"{stats.method} {stats.route_name()}" if stats is not None else "<background>"
+        shape = parameter_shape(parameters, executemany)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = SlowQuery(key, normalize_sql(statement), statement, shape)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry.count += 1
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.last_seen = time.time()
+            entry.routes[route] = entry.routes.get(route, 0) + 1
+            wants_plan = (
+                self.explain
+                and not executemany
+                and entry.plan is None
+                and key not in self._explaining
+                and _explainable(statement)
+            )
+            if wants_plan:
+                self._explaining.add(key)
+
+        if wants_plan:
+            self._queue_explain(entry, statement, parameters)
+
+        if self._log is not None:
+            self._log.info(json.dumps({
+                "ts": time.time(),
+                "fingerprint": key,
+                "duration_ms": round(duration_ms, 3),
+                "route": route,
+                "sql": statement,
+                "parameters": shape,
+                "full_scan": entry.full_scan,
+            }, default=str))
+
+    def flush(self) -> None:
+        """Block until every queued plan has been captured."""
+        self._explains.join()
+
+    def _queue_explain(self, entry: SlowQuery, statement: str, parameters: Any) -> None:
+        try:
+            self._explains.put_nowait((entry, statement, parameters))
+        except queue.Full:
+            with self._lock:
+                self._explaining.discard(entry.fingerprint)
+            return
+        with self._lock:
+            if self._explainer is None:
+                self._explainer = threading.Thread(
+                    target=self._run_explains, name="slow-query-explain", daemon=True
+                )
+                self._explainer.start()
+
+    def _run_explains(self) -> None:
+        while True:
+            entry, statement, parameters = self._explains.get()
+            try:
+                plan = self._explain(statement, parameters)
+                with self._lock:
+                    entry.plan = plan
+                    entry.full_scan = detects_full_scan(plan)
+                    self._explaining.discard(entry.fingerprint)
+                if self._log is not None:
+                    self._log.info(json.dumps({
+                        "ts": time.time(),
+                        "fingerprint": entry.fingerprint,
+                        "plan": plan,
+                        "full_scan": entry.full_scan,
+                    }))
+            finally:
+                self._explains.task_done()
+
+    def _explain(self, statement: str, parameters: Any) -> List[str]:
+        prefix = "EXPLAIN QUERY PLAN " if self._dialect == "sqlite" else "EXPLAIN "
+        try:
+            with self._side_engine.connect() as side:
+                rows = side.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+        except Exception as exc:  # pragma: no cover - plan capture is best effort
+            logger.debug("EXPLAIN failed for slow query: %s", exc)
+            return [f"<explain failed: {exc}>"]
+        if self._dialect == "sqlite":
+            # (id, parent, notused, detail)
+            return [str(row[-1]) for row in rows]
+        return [str(row[0]) for row in rows]
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return aggregates ordered by total time spent, slowest first."""
+        with self._lock:
+            entries = [entry.as_dict() for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _explainable(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+def _side_connect_args(engine: Engine) -> Dict[str, Any]:
+    if engine.dialect.name == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {}
+
+
+recorder: Optional[SlowQueryRecorder] = None
+
+
+def install_slow_query_recorder(engine: Engine) -> Optional[SlowQueryRecorder]:
+    """Attach the slow-query recorder to ``engine`` when enabled in settings."""
+    global recorder
+    if settings.slow_query_threshold_ms <= 0:
+        return None
+    if recorder is None:
+        recorder = SlowQueryRecorder(
+            engine,
+            threshold_ms=settings.slow_query_threshold_ms,
+            max_entries=settings.slow_query_max_entries,
+            log_path=settings.slow_query_log_path,
+            explain=settings.slow_query_explain,
+            explain_queue_size=settings.slow_query_explain_queue_size,
+        )
+        on_statement_executed(recorder.record)
+    return recorder
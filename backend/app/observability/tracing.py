@@ -0,0 +1,363 @@
+"""In-process request tracing with head and tail sampling."""
+
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.observability.context import route_template
+from app.observability.jsonl import jsonl_logger
+from app.observability.profiler import request_thread
+from app.observability.queries import on_statement_executed
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+logger = logging.getLogger(__name__)
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    """One timed operation inside a trace."""
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float
+    end: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class Trace:
+    """All spans recorded while serving one request."""
+    trace_id: str
+    name: str
+    started_at: float
+    start: float
+    sampled: bool
+    max_spans: int
+    duration: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+    dropped_spans: int = 0
+
+    def add(self, span: Span) -> None:
+        # list.append is atomic, so threadpool dependencies can add spans too
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "sampled": self.sampled,
+            "spans": len(self.spans),
+            **self.attributes,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = self.summary()
+        data["dropped_spans"] = self.dropped_spans
+        data["spans"] = [
+            {
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "start_ms": round((span.start - self.start) * 1000, 3),
+                "duration_ms": round((span.end - span.start) * 1000, 3),
+                "attributes": span.attributes,
+                "error": span.error,
+            }
+            for span in sorted(self.spans, key=lambda span: span.start)
+        ]
+        return data
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    Outside a traced request this yields ``None`` and records nothing.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(
+        name,
+        next(_span_ids),
+        parent.span_id if parent is not None else None,
+        time.perf_counter(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def record_span(name: str, duration: float, **attributes: Any) -> None:
+    """Add an already finished operation that ended just now."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    parent = _current_span.get()
+    end = time.perf_counter()
+    trace.add(Span(
+        name,
+        next(_span_ids),
+        parent.span_id if parent is not None else None,
+        end - duration,
+        end,
+        attributes,
+    ))
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Decorate a function so every call inside a traced request gets a span.
+
+    The span is named ``module.function`` unless ``name`` is given. Works
+    for plain and ``async`` functions, including FastAPI dependencies.
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class TraceStore:
+    """Ring buffer of kept traces, optionally mirrored to a JSONL file."""
+
+    def __init__(self, size: int, log_path: Optional[str] = None) -> None:
+        self._traces: Deque[Trace] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._log = (
+            jsonl_logger(log_path, settings.trace_log_max_bytes, settings.trace_log_backups)
+            if log_path
+            else None
+        )
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+        if self._log is not None:
+            self._log.info(json.dumps(trace.as_dict(), default=str))
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            for trace in self._traces:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def recent(self, limit: int = 50, min_duration: float = 0.0, route: Optional[str] = None) -> List[Trace]:
+        """Return the newest kept traces, optionally filtered."""
+        with self._lock:
+            traces = list(reversed(self._traces))
+        selected = [
+            trace for trace in traces
+            if trace.duration >= min_duration and (route is None or trace.attributes.get("route") == route)
+        ]
+        return selected[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+store: Optional[TraceStore] = None
+
+
+def should_keep(trace: Trace, status_code: int) -> bool:
+    """Tail sampling: keep head-sampled traces plus every slow or failed one."""
+    return (
+        trace.sampled
+        or trace.duration * 1000 >= settings.trace_slow_ms
+        or status_code >= 500
+    )
+
+
+class TracingMiddleware:
+    """
+    Open a trace for every HTTP request and keep it if sampled.
+
+    Every request is traced so that tail sampling can still keep slow ones;
+    spans are cheap dataclasses and unkept traces are simply dropped. The
+    trace id is returned in ``X-Trace-Id``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or store is None:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(
+            trace_id=os.urandom(8).hex(),
+            name=f"{scope['method']} {scope['path']}",
+            started_at=time.time(),
+            start=time.perf_counter(),
+            sampled=random.random() < settings.trace_sample_rate,
+            max_spans=settings.trace_max_spans,
+        )
+        trace_token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Trace-Id", trace.trace_id)
+            await send(message)
+
+        try:
+            with span("http.request") as root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(trace_token)
+            trace.duration = time.perf_counter() - trace.start
+            route = route_template(scope)
+            trace.name = f"{scope['method']} {route}"
+            trace.attributes.update(method=scope["method"], route=route, status=status_code)
+            root.attributes.update(trace.attributes)
+            if should_keep(trace, status_code):
+                store.add(trace)
+
+
+def _trace_statement(conn: Any, statement: str, parameters: Any, executemany: bool, duration: float) -> None:
+    if _current_trace.get() is not None:
+        record_span("db.query", duration, statement=statement[:500], executemany=executemany)
+
+
+def _endpoint_span(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a route function in an ``endpoint`` span, keeping its signature and sync/async kind."""
+    function = getattr(endpoint, "__name__", None)
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            with span("endpoint", function=function):
+                return await endpoint(*args, **kwargs)
+
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+        # Runs on a threadpool worker, which a request profile only samples from here on
+        with span("endpoint", function=function), request_thread():
+            return endpoint(*args, **kwargs)
+
+    return sync_endpoint
+
+
+class TracedRoute(APIRoute):
+    """
+    Route class recording an ``endpoint`` span around the route function.
+
+    Set as ``route_class`` on every router. FastAPI reads the function's
+    signature through ``functools.wraps``, so parameters and dependencies
+    are unchanged; outside a traced request the span is a no-op. Sync
+    route functions also count their worker thread towards a request
+    profile for the duration of the call.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _endpoint_span(endpoint), **kwargs)
+
+
+def _trace_fastapi() -> bool:
+    """
+    Wrap FastAPI's response-model validation in a span.
+
+    FastAPI has no public hook around it, so this patches
+    ``fastapi.routing.serialize_response``. Returns False, with a warning,
+    if a FastAPI upgrade removed it.
+    """
+    import fastapi.routing as routing
+
+    serialize = getattr(routing, "serialize_response", None)
+    if serialize is None:
+        logger.warning("fastapi.routing.serialize_response is missing; response.validate spans are disabled")
+        return False
+    if not hasattr(serialize, "__wrapped__"):
+        @functools.wraps(serialize)
+        async def traced_serialize(**kwargs: Any) -> Any:
+            with span("response.validate"):
+                return await serialize(**kwargs)
+
+        routing.serialize_response = traced_serialize
+    return True
+
+
+def install_tracing() -> Optional[TraceStore]:
+    """Create the trace store and hook SQL and FastAPI internals, if enabled."""
+    global store
+    if not settings.tracing_enabled:
+        return None
+    if store is None:
+        store = TraceStore(settings.trace_buffer_size, settings.trace_log_path)
+        on_statement_executed(_trace_statement)
+        _trace_fastapi()
+    return store
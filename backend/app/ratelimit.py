@@ -0,0 +1,310 @@
+"""
+Per-key rate limiting: swipes per user, failed logins per email and address.
+
+Limits use GCRA (the generic cell rate algorithm), a token bucket kept as
+one timestamp per key: the *theoretical arrival time* (TAT) at which the
+key's bucket is full again. Each counted event moves it one emission
+interval (``60 / per_minute`` seconds) later; an event that would put it
+more than ``burst`` intervals ahead of now is refused. That allows bursts
+of ``burst`` events and a sustained ``per_minute`` rate, with no refill
+timer.
+
+Keys live in a fixed open-addressing table of two int64 words each (key,
+TAT in unix microseconds). A slot whose TAT has passed belongs to a key
+with a full bucket, which is the same as having no entry, so it is reused
+by the next key to need one: idle keys expire without a sweep, and memory
+is 16 bytes per recently active key. When every slot a key can probe is
+held by an active key, the event is allowed untracked.
+
+Unattached, a table is private to the worker. ``attach`` moves it into a
+``SharedMemory`` segment so every worker on the host enforces one budget;
+updates then take an ``flock`` on a lock file around the read-modify-write.
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import IO, Iterator, NamedTuple, Optional, Tuple
+
+from app.cache.shared import fcntl, open_segment
+from app.config import settings
+from app.observability.metrics import registry
+
+
+_MAGIC = 0x53574950  # "SWIP"
+_LAYOUT_VERSION = 1
+# Header words: magic, layout version, slots
+_HEADER_WORDS = 4
+# Slot words: key (0 = never used), TAT (unix µs)
+_SLOT_WORDS = 2
+# Slots probed per key before giving up on tracking it
+_PROBES = 32
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+rate_limit_checks = registry.counter(
+    "rate_limit_checks",
+    "Events counted by each rate limiter, by result",
+    ("limiter", "result"),
+)
+login_throttled = registry.counter(
+    "login_throttled",
+    "Login attempts refused before any password check",
+)
+
+
+class Decision(NamedTuple):
+    """Outcome of one ``RateLimiter.check``."""
+    allowed: bool
+    limit: int
+    # Events left right now, after this one
+    remaining: int
+    # Seconds until the bucket is full again
+    reset_after: float
+    # Seconds until the next event is allowed (0 when allowed)
+    retry_after: float
+
+
+def text_key(text: str) -> int:
+    """Map a string (an email, an address) to a table key."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little", signed=True) or 1
+
+
+class RateLimiter:
+    """
+    GCRA limiter over a fixed table of per-key timestamps.
+
+    Keys are non-zero int64 values: user ids, or ``text_key`` of a string.
+    ``name`` labels the ``rate_limit_checks`` metric.
+    """
+
+    def __init__(self, name: str, *, per_minute: float, burst: int, slots: int) -> None:
+        self.name = name
+        self.configure(per_minute=per_minute, burst=burst)
+        self.slots = 1 << max(slots - 1, 1).bit_length()
+        self.shm: Optional[SharedMemory] = None
+        self._words = memoryview(bytearray((_HEADER_WORDS + self.slots * _SLOT_WORDS) * 8)).cast("q")
+        self._lock = threading.Lock()
+        self._lock_file: Optional[IO] = None
+
+    def configure(self, *, per_minute: float, burst: int) -> None:
+        self.burst = burst
+        self._interval = int(60_000_000 / per_minute)
+        self._tolerance = self._interval * burst
+
+    @property
+    def shared(self) -> bool:
+        return self.shm is not None
+
+    def attach(self, name: str, lock_path: str) -> None:
+        """Move the table into the named segment, creating it if no worker on this host has yet."""
+        self.detach()
+        shm, created = open_segment(name, (_HEADER_WORDS + self.slots * _SLOT_WORDS) * 8, _MAGIC)
+        words = shm.buf.cast("q")
+        if created:
+            words[1] = _LAYOUT_VERSION
+            words[2] = self.slots
+            words[0] = _MAGIC
+        elif (words[1], words[2]) != (_LAYOUT_VERSION, self.slots):
+            words.release()
+            shm.close()
+            raise ValueError(f"Shared memory segment {name!r} has a different layout; unlink it or rename")
+        self.shm = shm
+        self._words = words
+        self._lock_file = open(lock_path, "a+") if fcntl is not None else None
+
+    def detach(self) -> None:
+        """Go back to a private, empty table; the segment stays for the other workers."""
+        if self.shm is None:
+            return
+        self._words.release()
+        self.shm.close()
+        self.shm = None
+        self._words = memoryview(bytearray((_HEADER_WORDS + self.slots * _SLOT_WORDS) * 8)).cast("q")
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def unlink(self) -> None:
+        """Detach and remove the segment from the host."""
+        if self.shm is None:
+            return
+        name = self.shm.name
+        self.detach()
+        try:
+            shm = SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # flock excludes other processes; threads of this one share its lock
+        with self._lock:
+            if self._lock_file is None:
+                yield
+                return
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _find(self, key: int, now: int) -> Optional[int]:
+        """Return the word offset of ``key``'s slot, or of a slot it may take."""
+        words = self._words
+        mask = self.slots - 1
+        index = (key * _HASH_MULTIPLIER >> 16) & mask
+        free = None
+        for _ in range(_PROBES):
+            at = _HEADER_WORDS + index * _SLOT_WORDS
+            owner = words[at]
+            if owner == key:
+                return at
+            if owner == 0:
+                # Slots are reused but never emptied, so the key is not further on
+                return at if free is None else free
+            if free is None and words[at + 1] <= now:
+                free = at
+            index = (index + 1) & mask
+        return free
+
+    def check(self, key: int, now: Optional[float] = None) -> Decision:
+        """Count one event for ``key`` and return whether it is allowed."""
+        now_us = int((time.time() if now is None else now) * 1_000_000)
+        # Inlined _locked(): this runs on every request
+        with self._lock:
+            lock_file = self._lock_file
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                decision, result = self._take(key, now_us, consume=True)
+            finally:
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        rate_limit_checks.inc(limiter=self.name, result=result)
+        return decision
+
+    def peek(self, key: int, now: Optional[float] = None) -> Decision:
+        """Return what ``check`` would decide for ``key``, without counting an event."""
+        now_us = int((time.time() if now is None else now) * 1_000_000)
+        with self._locked():
+            return self._take(key, now_us, consume=False)[0]
+
+    def refund(self, key: int, now: Optional[float] = None) -> None:
+        """Give back one event counted by ``check``, e.g. for a request that was then rejected."""
+        now_us = int((time.time() if now is None else now) * 1_000_000)
+        with self._locked():
+            at = self._find(key, 0)
+            if at is not None and self._words[at] == key:
+                self._words[at + 1] = max(self._words[at + 1] - self._interval, now_us)
+
+    def reset(self, key: int) -> None:
+        """Refill ``key``'s bucket."""
+        with self._locked():
+            at = self._find(key, 0)
+            if at is not None and self._words[at] == key:
+                self._words[at + 1] = 0
+
+    def _take(self, key: int, now: int, *, consume: bool) -> Tuple[Decision, str]:
+        words = self._words
+        at = self._find(key, now)
+        if at is None:
+            return Decision(True, self.burst, self.burst - 1, 0.0, 0.0), "untracked"
+        tat = max(words[at + 1], now) if words[at] == key else now
+        ahead = tat + self._interval - now
+        if ahead > self._tolerance:
+            retry_after = (ahead - self._tolerance) / 1_000_000
+            return Decision(False, self.burst, 0, (tat - now) / 1_000_000, retry_after), "limited"
+        if consume:
+            words[at] = key
+            words[at + 1] = now + ahead
+        remaining = (self._tolerance - ahead) // self._interval
+        return Decision(True, self.burst, remaining, ahead / 1_000_000, 0.0), "allowed"
+
+    def tracked(self, now: Optional[float] = None) -> int:
+        """Keys whose bucket is not full, i.e. slots in use (scans the table)."""
+        now_us = int((time.time() if now is None else now) * 1_000_000)
+        tats = self._words[_HEADER_WORDS + 1::_SLOT_WORDS]
+        return sum(1 for tat in tats if tat > now_us)
+
+    def clear(self) -> None:
+        """Forget every key (on shared tables, for every worker)."""
+        with self._locked():
+            end = _HEADER_WORDS + self.slots * _SLOT_WORDS
+            self._words[_HEADER_WORDS:end] = memoryview(bytearray((end - _HEADER_WORDS) * 8)).cast("q")
+
+
+class LoginThrottle:
+    """
+    Budgets of failed logins per (email, client address) and per address.
+
+    Every attempt reserves one failure from both buckets before the
+    password is checked, and is refused if either is empty; a successful
+    login gives the reservation back. Reserving up front, in one atomic
+    step per bucket, keeps parallel guesses from all passing the check
+    before any of them is counted. The email budget stops a client
+    guessing one account's password, the address budget stops credential
+    stuffing across many accounts from one client. The email budget is kept
+    per address so that failures from one client cannot lock the account's
+    owner out elsewhere; guessing spread over many addresses is bounded by
+    each address's budget. A successful login refills only that email's
+    budget from that address, so logging in to an account you own does not
+    buy more guesses at other accounts.
+    """
+
+    def __init__(self, *, email_failures: int, address_failures: int, window: float, slots: int) -> None:
+        self.emails = RateLimiter(
+            "login_email", per_minute=email_failures * 60 / window, burst=email_failures, slots=slots
+        )
+        self.addresses = RateLimiter(
+            "login_address", per_minute=address_failures * 60 / window, burst=address_failures, slots=slots
+        )
+
+    @staticmethod
+    def _email_key(email: str, address: str) -> int:
+        return text_key(f"{email.lower()}\n{address}")
+
+    def reserve(self, email: str, address: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        Count an attempt as failed until ``succeeded`` says otherwise.
+
+        Returns None to let the attempt through, or the seconds until this
+        caller may try again; a refused attempt reserves nothing.
+        """
+        email_key = self._email_key(email, address)
+        decision = self.emails.check(email_key, now)
+        if decision.allowed:
+            decision = self.addresses.check(text_key(address), now)
+            if decision.allowed:
+                return None
+            self.emails.refund(email_key, now)
+        login_throttled.inc()
+        return decision.retry_after
+
+    def succeeded(self, email: str, address: str, now: Optional[float] = None) -> None:
+        """Give back the attempt's reservation and refill the email's budget from this address."""
+        self.emails.reset(self._email_key(email, address))
+        self.addresses.refund(text_key(address), now)
+
+    def clear(self) -> None:
+        self.emails.clear()
+        self.addresses.clear()
+
+
+# This worker's swipe limiter; moved into shared memory in the app lifespan
+swipe_limiter = RateLimiter(
+    "swipe",
+    per_minute=settings.swipe_limit_per_minute,
+    burst=settings.swipe_limit_burst,
+    slots=settings.swipe_limit_slots,
+)
+
+login_throttle = LoginThrottle(
+    email_failures=settings.login_throttle_email_failures,
+    address_failures=settings.login_throttle_address_failures,
+    window=settings.login_throttle_window_seconds,
+    slots=settings.login_throttle_slots,
+)
@@ -0,0 +1,53 @@
+"""Pre-encoded JSON for the profile cards shown in feeds and match lists."""
+
+from datetime import datetime
+from typing import Any, Iterable, List, Sequence, Tuple
+
+from app.cache import SizedLRUCache, register_cache
+from app.config import settings
+from app.encoding import dumps
+
+
+FEED_CARD = "feed"
+MATCH_CARD = "match"
+CARD_SHAPES = (FEED_CARD, MATCH_CARD)
+
+# (shape, profile id) -> (profile updated_at, encoded card). Comparing
+# updated_at on read means a card edited through another worker is never
+# served stale here, even without a local invalidation.
+card_cache: SizedLRUCache[Tuple[str, int], Tuple[datetime, bytes]] = register_cache(
+    "profile_cards",
+    SizedLRUCache(max_bytes=settings.profile_card_cache_bytes, weigh=lambda entry: len(entry[1])),
+)
+
+
+def encode_cards(shape: str, fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[bytes]:
+    """
+    Return the JSON object for each row, reusing cached encodings.
+
+    Args:
+        shape: Card shape, part of the cache key (``FEED_CARD`` or ``MATCH_CARD``)
+        fields: Names of the leading row columns; the first must be the profile id
+        rows: Tuples of ``fields`` values followed by the profile's ``updated_at``
+
+    Returns:
+        Encoded cards in row order
+    """
+    cards: List[bytes] = []
+    for row in rows:
+        key = (shape, row[0])
+        updated_at = row[-1]
+        cached = card_cache.get(key)
+        if cached is not None and cached[0] == updated_at:
+            cards.append(cached[1])
+            continue
+        card = dumps(dict(zip(fields, row)))
+        card_cache.set(key, (updated_at, card))
+        cards.append(card)
+    return cards
+
+
+def invalidate_profile_cards(profile_id: int) -> None:
+    """Drop every cached card of a profile after it changes."""
+    for shape in CARD_SHAPES:
+        card_cache.discard((shape, profile_id))
@@ -2,36 +2,97 @@
 
 from __future__ import annotations
 
-from sqlalchemy import and_, or_
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Row, and_, case, or_, select
 from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException, status
 
+from app.cache.shared import host_cache
+from app.cache.singleflight import SingleFlight
+from app.encoding import dumps
 from app.models.profile import Profile
 from app.models.like import Like
 from app.models.user import User
 from app.models.profile_view import ProfileView, InteractionType
-from app.schemas.like import (
-    FeedResponse,
-    FeedProfileResponse,
-    LikeResponse,
-    MatchesResponse,
-    MatchResponse,
-    MatchProfileResponse,
-)
+from app.observability.tracing import traced
+from app.schemas.like import LikeResponse
 from app.schemas.auth import MessageResponse
+from app.services.cards import FEED_CARD, MATCH_CARD, encode_cards
+from app.services.feed_snapshot import feed_snapshot
+from app.services.profiles import changed_profiles, get_profile, get_profiles
+
+
+# Columns behind FeedProfileResponse and MatchProfileResponse, selected as
+# plain tuples so list endpoints never hydrate ORM entities
+FEED_PROFILE_FIELDS = ("id", "user_id", "display_name", "gender", "avatar_url", "favorite_joke")
+MATCH_PROFILE_FIELDS = ("id", "user_id", "display_name", "avatar_url", "favorite_joke")
+
+# Duplicate reads (double-fired effects, several open tabs) keyed by user, write generation and params
+feed_reads = SingleFlight("feed")
+match_reads = SingleFlight("matches")
+
+# Per-user write generations, striped over a fixed table so memory does not
+# grow with the user count. A swipe bumps its user's stripe after committing,
+# so a read that starts after the swipe never joins a flight that started
+# before it; a collision only costs a missed chance to coalesce.
+_GENERATION_STRIPES = 4096
+_generations = [0] * _GENERATION_STRIPES
+_generations_lock = threading.Lock()
+
+
+def _generation(user_id: int) -> int:
+    return _generations[user_id % _GENERATION_STRIPES]
+
+
+def _bump_generations(*user_ids: int) -> None:
+    """Mark the feed and matches of ``user_ids`` as changed by a committed write."""
+    with _generations_lock:
+        for user_id in user_ids:
+            _generations[user_id % _GENERATION_STRIPES] += 1
+
+
+def _snapshot_feed_rows(*, current_user: User, db: Session, page: int, size: int) -> Optional[Tuple[List[Row], int]]:
+    """
+    Pick the page from the feed snapshot and read only its rows from SQL.
+
+    Exclusions come from the database, so the caller's own swipes show at
+    once; the candidates are as fresh as the snapshot. Returns None when
+    there is no usable snapshot.
+    """
+    if not feed_snapshot.available():
+        return None
+    swiped = db.scalars(
+        select(ProfileView.viewed_profile_id)
+        .where(ProfileView.viewer_id == current_user.id)
+        .union(select(Like.target_id).where(Like.liker_id == current_user.id))
+    ).all()
+    candidates = feed_snapshot.page([current_user.id, *swiped], (page - 1) * size, size)
+    if candidates is None:
+        return None
+    profile_ids, total = candidates
+    if not profile_ids:
+        return [], total
+    rows = db.execute(
+        select(*(getattr(Profile, field) for field in FEED_PROFILE_FIELDS), Profile.updated_at)
+        .where(Profile.id.in_(profile_ids), Profile.is_active == True)  # noqa: E712
+        .order_by(Profile.id.asc())
+    ).all()
+    return rows, total
 
 
-def get_feed(
-    *, current_user: User, db: Session, page: int, size: int
-) -> FeedResponse:
-    """Return a paginated feed of active profiles for the current user."""
-    offset = (page - 1) * size
+def _feed_rows(*, current_user: User, db: Session, page: int, size: int) -> Tuple[List[Row], int]:
+    """Return the page's ``FEED_PROFILE_FIELDS`` + ``updated_at`` rows and the total count."""
+    from_snapshot = _snapshot_feed_rows(current_user=current_user, db=db, page=page, size=size)
+    if from_snapshot is not None:
+        return from_snapshot
 
     viewed_alias = aliased(ProfileView)
     liked_alias = aliased(Like)
 
     query = (
-        db.query(Profile)
+        db.query(*(getattr(Profile, field) for field in FEED_PROFILE_FIELDS), Profile.updated_at)
         .outerjoin(
             viewed_alias,
             and_(
@@ -56,33 +117,60 @@ def get_feed(
     )
 
     total = query.count()
-    profiles = query.offset(offset).limit(size).all()
-    feed_profiles = [FeedProfileResponse.model_validate(profile) for profile in profiles]
-
-    return FeedResponse(
-        profiles=feed_profiles,
-        total=total,
-        page=page,
-        size=size,
-        has_next=offset + size < total,
-        has_prev=page > 1,
+    rows = query.offset((page - 1) * size).limit(size).all()
+    return rows, total
+
+
+def _page_meta(*, total: int, page: int, size: int) -> Dict[str, Any]:
+    return {
+        "total": total,
+        "page": page,
+        "size": size,
+        "has_next": (page - 1) * size + size < total,
+        "has_prev": page > 1,
+    }
+
+
+@traced()
+def feed_json(*, current_user: User, db: Session, page: int, size: int) -> bytes:
+    """
+    Return the feed page encoded as ``FeedResponse`` JSON.
+
+    Profiles come from the pre-encoded card cache and are spliced into the
+    envelope, so a hot page costs one small dict encoding. Identical
+    requests in flight at the same time share one computation.
+    """
+    return feed_reads.do(
+        (current_user.id, _generation(current_user.id), page, size),
+        lambda: _encode_feed(current_user=current_user, db=db, page=page, size=size),
     )
 
 
+def _encode_feed(*, current_user: User, db: Session, page: int, size: int) -> bytes:
+    rows, total = _feed_rows(current_user=current_user, db=db, page=page, size=size)
+    cards = encode_cards(FEED_CARD, FEED_PROFILE_FIELDS, rows)
+    # b'{"total":...}' -> b'"total":...}' closes the envelope
+    meta = dumps(_page_meta(total=total, page=page, size=size))[1:]
+    return b'{"profiles":[' + b",".join(cards) + b"]," + meta
+
+
+def _target_is_active(db: Session, target_id: int) -> bool:
+    """
+    Trust a positive answer from the host cache; check anything else through the profile cache.
+
+    Profiles changed since the snapshot was built are always checked, so a
+    profile closed a moment ago cannot be swiped on until the next rebuild.
+    """
+    if host_cache.is_active(target_id) and changed_profiles.get(target_id) is None:
+        return True
+    target_profile = get_profile(db, target_id)
+    return target_profile is not None and target_profile.is_active
+
+
+@traced()
 def like_profile(*, target_id: int, current_user: User, db: Session) -> LikeResponse:
     """Create (or return existing) like between current user and target."""
-    target_profile = (
-        db.query(Profile)
-        .filter(
-            and_(
-                Profile.user_id == target_id,
-                Profile.is_active == True,  # noqa: E712 - SQLAlchemy comparison
-            )
-        )
-        .first()
-    )
-
-    if not target_profile:
+    if not _target_is_active(db, target_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Target profile not found or inactive",
@@ -129,6 +217,7 @@ def like_profile(*, target_id: int, current_user: User, db: Session) -> LikeResp
 
     if existing_like:
         db.commit()
+        _bump_generations(current_user.id)
         return LikeResponse.model_validate(existing_like)
 
     reverse_like = (
@@ -156,8 +245,11 @@ def like_profile(*, target_id: int, current_user: User, db: Session) -> LikeResp
             db.add(reverse_like)
 
         # Check if target is a celebrity and auto-like back
-        target_user = db.query(User).filter(User.id == target_id).first()
-        if target_user and target_user.is_celebrity and not reverse_like:
+        is_celebrity = host_cache.is_celebrity(target_id)
+        if is_celebrity is None:
+            target_user = db.query(User).filter(User.id == target_id).first()
+            is_celebrity = bool(target_user and target_user.is_celebrity)
+        if is_celebrity and not reverse_like:
             # Celebrity auto-likes back
             celebrity_like = Like(
                 liker_id=target_id,
@@ -177,68 +269,81 @@ def like_profile(*, target_id: int, current_user: User, db: Session) -> LikeResp
             detail="Failed to create like",
         ) from exc
 
-    return LikeResponse.model_validate(new_like)
+    # A new match also changes the target's match list
+    _bump_generations(current_user.id, target_id)
 
+    return LikeResponse.model_validate(new_like)
 
-def get_matches(*, current_user: User, db: Session) -> MatchesResponse:
-    """Return list of mutual matches for the current user."""
-    mutual_likes = (
-        db.query(Like)
-        .filter(
-            and_(
-                Like.mutual == True,  # noqa: E712 - SQLAlchemy comparison
-                or_(
-                    Like.liker_id == current_user.id,
-                    Like.target_id == current_user.id,
-                ),
-            )
-        )
-        .distinct()
-        .all()
-    )
 
-    matches: list[MatchResponse] = []
-    seen_user_ids: set[int] = set()
+def _match_rows(*, current_user: User, db: Session) -> List[Tuple[Row, Profile]]:
+    """
+    Return ``(like, matched profile)`` pairs, one per matched user, for the earliest mutual like.
 
-    for like in mutual_likes:
-        matched_user_id = (
-            like.target_id if like.liker_id == current_user.id else like.liker_id
+    Likes are read as ``(id, liker_id, target_id, created_at, matched
+    user id)`` tuples; the profiles come from the profile cache, with
+    every miss loaded in one batched query.
+    """
+    matched_user_id = case(
+        (Like.liker_id == current_user.id, Like.target_id),
+        else_=Like.liker_id,
+    )
+    likes = db.execute(
+        select(Like.id, Like.liker_id, Like.target_id, Like.created_at, matched_user_id)
+        .where(
+            Like.mutual == True,  # noqa: E712 - SQLAlchemy comparison
+            or_(
+                Like.liker_id == current_user.id,
+                Like.target_id == current_user.id,
+            ),
         )
+        .order_by(Like.id)
+    ).all()
+
+    # A user matched through both directions is listed once
+    first_likes: Dict[int, Row] = {}
+    for like in likes:
+        first_likes.setdefault(like[4], like)
+    profiles = get_profiles(db, first_likes)
+    return [
+        (like, profiles[user_id])
+        for user_id, like in first_likes.items()
+        if user_id in profiles
+    ]
+
+
+def _match_card_row(profile: Profile) -> Tuple:
+    return (*(getattr(profile, field) for field in MATCH_PROFILE_FIELDS), profile.updated_at)
+
+
+@traced()
+def matches_json(*, current_user: User, db: Session) -> bytes:
+    """
+    Return mutual matches encoded as ``MatchesResponse`` JSON, splicing in cached profile cards.
+
+    Identical requests in flight at the same time share one computation.
+    """
+    return match_reads.do(
+        (current_user.id, _generation(current_user.id)),
+        lambda: _encode_matches(current_user=current_user, db=db),
+    )
 
-        if matched_user_id in seen_user_ids:
-            continue
-
-        seen_user_ids.add(matched_user_id)
-
-        matched_profile = db.query(Profile).filter(Profile.user_id == matched_user_id).first()
-        if matched_profile:
-            matches.append(
-                MatchResponse(
-                    id=like.id,
-                    liker_id=like.liker_id,
-                    target_id=like.target_id,
-                    created_at=like.created_at,
-                    matched_with=MatchProfileResponse.model_validate(matched_profile),
-                )
-            )
 
-    return MatchesResponse(matches=matches, total=len(matches))
+def _encode_matches(*, current_user: User, db: Session) -> bytes:
+    rows = _match_rows(current_user=current_user, db=db)
+    cards = encode_cards(MATCH_CARD, MATCH_PROFILE_FIELDS, (_match_card_row(profile) for _, profile in rows))
+    items = [
+        # b'{"id":...}' -> b'{"id":...,' then the card and the closing brace
+        dumps({"id": like[0], "liker_id": like[1], "target_id": like[2], "created_at": like[3]})[:-1]
+        + b',"matched_with":' + card + b"}"
+        for (like, _), card in zip(rows, cards)
+    ]
+    return b'{"matches":[' + b",".join(items) + b'],"total":' + str(len(items)).encode() + b"}"
 
 
+@traced()
 def skip_profile(*, target_id: int, current_user: User, db: Session) -> MessageResponse:
     """Mark a profile as skipped/viewed without liking."""
-    target_profile = (
-        db.query(Profile)
-        .filter(
-            and_(
-                Profile.user_id == target_id,
-                Profile.is_active == True,  # noqa: E712 - SQLAlchemy comparison
-            )
-        )
-        .first()
-    )
-
-    if not target_profile:
+    if not _target_is_active(db, target_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Target profile not found or inactive",
@@ -281,4 +386,6 @@ def skip_profile(*, target_id: int, current_user: User, db: Session) -> MessageR
             detail="Failed to record skip",
         ) from exc
 
+    _bump_generations(current_user.id)
+
     return MessageResponse(message="Profile skipped")
@@ -0,0 +1,283 @@
+"""
+Memory-mapped snapshot of feed candidates, shared by every worker.
+
+The feed is every active profile in profile id order, minus the caller and
+the users they already viewed or liked. The snapshot file holds the
+active profiles as packed int64 columns:
+
+- the active profile ids, sorted (their index is the profile's *rank*)
+- the same profiles' user ids, sorted, and the rank of each
+
+A page is then rank arithmetic: the caller's few exclusions are looked up
+by bisection and skipped, and only the page itself is read from SQL. The
+cost grows with the page and the exclusions, not with the table.
+
+One worker (elected with a host lock) keeps the candidates in memory,
+refreshes them from profile changes recorded in ``cache_invalidations``
+and from new profiles, and replaces the file atomically with
+``os.replace``. Readers map the new file on their next check and keep
+using the old mapping until then. The layout is plain little-endian int64,
+so ``numpy.memmap`` can read it for offline analysis.
+"""
+
+import logging
+import mmap
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import IO, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.cache.shared import try_host_lock
+from app.models.cache_invalidation import CacheInvalidation
+from app.models.profile import Profile
+from app.services.profiles import PROFILE_TOPIC
+
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = 0x46454544  # "FEED"
+_LAYOUT_VERSION = 1
+# Header words: magic, layout version, candidate count, built_at (unix ms)
+_HEADER_WORDS = 8
+_BUILT_AT_WORD = 3
+# How often readers look for a replaced file
+_STAT_INTERVAL = 0.5
+# Changes are re-read this far back, so rows from transactions that
+# committed after the previous refresh started are not missed
+_COMMIT_SLACK = timedelta(seconds=30)
+_LOOKUP_BATCH = 500
+
+
+class _View(NamedTuple):
+    words: memoryview
+    count: int
+    inode: int
+
+
+class FeedSnapshot:
+    """
+    Reader for the snapshot file, one per worker.
+
+    Returns None whenever it cannot answer (no file, or a snapshot older
+    than ``max_age``), and callers then run the SQL feed query.
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[str] = None
+        self.max_age = 0.0
+        self._view: Optional[_View] = None
+        self._next_check = 0.0
+
+    def open(self, path: str, *, max_age: float) -> None:
+        self.path = path
+        self.max_age = max_age
+        self._view = None
+        self._next_check = 0.0
+
+    def close(self) -> None:
+        # Mappings are released with their last reference, never under a reader
+        self.path = None
+        self._view = None
+
+    def _reload(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._view = None
+            return
+        if self._view is not None and self._view.inode == stat.st_ino:
+            return
+        if stat.st_size < _HEADER_WORDS * 8:
+            self._view = None
+            return
+        with open(self.path, "rb") as snapshot_file:
+            mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        words = memoryview(mapped).cast("q")
+        count = words[2]
+        if words[0] != _MAGIC or words[1] != _LAYOUT_VERSION or len(words) < _HEADER_WORDS + 3 * count:
+            logger.warning("Ignoring feed snapshot %s with an unknown layout", self.path)
+            self._view = None
+            return
+        self._view = _View(words, count, stat.st_ino)
+
+    def _current(self) -> Optional[_View]:
+        now = time.monotonic()
+        if self.path is not None and now >= self._next_check:
+            self._next_check = now + _STAT_INTERVAL
+            self._reload()
+        view = self._view
+        if view is None or time.time() - view.words[_BUILT_AT_WORD] / 1000 > self.max_age:
+            return None
+        return view
+
+    def available(self) -> bool:
+        """Whether ``page`` can currently answer."""
+        return self._current() is not None
+
+    def page(self, exclude: Iterable[int], offset: int, limit: int) -> Optional[Tuple[List[int], int]]:
+        """
+        Return ``(profile ids, total)`` for one feed page.
+
+        ``exclude`` holds the user ids left out for this caller; ids not in
+        the snapshot are ignored. Profile ids come in feed order.
+        """
+        view = self._current()
+        if view is None:
+            return None
+        words, count = view.words, view.count
+        users_at = _HEADER_WORDS + count
+        ranks_at = users_at + count
+        excluded = set()
+        for user_id in exclude:
+            position = bisect_left(words, user_id, users_at, ranks_at)
+            if position < ranks_at and words[position] == user_id:
+                excluded.add(words[position + count])
+        skipped = sorted(excluded)
+
+        # Rank of the offset-th candidate: every excluded rank at or before it shifts it by one
+        rank = offset
+        for skipped_rank in skipped:
+            if skipped_rank > rank:
+                break
+            rank += 1
+        profile_ids: List[int] = []
+        next_skip = bisect_left(skipped, rank)
+        while len(profile_ids) < limit and rank < count:
+            if next_skip < len(skipped) and skipped[next_skip] == rank:
+                next_skip += 1
+            else:
+                profile_ids.append(words[_HEADER_WORDS + rank])
+            rank += 1
+        return profile_ids, count - len(skipped)
+
+
+# This worker's reader; opened in the app lifespan
+feed_snapshot = FeedSnapshot()
+
+
+def write_snapshot(path: str, active: Dict[int, int], built_at: float) -> None:
+    """Write ``{profile_id: user_id}`` of the active profiles to ``path``, replacing it atomically."""
+    profile_ids = sorted(active)
+    user_ids = [active[profile_id] for profile_id in profile_ids]
+    by_user = sorted(range(len(user_ids)), key=user_ids.__getitem__)
+    header = array("q", [_MAGIC, _LAYOUT_VERSION, len(profile_ids), int(built_at * 1000)])
+    header.extend([0] * (_HEADER_WORDS - len(header)))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as snapshot_file:
+        header.tofile(snapshot_file)
+        array("q", profile_ids).tofile(snapshot_file)
+        array("q", (user_ids[rank] for rank in by_user)).tofile(snapshot_file)
+        array("q", by_user).tofile(snapshot_file)
+    os.replace(temporary, path)
+
+
+def touch_snapshot(path: str, built_at: float) -> None:
+    """Mark an unchanged snapshot as current (one aligned 8-byte write, visible to every mapping)."""
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        os.pwrite(fd, int(built_at * 1000).to_bytes(8, "little", signed=True), _BUILT_AT_WORD * 8)
+    finally:
+        os.close(fd)
+
+
+class FeedSnapshotBuilder:
+    """
+    Background thread keeping the snapshot file current, on one worker per host.
+
+    Every ``interval`` seconds the elected worker re-reads the profiles
+    named by recent profile invalidations plus recently created ones, and
+    rewrites the file if anything changed. Every ``full_interval`` seconds
+    it reloads all active profiles instead, which also drops deleted ones;
+    keep that below the invalidation retention.
+    """
+
+    def __init__(self, engine: Engine, path: str, *, interval: float, full_interval: float) -> None:
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        self.full_interval = full_interval
+        self._active: Dict[int, int] = {}
+        self._since: Optional[datetime] = None
+        self._last_full = 0.0
+        self._lock_file: Optional[IO] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="feed-snapshot-builder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Feed snapshot refresh failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def _changes(self, db: Session, since: datetime) -> List[Tuple[int, int, bool]]:
+        """Return ``(profile id, user id, is_active)`` for profiles changed or created since ``since``."""
+        keys = db.scalars(
+            select(CacheInvalidation.key).where(
+                CacheInvalidation.topic == PROFILE_TOPIC,
+                CacheInvalidation.created_at >= since,
+            )
+        ).all()
+        user_ids = sorted({int(key) for key in keys})
+        columns = (Profile.id, Profile.user_id, Profile.is_active)
+        rows = list(db.execute(select(*columns).where(Profile.created_at >= since)))
+        for start in range(0, len(user_ids), _LOOKUP_BATCH):
+            batch = user_ids[start:start + _LOOKUP_BATCH]
+            rows.extend(db.execute(select(*columns).where(Profile.user_id.in_(batch))))
+        return rows
+
+    def tick(self) -> bool:
+        """Refresh the snapshot if this worker is (or becomes) the builder; return whether it did."""
+        if self._lock_file is None:
+            self._lock_file = try_host_lock(f"{self.path}.lock")
+        if self._lock_file is None:
+            return False
+        started = datetime.utcnow()
+        built_at = time.time()
+        full = self._since is None or time.monotonic() - self._last_full >= self.full_interval
+        with Session(self.engine) as db:
+            if full:
+                rows = db.execute(
+                    select(Profile.id, Profile.user_id).where(Profile.is_active == True)  # noqa: E712
+                ).all()
+                changed = True
+                self._active = dict(rows)
+                self._last_full = time.monotonic()
+            else:
+                changed = False
+                for profile_id, user_id, is_active in self._changes(db, self._since - _COMMIT_SLACK):
+                    if is_active and self._active.get(profile_id) != user_id:
+                        self._active[profile_id] = user_id
+                        changed = True
+                    elif not is_active and self._active.pop(profile_id, None) is not None:
+                        changed = True
+        self._since = started
+        if changed or not os.path.exists(self.path):
+            write_snapshot(self.path, self._active, built_at)
+        else:
+            touch_snapshot(self.path, built_at)
+        return True
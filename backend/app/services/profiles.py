@@ -0,0 +1,176 @@
+"""Cached profiles and versions, and the hook run when a profile changes."""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.cache import TTLCache, register_cache
+from app.cache.bus import publish, subscribe
+from app.cache.singleflight import SingleFlight
+from app.config import settings
+from app.models.profile import Profile
+from app.services.cards import invalidate_profile_cards
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# Keeps IN lists well under every driver's bound-parameter limit
+_LOOKUP_BATCH = 500
+
+
+class ProfileVersion(NamedTuple):
+    """The columns that decide whether a cached profile representation is current."""
+    profile_id: int
+    updated_at: datetime
+    is_active: bool
+
+    @property
+    def etag(self) -> str:
+        return profile_etag(self.profile_id, self.updated_at)
+
+
+def profile_etag(profile_id: int, updated_at: datetime) -> str:
+    """Return the strong ETag for a profile row (its id and microsecond ``updated_at``)."""
+    micros = (updated_at.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+    return f'"{profile_id}-{micros:x}"'
+
+
+# user_id -> ProfileVersion. Entries written by this worker are exact; the
+# TTL bounds how long a change made through another worker can go unseen.
+profile_versions: TTLCache[int, ProfileVersion] = register_cache(
+    "profile_versions",
+    TTLCache(max_size=settings.profile_version_cache_size, ttl=settings.profile_version_ttl_seconds),
+)
+
+
+# user_id -> detached Profile copy, shared by every request in this worker
+profile_cache: TTLCache[int, Profile] = register_cache(
+    "profiles",
+    TTLCache(max_size=settings.profile_cache_size, ttl=settings.profile_cache_ttl_seconds),
+)
+
+
+# Concurrent misses for one key (a hot entry expiring) share a single load
+profile_loads = SingleFlight("profile_load")
+
+
+# Invalidation topic for profile changes, keyed by user id
+PROFILE_TOPIC = "profile"
+
+# Users whose profile changed since the host cache snapshot was built, which
+# may still list them as active. Entries outlive any snapshot the host cache
+# would accept. Not registered: clearing it would let those snapshots revive
+# closed profiles.
+changed_profiles: TTLCache[int, bool] = TTLCache(
+    max_size=settings.profile_cache_size, ttl=settings.host_cache_max_age + settings.host_cache_interval
+)
+
+
+def remember_version(profile: Profile) -> ProfileVersion:
+    """Record the version of a profile row that was just read or written."""
+    version = ProfileVersion(profile.id, profile.updated_at, profile.is_active)
+    profile_versions.set(profile.user_id, version)
+    return version
+
+
+def get_profile_version(db: Session, user_id: int) -> Optional[ProfileVersion]:
+    """
+    Return a user's profile version, from memory when possible.
+
+    A miss selects only the three version columns, never the whole row.
+    """
+    version = profile_versions.get(user_id)
+    if version is not None:
+        return version
+    return profile_loads.do(("version", user_id), lambda: _load_version(db, user_id))
+
+
+def _load_version(db: Session, user_id: int) -> Optional[ProfileVersion]:
+    row = db.execute(
+        select(Profile.id, Profile.updated_at, Profile.is_active).where(Profile.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    version = ProfileVersion(*row)
+    profile_versions.set(user_id, version)
+    return version
+
+
+def _detached_profile(profile: Profile) -> Profile:
+    """Copy a loaded profile into a detached instance safe to share across sessions."""
+    copy = Profile(**{attr.key: getattr(profile, attr.key) for attr in Profile.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _cache_profile(profile: Profile) -> Profile:
+    copy = _detached_profile(profile)
+    profile_cache.set(profile.user_id, copy)
+    remember_version(copy)
+    return copy
+
+
+def get_profile(db: Session, user_id: int) -> Optional[Profile]:
+    """
+    Return a user's profile, reading through the profile cache.
+
+    The result is detached and shared with other requests: read it, never
+    modify it. Load the row itself to update it.
+    """
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        return cached
+    return profile_loads.do(("profile", user_id), lambda: _load_profile(db, user_id))
+
+
+def _load_profile(db: Session, user_id: int) -> Optional[Profile]:
+    profile = db.scalars(select(Profile).where(Profile.user_id == user_id)).first()
+    return _cache_profile(profile) if profile is not None else None
+
+
+def get_profiles(db: Session, user_ids: Iterable[int]) -> Dict[int, Profile]:
+    """
+    Return the profiles of many users keyed by user id, reading through the cache.
+
+    Misses are loaded together in batched ``IN`` queries; users without a
+    profile are left out of the result.
+    """
+    found: Dict[int, Profile] = {}
+    missing: List[int] = []
+    for user_id in dict.fromkeys(user_ids):
+        cached = profile_cache.get(user_id)
+        if cached is None:
+            missing.append(user_id)
+        else:
+            found[user_id] = cached
+    for start in range(0, len(missing), _LOOKUP_BATCH):
+        batch = missing[start:start + _LOOKUP_BATCH]
+        for profile in db.scalars(select(Profile).where(Profile.user_id.in_(batch))):
+            found[profile.user_id] = _cache_profile(profile)
+    return found
+
+
+def publish_profile_change(db: Session, profile: Profile) -> None:
+    """Tell the other workers, in the caller's transaction, that a profile is about to change."""
+    changed_profiles.set(profile.user_id, True)
+    publish(db, PROFILE_TOPIC, profile.user_id)
+
+
+def profile_changed(profile: Profile) -> None:
+    """Refresh everything derived from a profile after a committed update (write-through)."""
+    invalidate_profile_cards(profile.id)
+    _cache_profile(profile)
+
+
+def _forget_profiles(keys: List[str]) -> None:
+    # Cached cards need no action: they are re-encoded once updated_at moves
+    for key in keys:
+        user_id = int(key)
+        profile_cache.discard(user_id)
+        profile_versions.discard(user_id)
+        changed_profiles.set(user_id, True)
+
+
+subscribe(PROFILE_TOPIC, _forget_profiles)
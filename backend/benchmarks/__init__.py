@@ -0,0 +1 @@
+"""Service-layer benchmarks against synthetic SQLite databases."""
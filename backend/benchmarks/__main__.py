@@ -0,0 +1,83 @@
+"""
+Command-line entry point.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks --scale 10k
+    python -m benchmarks --scale 100k --output results.json --baseline benchmarks/baseline-100k.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.compare import compare
+from benchmarks.dataset import SCALES, DatasetSpec, ensure_dataset
+from benchmarks.runner import CASES, run_benchmarks
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent / ".data"
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k", help="Dataset size (default: 10k)")
+    parser.add_argument("--users", type=int, help="Exact number of users, overriding --scale")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset seed")
+    parser.add_argument("--swipes", type=float, default=20.0, help="Mean swipes per user in the dataset")
+    parser.add_argument("--calls", type=int, default=200, help="Warm calls per case")
+    parser.add_argument("--cold-calls", type=int, default=5, help="Cold calls per case")
+    parser.add_argument("--case", action="append", choices=[case.name for case in CASES], help="Run only these cases")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Where generated databases are cached")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Fail if results regress against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed latency growth (default: 0.25)")
+    return parser.parse_args(argv)
+
+
+def _print_table(report: Dict[str, Any]) -> None:
+    header = f"{'case':<24}{'cold p50':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'queries':>9}{'failed':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, result in report["results"].items():
+        warm = result["warm"]
+        print(
+            f"{name:<24}{result['cold'].get('p50_ms', float('nan')):>10.2f}"
+            f"{warm['p50_ms']:>10.2f}{warm['p95_ms']:>10.2f}{warm['p99_ms']:>10.2f}"
+            f"{result['queries_per_call']:>9g}{result['failed_calls']:>8}"
+        )
+    print("(milliseconds)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    spec = DatasetSpec.per_user(args.users or SCALES[args.scale], args.swipes, seed=args.seed)
+
+    print(f"Preparing dataset with {spec.users:,} users...", flush=True)
+    dataset = ensure_dataset(args.data_dir, spec)
+
+    print(f"Running {args.calls} warm and {args.cold_calls} cold calls per case...", flush=True)
+    report = run_benchmarks(
+        dataset, spec, calls=args.calls, cold_calls=args.cold_calls, cases=args.case
+    )
+    _print_table(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
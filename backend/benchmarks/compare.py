@@ -0,0 +1,40 @@
+"""Compare benchmark results with a stored baseline."""
+
+from typing import Any, Dict, List
+
+
+# Warm latency figures checked against the baseline
+CHECKED_PERCENTILES = ("p50_ms", "p95_ms")
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+) -> List[str]:
+    """
+    Return a description of every regression in ``current``.
+
+    A case regresses when a warm percentile grows by more than
+    ``tolerance`` (0.25 = 25 %) or when it runs more SQL statements per
+    call than before. Cases missing from either side are ignored.
+    """
+    regressions: List[str] = []
+    for name, result in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        for key in CHECKED_PERCENTILES:
+            before = reference["warm"].get(key)
+            after = result["warm"].get(key)
+            if before and after and after > before * (1 + tolerance):
+                regressions.append(
+                    f"{name}: warm {key} {before:.3f} -> {after:.3f} (+{(after / before - 1) * 100:.0f}%)"
+                )
+        before_queries = reference.get("queries_per_call", 0.0)
+        after_queries = result.get("queries_per_call", 0.0)
+        if after_queries > before_queries + 0.01:
+            regressions.append(
+                f"{name}: queries per call {before_queries:g} -> {after_queries:g}"
+            )
+    return regressions
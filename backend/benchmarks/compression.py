@@ -0,0 +1,93 @@
+"""
+CPU cost against bytes saved when compressing feed and matches responses.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.compression --size 100
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.compression import CODECS, LEVELS
+from app.encoding import dumps
+from app.models.profile import GenderEnum
+from benchmarks.stats import summarize
+from datagen.content import ContentPicker
+
+
+def bodies(size: int, seed: int = 1) -> Dict[str, bytes]:
+    """A feed page and a matches list of ``size`` generated profiles each."""
+    rng = random.Random(seed)
+    content = ContentPicker(rng)
+    genders = list(GenderEnum)
+    profiles = []
+    for user_id in range(1, size + 1):
+        text = content.profile(user_id)
+        profiles.append({
+            "id": user_id,
+            "user_id": user_id,
+            "display_name": text["display_name"],
+            "gender": rng.choice(genders),
+            "avatar_url": None,
+            "favorite_joke": text["favorite_joke"],
+        })
+    feed = {"profiles": profiles, "total": size * 10, "page": 1, "size": size, "has_next": True, "has_prev": False}
+    matches = [
+        {
+            "id": index,
+            "liker_id": 1,
+            "target_id": profile["user_id"],
+            "created_at": datetime(2024, 1, 1),
+            "matched_with": {key: value for key, value in profile.items() if key != "gender"},
+        }
+        for index, profile in enumerate(profiles, start=1)
+    ]
+    return {"feed": dumps(feed), "matches": dumps({"matches": matches, "total": len(matches)})}
+
+
+def measure(body: bytes, encoding: str, level: int, repeat: int) -> Dict[str, float]:
+    """Compress ``body`` ``repeat`` times; report size and CPU per call."""
+    compress = CODECS[encoding]
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.thread_time()
+        compressed = compress(body, level)
+        samples.append(time.thread_time() - started)
+    cpu_ms = summarize(samples)["p50_ms"]
+    saved = len(body) - len(compressed)
+    return {
+        "bytes": len(compressed),
+        "ratio": len(compressed) / len(body),
+        "cpu_us": cpu_ms * 1000,
+        "kib_saved_per_cpu_ms": saved / 1024 / cpu_ms if cpu_ms else float("inf"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compression", description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100, help="Profiles per feed page and matches list (default: 100)")
+    parser.add_argument("--repeat", type=int, default=200, help="Compressions timed per codec and level")
+    args = parser.parse_args(argv)
+
+    for name, body in bodies(args.size).items():
+        print(f"{name}: {len(body)} bytes uncompressed")
+        print(f"  {'coding':<8}{'level':<9}{'bytes':>8}{'ratio':>8}{'cpu µs':>10}{'KiB saved/cpu ms':>18}")
+        for encoding in CODECS:
+            for level_name, levels in LEVELS.items():
+                result = measure(body, encoding, levels[encoding], args.repeat)
+                print(
+                    f"  {encoding:<8}{level_name:<9}{result['bytes']:>8}{result['ratio']:>8.3f}"
+                    f"{result['cpu_us']:>10.1f}{result['kib_saved_per_cpu_ms']:>18.1f}"
+                )
+    if len(CODECS) == 1:
+        print("(install requirements-compression.txt to compare brotli and zstd)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
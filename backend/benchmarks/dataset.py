@@ -0,0 +1,74 @@
+"""Cached SQLite datasets for the benchmarks, built with ``datagen``."""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+from sqlalchemy import create_engine
+
+from datagen import GeneratorSpec, TargetPicker, celebrity_ids, generate, popularity_ranking, speed_up_sqlite
+
+__all__ = [
+    "SCALES",
+    "DatasetSpec",
+    "TargetPicker",
+    "build_dataset",
+    "celebrity_ids",
+    "ensure_dataset",
+    "popularity_ranking",
+]
+
+
+SCALES: Dict[str, int] = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+
+@dataclass(frozen=True)
+class DatasetSpec(GeneratorSpec):
+    """A generator spec that names its cached database file."""
+
+    @classmethod
+    def per_user(cls, users: int, swipes_per_user: float = 20.0, **kwargs) -> "DatasetSpec":
+        """Size the swipe history by its mean per user."""
+        return cls(users=users, swipes=round(users * swipes_per_user), **kwargs)
+
+    @property
+    def filename(self) -> str:
+        return f"{self.cache_key}.db"
+
+
+def build_dataset(path: Path, spec: DatasetSpec) -> Path:
+    """
+    Create a SQLite database for ``spec`` at ``path``.
+
+    The database is written to a temporary file and renamed into place, so
+    an interrupted build never leaves a half-filled file behind.
+
+    Returns:
+        ``path``
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    if partial.exists():
+        partial.unlink()
+
+    engine = create_engine(f"sqlite:///{partial}")
+    speed_up_sqlite(engine)
+    try:
+        generate(engine, spec)
+    finally:
+        engine.dispose()
+    os.replace(partial, path)
+    return path
+
+
+def ensure_dataset(data_dir: Path, spec: DatasetSpec) -> Path:
+    """Return the cached database for ``spec``, building it on first use."""
+    path = data_dir / spec.filename
+    if not path.exists():
+        build_dataset(path, spec)
+    return path
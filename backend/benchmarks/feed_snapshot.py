@@ -0,0 +1,53 @@
+"""
+Cost of picking a feed page from the memory-mapped snapshot.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.feed_snapshot --profiles 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+from typing import List, Optional
+
+from app.services.feed_snapshot import FeedSnapshot, write_snapshot
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.feed_snapshot", description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=1_000_000, help="Active profiles (default: 1000000)")
+    parser.add_argument("--size", type=int, default=20, help="Page size")
+    parser.add_argument("--number", type=int, default=500, help="Pages per timing sample")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(1)
+    # Profile and user ids diverge a little, as after deleted or re-created profiles
+    active = {profile_id: profile_id + rng.randint(0, 3) for profile_id in range(1, args.profiles + 1)}
+    path = os.path.join(tempfile.mkdtemp(), "feed_snapshot.bin")
+    started = time.perf_counter()
+    write_snapshot(path, active, time.time())
+    build = time.perf_counter() - started
+
+    snapshot = FeedSnapshot()
+    snapshot.open(path, max_age=3600)
+    user_ids = list(active.values())
+    print(f"{args.profiles} profiles: snapshot written in {build * 1000:.0f} ms, {os.path.getsize(path) / 2**20:.1f} MiB")
+    print(f"{'swiped':>8}{'page':>8}{'µs per page':>14}")
+    for swiped in (0, 20, 500, 5000):
+        exclude = rng.sample(user_ids, swiped)
+        for page in (1, 1000):
+            offset = (page - 1) * args.size
+            seconds = min(timeit.repeat(lambda: snapshot.page(exclude, offset, args.size), repeat=5, number=args.number))
+            print(f"{swiped:>8}{page:>8}{seconds / args.number * 1e6:>14.1f}")
+    snapshot.close()
+    os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
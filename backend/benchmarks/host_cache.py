@@ -0,0 +1,107 @@
+"""
+Shared-memory host cache against per-process dicts: lookup cost, memory and warm-up.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.host_cache --sessions 50000 --users 100000 --workers 4
+"""
+
+import argparse
+import hashlib
+import random
+import secrets
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.cache.shared import HostCache
+
+
+def dataset(sessions: int, users: int, seed: int = 1) -> Dict:
+    """Session digests and the id sets a snapshot holds, shaped like ``load_snapshot``."""
+    rng = random.Random(seed)
+    expires_at = time.time() + 7 * 86400
+    return {
+        "sessions": [
+            (hashlib.sha256(rng.randbytes(32)).digest(), rng.randint(1, users), expires_at)
+            for _ in range(sessions)
+        ],
+        "active_ids": [user_id for user_id in range(1, users + 1) if rng.random() < 0.9],
+        "celebrity_ids": [user_id for user_id in range(1, users + 1) if rng.random() < 0.001],
+        "max_user_id": users,
+    }
+
+
+def build_dicts(snapshot: Dict) -> Tuple[Dict[bytes, Tuple[int, float]], frozenset, frozenset]:
+    """What each worker would hold without the host cache."""
+    sessions = {digest: (user_id, expires_at) for digest, user_id, expires_at in snapshot["sessions"]}
+    return sessions, frozenset(snapshot["active_ids"]), frozenset(snapshot["celebrity_ids"])
+
+
+def _per_call_ns(call: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(call, repeat=5, number=number)) / number * 1e9
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.host_cache", description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50000, help="Live sessions (default: 50000)")
+    parser.add_argument("--users", type=int, default=100000, help="Users, 90%% with an active profile")
+    parser.add_argument("--workers", type=int, default=4, help="Workers per host, for the memory totals")
+    parser.add_argument("--number", type=int, default=20000, help="Lookups per timing sample")
+    args = parser.parse_args(argv)
+
+    snapshot = dataset(args.sessions, args.users)
+    digests = [digest for digest, _, _ in snapshot["sessions"]]
+    unknown = hashlib.sha256(b"not a session").digest()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    sessions, active, celebrities = build_dicts(snapshot)
+    dict_build = time.perf_counter() - started
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    cache = HostCache()
+    cache.attach(
+        f"anecdote-bench-{secrets.token_hex(4)}",
+        session_slots=int(args.sessions / 0.75) + 1,
+        id_capacity=args.users,
+        max_age=3600,
+    )
+    try:
+        started = time.perf_counter()
+        cache.publish(**snapshot)
+        shared_build = time.perf_counter() - started
+        reader = HostCache()
+        started = time.perf_counter()
+        reader.attach(cache.shm.name, session_slots=cache.slots, id_capacity=cache.capacity, max_age=3600)
+        attach = time.perf_counter() - started
+
+        hit, user_id = digests[len(digests) // 2], args.users // 2
+        timings = [
+            ("session hit", lambda: sessions.get(hit), lambda: reader.session(hit)),
+            ("session miss", lambda: sessions.get(unknown), lambda: reader.session(unknown)),
+            ("active id", lambda: user_id in active, lambda: reader.is_active(user_id)),
+            ("celebrity id", lambda: user_id in celebrities, lambda: reader.is_celebrity(user_id)),
+        ]
+        print(f"{'lookup':<14}{'dict ns':>10}{'shared ns':>12}")
+        for name, local, shared in timings:
+            print(f"{name:<14}{_per_call_ns(local, args.number):>10.0f}{_per_call_ns(shared, args.number):>12.0f}")
+
+        print()
+        print(f"{'':<24}{'per-process dicts':>20}{'host cache':>14}")
+        print(f"{'private MiB per worker':<24}{dict_bytes / 2**20:>20.1f}{0:>14.1f}")
+        print(f"{'MiB per host':<24}{dict_bytes * args.workers / 2**20:>20.1f}{cache.shm.size / 2**20:>14.1f}")
+        print(f"{'build ms (each worker)':<24}{dict_build * 1000:>20.1f}{'-':>14}")
+        print(f"{'build ms (one worker)':<24}{'-':>20}{shared_build * 1000:>14.1f}")
+        print(f"{'warm-up ms (new worker)':<24}{dict_build * 1000:>20.1f}{attach * 1000:>14.3f}")
+        reader.detach()
+    finally:
+        cache.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
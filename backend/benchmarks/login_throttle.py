@@ -0,0 +1,84 @@
+"""
+bcrypt CPU spent on a simulated credential-stuffing run, with and without the login throttle.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.login_throttle --attempts 20000 --addresses 50
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional
+
+from app.auth import pwd_context
+from app.config import settings
+from app.ratelimit import LoginThrottle
+
+
+def _verify_cpu_seconds(samples: int = 5) -> float:
+    """CPU seconds of one bcrypt verify at the application's cost factor."""
+    hashed = pwd_context.hash("password123")
+    started = time.process_time()
+    for _ in range(samples):
+        pwd_context.verify("wrong-password", hashed)
+    return (time.process_time() - started) / samples
+
+
+def simulate(attempts: int, addresses: int, rate: float, known: float, throttle: Optional[LoginThrottle], seed: int = 1) -> dict:
+    """
+    Replay ``attempts`` leaked (email, password) pairs at ``rate`` per second from ``addresses`` clients.
+
+    Every attempt that reaches the password check costs one bcrypt verify,
+    whether or not the email exists; none of the pairs are valid.
+    """
+    rng = random.Random(seed)
+    started = 1_000_000.0
+    verifies = refused = 0
+    for index in range(attempts):
+        now = started + index / rate
+        email = f"leaked{index}@example.com" if rng.random() >= known else f"user{rng.randrange(10**6)}@example.com"
+        address = f"203.0.113.{rng.randrange(addresses)}"
+        if throttle is not None and throttle.reserve(email, address, now) is not None:
+            refused += 1
+            continue
+        verifies += 1
+    return {"verifies": verifies, "refused": refused, "seconds": attempts / rate}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.login_throttle", description=__doc__.splitlines()[1])
+    parser.add_argument("--attempts", type=int, default=20000, help="Login attempts in the run")
+    parser.add_argument("--addresses", type=int, default=50, help="Client addresses the attacker rotates through")
+    parser.add_argument("--rate", type=float, default=100.0, help="Attempts per second, all addresses together")
+    parser.add_argument("--known", type=float, default=0.3, help="Share of attempts naming an existing email")
+    args = parser.parse_args(argv)
+
+    verify_cpu = _verify_cpu_seconds()
+    throttle = LoginThrottle(
+        email_failures=settings.login_throttle_email_failures,
+        address_failures=settings.login_throttle_address_failures,
+        window=settings.login_throttle_window_seconds,
+        slots=settings.login_throttle_slots,
+    )
+    started = time.process_time()
+    throttled = simulate(args.attempts, args.addresses, args.rate, args.known, throttle)
+    throttle_cpu = (time.process_time() - started) / args.attempts
+    unthrottled = simulate(args.attempts, args.addresses, args.rate, args.known, None)
+
+    print(
+        f"{args.attempts} attempts over {throttled['seconds']:.0f} s from {args.addresses} addresses; "
+        f"one bcrypt verify = {verify_cpu * 1000:.0f} ms CPU, one throttle check = {throttle_cpu * 1e6:.0f} µs"
+    )
+    print(f"{'':<14}{'verifies':>10}{'refused':>10}{'bcrypt CPU s':>14}{'cores busy':>12}")
+    for name, run in (("no throttle", unthrottled), ("throttle", throttled)):
+        cpu = run["verifies"] * verify_cpu
+        print(f"{name:<14}{run['verifies']:>10}{run['refused']:>10}{cpu:>14.1f}{cpu / run['seconds']:>12.2f}")
+    saved = 1 - throttled["verifies"] / unthrottled["verifies"]
+    print(f"bcrypt CPU saved: {saved:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
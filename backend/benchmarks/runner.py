@@ -0,0 +1,199 @@
+"""Time the feed services cold and warm against a generated database."""
+
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.cache import clear_all
+from app.models.profile import Profile
+from app.models.user import User
+from app.observability.queries import count_queries
+from app.services.feed import feed_json, like_profile, matches_json, skip_profile
+from benchmarks.dataset import DatasetSpec, TargetPicker, celebrity_ids, popularity_ranking
+from benchmarks.stats import summarize
+
+
+@dataclass
+class Population:
+    """User ids the cases draw from, loaded once per run."""
+    active_ids: List[int]
+    celebrity_ids: List[int]
+    targets: TargetPicker
+
+
+# A case receives (session, current user, rng, population) and calls one service
+CaseFunction = Callable[[Session, User, random.Random, Population], Any]
+
+
+@dataclass
+class Case:
+    name: str
+    run: CaseFunction
+    # Users the case acts as; defaults to uniformly random active users
+    pick_user: Optional[Callable[[random.Random, Population], int]] = None
+
+
+def _feed_first_page(db: Session, user: User, rng: random.Random, population: Population) -> Any:
+    return feed_json(current_user=user, db=db, page=1, size=20)
+
+
+def _feed_deep_page(db: Session, user: User, rng: random.Random, population: Population) -> Any:
+    return feed_json(current_user=user, db=db, page=50, size=20)
+
+
+def _like(db: Session, user: User, rng: random.Random, population: Population) -> Any:
+    return like_profile(target_id=population.targets.pick(), current_user=user, db=db)
+
+
+def _skip(db: Session, user: User, rng: random.Random, population: Population) -> Any:
+    return skip_profile(target_id=population.targets.pick(), current_user=user, db=db)
+
+
+def _matches(db: Session, user: User, rng: random.Random, population: Population) -> Any:
+    return matches_json(current_user=user, db=db)
+
+
+CASES = [
+    Case("feed_json", _feed_first_page),
+    Case("feed_json_page50", _feed_deep_page),
+    Case("like_profile", _like),
+    Case("skip_profile", _skip),
+    Case("matches_json", _matches),
+    # Celebrities auto-like everyone back, so their match lists are the longest
+    Case("matches_json_celebrity", _matches, lambda rng, population: rng.choice(population.celebrity_ids)),
+]
+
+
+def _engine(path: Path) -> Engine:
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def _load_population(engine: Engine, spec: DatasetSpec, seed: int) -> Population:
+    with Session(engine) as db:
+        active = set(db.scalars(select(Profile.user_id).where(Profile.is_active.is_(True))))
+    ranked = [user_id for user_id in popularity_ranking(spec) if user_id in active]
+    return Population(
+        active_ids=sorted(active),
+        celebrity_ids=[user_id for user_id in celebrity_ids(spec) if user_id in active],
+        targets=TargetPicker(ranked, spec.skew, random.Random(seed)),
+    )
+
+
+def _call(engine: Engine, case: Case, rng: random.Random, population: Population) -> tuple:
+    """Run one call in a fresh session; return (seconds, statements, failed)."""
+    pick = case.pick_user or (lambda rng, population: rng.choice(population.active_ids))
+    with Session(engine) as db:
+        user = db.get(User, pick(rng, population))
+        with count_queries(engine) as counter:
+            started = time.perf_counter()
+            try:
+                case.run(db, user, rng, population)
+                failed = False
+            except HTTPException:
+                # e.g. liking a target that is inactive or the user themself
+                failed = True
+            elapsed = time.perf_counter() - started
+    return elapsed, counter.count, failed
+
+
+def run_case(
+    engine_path: Path,
+    case: Case,
+    population: Population,
+    *,
+    calls: int,
+    cold_calls: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Time one case.
+
+    Cold calls each use a brand-new engine and empty in-process caches, so
+    the connection, SQLite's page cache, SQLAlchemy's compiled-statement
+    cache and the profile caches all start empty (the OS file cache stays
+    warm). Warm calls share one engine after a short warmup.
+    """
+    rng = random.Random(seed)
+    cold: List[float] = []
+    for _ in range(cold_calls):
+        clear_all()
+        engine = _engine(engine_path)
+        elapsed, _, _ = _call(engine, case, rng, population)
+        engine.dispose()
+        cold.append(elapsed)
+
+    engine = _engine(engine_path)
+    for _ in range(min(10, calls)):
+        _call(engine, case, rng, population)
+
+    warm: List[float] = []
+    statements = 0
+    failures = 0
+    for _ in range(calls):
+        elapsed, count, failed = _call(engine, case, rng, population)
+        warm.append(elapsed)
+        statements += count
+        failures += failed
+    engine.dispose()
+
+    return {
+        "cold": summarize(cold),
+        "warm": summarize(warm),
+        "queries_per_call": round(statements / calls, 3) if calls else 0.0,
+        "failed_calls": failures,
+    }
+
+
+def run_benchmarks(
+    dataset_path: Path,
+    spec: DatasetSpec,
+    *,
+    calls: int = 200,
+    cold_calls: int = 5,
+    seed: int = 1,
+    cases: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run every case against a scratch copy of ``dataset_path``.
+
+    Writes from like/skip go to the copy, so the cached dataset stays
+    pristine and every run starts from identical data.
+    """
+    selected = [case for case in CASES if cases is None or case.name in cases]
+    with tempfile.TemporaryDirectory(prefix="anecdote-bench-") as scratch:
+        work_path = Path(scratch) / "bench.db"
+        shutil.copyfile(dataset_path, work_path)
+
+        engine = _engine(work_path)
+        population = _load_population(engine, spec, seed)
+        engine.dispose()
+
+        results = {
+            case.name: run_case(
+                work_path, case, population, calls=calls, cold_calls=cold_calls, seed=seed
+            )
+            for case in selected
+        }
+
+    return {
+        "meta": {
+            "users": spec.users,
+            "dataset": spec.filename,
+            "calls": calls,
+            "cold_calls": cold_calls,
+            "seed": seed,
+            "sqlite_version": sqlite3.sqlite_version,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
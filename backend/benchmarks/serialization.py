@@ -0,0 +1,104 @@
+"""
+Serialization cost of one feed page, before and after the fast JSON paths.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.serialization --size 100
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.encoding import dumps
+from app.models.profile import GenderEnum, Profile
+from app.schemas.like import FeedProfileResponse, FeedResponse
+from app.services.cards import FEED_CARD, encode_cards
+from app.services.feed import FEED_PROFILE_FIELDS
+from benchmarks.stats import summarize
+
+
+# What FastAPI does with a returned model: validate against response_model, then dump JSON
+_response_model = TypeAdapter(FeedResponse)
+_feed_profiles = TypeAdapter(List[FeedProfileResponse])
+GENDERS = list(GenderEnum)
+
+
+def _rows(size: int) -> List[Tuple]:
+    return [
+        (index, index, f"User {index}", GENDERS[index % len(GENDERS)], None, "Why did the chicken cross the road?")
+        for index in range(1, size + 1)
+    ]
+
+
+def _page(profiles, size: int) -> Dict:
+    return {"profiles": profiles, "total": size * 10, "page": 1, "size": size, "has_next": True, "has_prev": False}
+
+
+def paths(size: int) -> Dict[str, Callable[[], bytes]]:
+    """The ways a feed page has been rendered, each returning the response body."""
+    rows = _rows(size)
+    versioned_rows = [row + (datetime(2024, 1, 1),) for row in rows]
+
+    def orm_model_validate() -> bytes:
+        # Before: hydrate entities, validate each, then FastAPI validates and dumps again
+        entities = [Profile(**dict(zip(FEED_PROFILE_FIELDS, row))) for row in rows]
+        response = FeedResponse(**_page([FeedProfileResponse.model_validate(entity) for entity in entities], size))
+        return _response_model.dump_json(_response_model.validate_python(response))
+
+    def tuples_type_adapter() -> bytes:
+        # One TypeAdapter call over dicts built from tuples
+        profiles = _feed_profiles.validate_python([dict(zip(FEED_PROFILE_FIELDS, row)) for row in rows])
+        response = FeedResponse(**_page(profiles, size))
+        return _response_model.dump_json(_response_model.validate_python(response))
+
+    def tuples_fast_json() -> bytes:
+        # Dicts from tuples rendered once, no models at all
+        return dumps(_page([dict(zip(FEED_PROFILE_FIELDS, row)) for row in rows], size))
+
+    def cached_cards() -> bytes:
+        # feed_json(): cached card bytes spliced into the envelope (cache warm after the first call)
+        cards = encode_cards(FEED_CARD, FEED_PROFILE_FIELDS, versioned_rows)
+        meta = dumps({key: value for key, value in _page(None, size).items() if key != "profiles"})[1:]
+        return b'{"profiles":[' + b",".join(cards) + b"]," + meta
+
+    return {
+        "orm_model_validate": orm_model_validate,
+        "tuples_type_adapter": tuples_type_adapter,
+        "tuples_fast_json": tuples_fast_json,
+        "cached_cards": cached_cards,
+    }
+
+
+def measure(size: int, repeat: int, number: int) -> Dict[str, Dict[str, float]]:
+    """Time each path; each sample is the mean of ``number`` renders."""
+    return {
+        name: summarize([seconds / number for seconds in timeit.repeat(render, repeat=repeat, number=number)])
+        for name, render in paths(size).items()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization", description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100, help="Profiles per page (default: 100)")
+    parser.add_argument("--repeat", type=int, default=30, help="Samples per path")
+    parser.add_argument("--number", type=int, default=100, help="Renders averaged into each sample")
+    args = parser.parse_args(argv)
+
+    results = measure(args.size, args.repeat, args.number)
+    baseline = results["orm_model_validate"]["p50_ms"]
+    print(f"{'path':<24}{'p50 µs':>10}{'p95 µs':>10}{'speedup':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['p50_ms'] * 1000:>10.1f}{result['p95_ms'] * 1000:>10.1f}"
+            f"{baseline / result['p50_ms']:>9.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Latency summaries shared by the benchmark and load-test tools."""
+
+import math
+from typing import Dict, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Return the ``q`` quantile (0..1) of already sorted values.
+
+    Uses linear interpolation between the closest ranks, like NumPy's
+    default, so small samples do not snap to a single observation.
+    """
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize durations given in seconds.
+
+    Returns:
+        Call count plus mean, p50, p95, p99 and max in milliseconds
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {"calls": 0}
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
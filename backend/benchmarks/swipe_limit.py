@@ -0,0 +1,106 @@
+"""
+Per-request cost of the swipe rate limiter, private and shared across workers.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.swipe_limit --users 100000
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import secrets
+import sys
+import tempfile
+import time
+import timeit
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Optional
+
+from fastapi import Depends, FastAPI, Response
+
+from app.api.ratelimit import limit_swipes
+from app.ratelimit import RateLimiter, swipe_limiter
+
+
+def _request_us(dependency: str, users: int, number: int) -> float:
+    """Mean latency of a trivial swipe route called in-process: ``none``, ``noop`` or ``limit``."""
+    user_ids = itertools.count()
+
+    def current_user() -> SimpleNamespace:
+        return SimpleNamespace(id=next(user_ids) % users + 1)
+
+    # Same shape as limit_swipes' own signature, minus the session lookup
+    async def limit(response: Response, user: SimpleNamespace = Depends(current_user)) -> AsyncIterator[None]:
+        async for _ in limit_swipes(response, user):
+            yield
+
+    async def noop(response: Response, user: SimpleNamespace = Depends(current_user)) -> AsyncIterator[None]:
+        yield
+
+    api = FastAPI()
+    extra = {"none": [], "noop": [Depends(noop)], "limit": [Depends(limit)]}[dependency]
+    dependencies = [Depends(current_user), *extra]
+
+    @api.post("/swipe", dependencies=dependencies)
+    async def swipe() -> dict:
+        return {"ok": True}
+
+    scope = {"type": "http", "method": "POST", "path": "/swipe", "query_string": b"", "headers": []}
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    async def run() -> float:
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(number):
+                await api(dict(scope), receive, send)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    return asyncio.run(run()) / number * 1e6
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.swipe_limit", description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100000, help="Users swiping within one burst window")
+    parser.add_argument("--slots", type=int, default=262144, help="Limiter table slots")
+    parser.add_argument("--number", type=int, default=20000, help="Checks per timing sample")
+    args = parser.parse_args(argv)
+
+    private = RateLimiter("bench", per_minute=600, burst=10**6, slots=args.slots)
+    shared = RateLimiter("bench", per_minute=600, burst=10**6, slots=args.slots)
+    shared.attach(f"anecdote-bench-{secrets.token_hex(4)}", os.path.join(tempfile.mkdtemp(), "swipe.lock"))
+    try:
+        print(f"{'table':<10}{'µs per check':>14}{'MiB':>8}")
+        for name, limiter in (("private", private), ("shared", shared)):
+            # Every user has swiped recently, so each check finds a live slot
+            now = time.time()
+            for user_id in range(1, args.users + 1):
+                limiter.check(user_id, now=now)
+            user_ids = itertools.count()
+            per_check = min(
+                timeit.repeat(lambda: limiter.check(next(user_ids) % args.users + 1), repeat=5, number=args.number)
+            )
+            size = (limiter.slots * 2 + 4) * 8 / 2**20
+            print(f"{name:<10}{per_check / args.number * 1e6:>14.2f}{size:>8.1f}")
+    finally:
+        shared.unlink()
+
+    # Keep every request under quota so both routes do the same work
+    swipe_limiter.configure(per_minute=600, burst=10**6)
+    print()
+    print(f"{'route':<22}{'µs per request':>16}")
+    for label, dependency in (("no dependency", "none"), ("no-op dependency", "noop"), ("swipe limit", "limit")):
+        print(f"{label:<22}{_request_us(dependency, args.users, args.number // 10):>16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
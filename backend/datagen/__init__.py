@@ -0,0 +1,19 @@
+"""Synthetic data generator for capacity planning and benchmarks."""
+
+from datagen.generate import (
+    GeneratorSpec,
+    TargetPicker,
+    celebrity_ids,
+    generate,
+    popularity_ranking,
+    speed_up_sqlite,
+)
+
+__all__ = [
+    "GeneratorSpec",
+    "TargetPicker",
+    "celebrity_ids",
+    "generate",
+    "popularity_ranking",
+    "speed_up_sqlite",
+]
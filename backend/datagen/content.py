@@ -0,0 +1,152 @@
+"""Multilingual profile text assembled from small fragment pools."""
+
+import random
+from typing import Dict, List, NamedTuple
+
+
+class Language(NamedTuple):
+    first_names: List[str]
+    bios: List[str]
+    hobbies: List[str]
+    jokes: List[str]
+
+
+LANGUAGES: Dict[str, Language] = {
+    "en": Language(
+        first_names=["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"],
+        bios=[
+            "Coffee first, questions later.",
+            "Software engineer by day, amateur baker by night.",
+            "Looking for someone to laugh at my terrible puns.",
+            "Dog person, mountain person, pizza person.",
+            "I have read every book on my shelf at least twice.",
+        ],
+        hobbies=["hiking", "board games", "photography", "running", "cooking", "jazz", "climbing"],
+        jokes=[
+            "I told my wife she was drawing her eyebrows too high. She looked surprised.",
+            "Why don't skeletons fight each other? They don't have the guts.",
+            "I'm reading a book about anti-gravity. It's impossible to put down.",
+        ],
+    ),
+    "ru": Language(
+        first_names=["Алексей", "Мария", "Дмитрий", "Анна", "Иван", "Ольга", "Сергей", "Екатерина"],
+        bios=[
+            "Люблю долгие прогулки и короткие сообщения.",
+            "Программист, который умеет готовить борщ.",
+            "Ищу человека, который оценит мои шутки.",
+            "Путешествую, фотографирую, иногда высыпаюсь.",
+            "Читаю больше, чем сплю.",
+        ],
+        hobbies=["шахматы", "походы", "фотография", "бег", "кулинария", "театр", "рыбалка"],
+        jokes=[
+            "Вести подсчёт пчёл в улье довольно опасно. Раз, два — и опчёлся.",
+            "— Доктор, я вижу будущее! — Когда это началось? — В следующий вторник.",
+            "Оптимист изучает английский, пессимист — китайский, реалист — автомат Калашникова.",
+        ],
+    ),
+    "es": Language(
+        first_names=["Lucía", "Mateo", "Sofía", "Diego", "Valentina", "Pablo", "Carmen", "Javier"],
+        bios=[
+            "Amante del café y de las siestas largas.",
+            "Bailo mal, pero con mucho entusiasmo.",
+            "Busco a alguien con quien compartir tapas.",
+            "Viajera empedernida y lectora nocturna.",
+        ],
+        hobbies=["fútbol", "salsa", "senderismo", "cocina", "guitarra", "surf"],
+        jokes=[
+            "¿Qué le dice un techo a otro? Techo de menos.",
+            "¿Cómo se despiden los químicos? Ácido un placer.",
+        ],
+    ),
+    "de": Language(
+        first_names=["Lukas", "Anna", "Felix", "Lena", "Jonas", "Marie", "Paul", "Sophie"],
+        bios=[
+            "Pünktlich, ehrlich und meistens gut gelaunt.",
+            "Ich backe das beste Brot in meiner Straße.",
+            "Suche jemanden für Wanderungen und lange Gespräche.",
+        ],
+        hobbies=["Wandern", "Radfahren", "Brettspiele", "Fußball", "Kochen", "Lesen"],
+        jokes=[
+            "Was ist orange und läuft durch den Wald? Eine Wanderine.",
+            "Treffen sich zwei Jäger. Beide tot.",
+        ],
+    ),
+    "fr": Language(
+        first_names=["Camille", "Louis", "Chloé", "Hugo", "Léa", "Arthur", "Manon", "Jules"],
+        bios=[
+            "Amoureuse du fromage et des vieux films.",
+            "Je cuisine mieux que je ne chante.",
+            "Toujours partant pour un pique-nique improvisé.",
+        ],
+        hobbies=["cinéma", "vélo", "peinture", "œnologie", "escalade", "théâtre"],
+        jokes=[
+            "Qu'est-ce qui est jaune et qui attend ? Jonathan.",
+            "Pourquoi les plongeurs plongent-ils toujours en arrière ? Sinon ils tombent dans le bateau.",
+        ],
+    ),
+    "pt": Language(
+        first_names=["Beatriz", "João", "Mariana", "Pedro", "Ana", "Rafael", "Inês", "Tiago"],
+        bios=[
+            "Praia, música e boas conversas.",
+            "Cozinho feijoada aos domingos.",
+        ],
+        hobbies=["surfe", "samba", "futebol", "leitura", "viagens"],
+        jokes=["O que o pato disse para a pata? Vem quá!"],
+    ),
+    "ja": Language(
+        first_names=["さくら", "ひろし", "ゆき", "たけし", "あおい", "けんた"],
+        bios=[
+            "カフェ巡りが好きです。",
+            "週末は山登りをしています。",
+            "一緒にラーメンを食べに行きませんか。",
+        ],
+        hobbies=["写真", "料理", "読書", "旅行", "カラオケ", "ゲーム"],
+        jokes=["布団が吹っ飛んだ。", "アルミ缶の上にあるミカン。"],
+    ),
+    "zh": Language(
+        first_names=["伟", "芳", "静", "磊", "婷", "强"],
+        bios=["喜欢旅行和美食。", "程序员，会做饭。", "周末喜欢爬山。"],
+        hobbies=["书法", "篮球", "摄影", "烹饪", "阅读"],
+        jokes=["为什么程序员分不清万圣节和圣诞节？因为 Oct 31 等于 Dec 25。"],
+    ),
+    "ar": Language(
+        first_names=["ليلى", "عمر", "نور", "يوسف", "سارة", "خالد"],
+        bios=["أحب القهوة والكتب الجيدة.", "مهندس يحب الطبخ في عطلة نهاية الأسبوع."],
+        hobbies=["القراءة", "السفر", "كرة القدم", "الطبخ", "التصوير"],
+        jokes=["لماذا لا تلعب الأسماك كرة السلة؟ لأنها تخاف من الشبكة."],
+    ),
+}
+
+# Share of profiles written in each language
+DEFAULT_LANGUAGE_WEIGHTS: Dict[str, float] = {
+    "en": 0.35,
+    "ru": 0.25,
+    "es": 0.10,
+    "de": 0.07,
+    "fr": 0.07,
+    "pt": 0.05,
+    "ja": 0.04,
+    "zh": 0.04,
+    "ar": 0.03,
+}
+
+
+class ContentPicker:
+    """Compose display names, bios, hobby lists and jokes for one language mix."""
+
+    def __init__(self, rng: random.Random, weights: Dict[str, float] = DEFAULT_LANGUAGE_WEIGHTS) -> None:
+        self.rng = rng
+        self.codes = list(weights)
+        self.weights = [weights[code] for code in self.codes]
+
+    def profile(self, user_id: int) -> Dict[str, str]:
+        rng = self.rng
+        language = LANGUAGES[rng.choices(self.codes, self.weights)[0]]
+        bio = " ".join(rng.sample(language.bios, k=min(len(language.bios), rng.randint(1, 2))))
+        hobbies = ", ".join(rng.sample(language.hobbies, k=min(len(language.hobbies), rng.randint(1, 4))))
+        return {
+            "display_name": f"{rng.choice(language.first_names)} {user_id}",
+            "bio": bio,
+            "hobbies": hobbies,
+            "favorite_joke": rng.choice(language.jokes),
+        }
@@ -0,0 +1,295 @@
+"""Generate users, profiles and power-law swipe histories."""
+
+import bisect
+import itertools
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Index, Table, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base import Base
+from app.db.bulk import bulk_insert
+from app.models.like import Like
+from app.models.profile import GenderEnum, Profile
+from app.models.profile_view import InteractionType, ProfileView
+from app.models.user import User
+from datagen.content import ContentPicker
+from datagen.passwords import hash_passwords
+
+
+EPOCH = datetime(2024, 1, 1)
+GENDERS = [GenderEnum.MALE, GenderEnum.FEMALE, GenderEnum.OTHER, None]
+BATCH_SIZE = 50_000
+
+Progress = Callable[[str, int, float], None]
+
+
+@dataclass(frozen=True)
+class GeneratorSpec:
+    """Parameters that fully determine the generated data."""
+    users: int
+    # Profile views to create; about ``like_ratio`` of them are likes
+    swipes: int
+    seed: int = 42
+    like_ratio: float = 0.4
+    celebrity_fraction: float = 0.001
+    inactive_fraction: float = 0.05
+    # Exponent of the Zipf distribution used to pick swipe targets
+    skew: float = 1.1
+    # Distinct passwords, assigned round-robin (see datagen.passwords)
+    passwords: int = 1
+
+    @property
+    def swipes_per_user(self) -> float:
+        return self.swipes / self.users if self.users else 0.0
+
+    @property
+    def cache_key(self) -> str:
+        return (
+            f"users{self.users}-swipes{self.swipes}-seed{self.seed}"
+            f"-like{self.like_ratio:g}-skew{self.skew:g}-celeb{self.celebrity_fraction:g}"
+        )
+
+
+class TargetPicker:
+    """Draw user ids with a Zipf-shaped popularity; rank 1 is the most swiped."""
+
+    def __init__(self, ranked_ids: List[int], skew: float, rng: random.Random) -> None:
+        self.ranked_ids = ranked_ids
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, len(ranked_ids) + 1)))
+        self.total = self.cumulative[-1]
+
+    def pick(self) -> int:
+        index = bisect.bisect_left(self.cumulative, self.rng.random() * self.total)
+        return self.ranked_ids[min(index, len(self.ranked_ids) - 1)]
+
+
+def popularity_ranking(spec: GeneratorSpec) -> List[int]:
+    """Return user ids (1..N) ordered from most to least popular, deterministically."""
+    ranked = list(range(1, spec.users + 1))
+    random.Random(spec.seed).shuffle(ranked)
+    return ranked
+
+
+def celebrity_ids(spec: GeneratorSpec) -> List[int]:
+    """The most popular users are the celebrities who auto-like back."""
+    count = max(1, int(spec.users * spec.celebrity_fraction))
+    return popularity_ranking(spec)[:count]
+
+
+def user_rows(spec: GeneratorSpec, password_hashes: List[str], celebrities: set) -> Iterator[dict]:
+    for user_id in range(1, spec.users + 1):
+        created = EPOCH + timedelta(seconds=user_id)
+        yield {
+            "id": user_id,
+            "email": f"user{user_id}@example.com",
+            "username": f"user{user_id}",
+            "hashed_password": password_hashes[user_id % len(password_hashes)],
+            "is_celebrity": user_id in celebrities,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def profile_rows(spec: GeneratorSpec, rng: random.Random) -> Iterator[dict]:
+    content = ContentPicker(rng)
+    for user_id in range(1, spec.users + 1):
+        created = EPOCH + timedelta(seconds=user_id)
+        yield {
+            "id": user_id,
+            "user_id": user_id,
+            "gender": rng.choice(GENDERS),
+            "is_active": rng.random() >= spec.inactive_fraction,
+            "created_at": created,
+            "updated_at": created,
+            **content.profile(user_id),
+        }
+
+
+def swipe_rows(spec: GeneratorSpec, rng: random.Random, celebrities: set) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield ("view" | "like", row) pairs for every user's swipe history.
+
+    Swipe counts per user are exponentially distributed around the mean,
+    targets follow the popularity ranking, and a like of a celebrity is
+    answered by the celebrity's automatic like back.
+    """
+    picker = TargetPicker(popularity_ranking(spec), spec.skew, rng)
+    swipers = spec.users - len(celebrities)
+    mean = spec.swipes / swipers if swipers > 0 else 0.0
+    for viewer_id in range(1, spec.users + 1):
+        if viewer_id in celebrities:
+            continue
+        count = min(int(rng.expovariate(1.0 / mean)) if mean > 0 else 0, spec.users - 1)
+        seen = set()
+        for _ in range(count * 2):
+            if len(seen) >= count:
+                break
+            target_id = picker.pick()
+            if target_id == viewer_id or target_id in seen:
+                continue
+            seen.add(target_id)
+            created = EPOCH + timedelta(seconds=spec.users + viewer_id * 100 + len(seen))
+            liked = rng.random() < spec.like_ratio
+            yield "view", {
+                "viewer_id": viewer_id,
+                "viewed_profile_id": target_id,
+                "interaction_type": InteractionType.LIKE if liked else InteractionType.SKIP,
+                "created_at": created,
+            }
+            if liked:
+                yield "like", {
+                    "liker_id": viewer_id,
+                    "target_id": target_id,
+                    "mutual": False,
+                    "created_at": created,
+                    "updated_at": created,
+                }
+                if target_id in celebrities:
+                    yield "like", {
+                        "liker_id": target_id,
+                        "target_id": viewer_id,
+                        "mutual": True,
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+
+
+def speed_up_sqlite(engine: Engine) -> None:
+    """
+    Trade durability for load speed on a SQLite engine.
+
+    Keeps the rollback journal in memory and skips fsync, so a crash mid-load
+    can corrupt the file; only use it on databases being generated.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA cache_size=-262144")
+        cursor.close()
+
+
+def _droppable_indexes(connection: Connection, tables: Iterable[Table]) -> List[Index]:
+    """Return the model's secondary indexes that currently exist on ``tables``."""
+    inspector = inspect(connection)
+    indexes: List[Index] = []
+    for table in tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        indexes.extend(index for index in table.indexes if index.name in existing)
+    return indexes
+
+
+def _timed_insert(
+    connection: Connection,
+    table: Table,
+    rows: Iterable[dict],
+    progress: Optional[Progress],
+) -> int:
+    started = time.perf_counter()
+    count = bulk_insert(connection, table, rows, batch_size=BATCH_SIZE)
+    if progress is not None:
+        progress(table.name, count, time.perf_counter() - started)
+    return count
+
+
+def generate(
+    engine: Engine,
+    spec: GeneratorSpec,
+    *,
+    workers: Optional[int] = None,
+    progress: Optional[Progress] = None,
+) -> Dict[str, int]:
+    """
+    Create the schema and fill an empty database according to ``spec``.
+
+    Rows are streamed through ``bulk_insert`` (``COPY`` on PostgreSQL,
+    batched ``executemany`` elsewhere) inside one transaction, so memory
+    stays flat however many swipes are generated.
+
+    Args:
+        engine: Target database; its user table must be empty
+        spec: What to generate
+        workers: Processes used to hash a pool of distinct passwords
+        progress: Called with ``(table, rows, seconds)`` after each table
+
+    Returns:
+        Rows inserted per table
+
+    Raises:
+        ValueError: If the database already contains users
+    """
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        existing = connection.execute(text("SELECT COUNT(*) FROM users")).scalar_one()
+    if existing:
+        raise ValueError(f"Database already contains {existing} users; generate into an empty database")
+
+    rng = random.Random(spec.seed)
+    celebrities = set(celebrity_ids(spec))
+    password_hashes = hash_passwords(spec.passwords, workers)
+    counts: Dict[str, int] = {}
+
+    with engine.begin() as connection:
+        counts["users"] = _timed_insert(
+            connection, User.__table__, user_rows(spec, password_hashes, celebrities), progress
+        )
+        counts["profiles"] = _timed_insert(connection, Profile.__table__, profile_rows(spec, rng), progress)
+
+        # Loading into unindexed tables and indexing afterwards is much
+        # cheaper than maintaining secondary indexes row by row
+        deferred = _droppable_indexes(connection, (ProfileView.__table__, Like.__table__))
+        for index in deferred:
+            index.drop(connection)
+
+        # Views and likes come from one stream; flush them side by side
+        started = time.perf_counter()
+        counts["profile_views"] = counts["likes"] = 0
+        swipes = swipe_rows(spec, rng, celebrities)
+        while True:
+            pending: Dict[str, List[dict]] = {"view": [], "like": []}
+            for kind, row in itertools.islice(swipes, BATCH_SIZE):
+                pending[kind].append(row)
+            if not pending["view"] and not pending["like"]:
+                break
+            counts["profile_views"] += bulk_insert(connection, ProfileView.__table__, pending["view"])
+            counts["likes"] += bulk_insert(connection, Like.__table__, pending["like"])
+        if progress is not None:
+            progress("profile_views+likes", counts["profile_views"] + counts["likes"], time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for index in deferred:
+            index.create(connection)
+        if progress is not None:
+            progress("secondary indexes", len(deferred), time.perf_counter() - started)
+
+        # A like is mutual when the reverse like exists
+        started = time.perf_counter()
+        connection.execute(text(
+            "UPDATE likes SET mutual = :true WHERE mutual = :false AND EXISTS ("
+            " SELECT 1 FROM likes AS reverse"
+            " WHERE reverse.liker_id = likes.target_id AND reverse.target_id = likes.liker_id)"
+        ), {"true": True, "false": False})
+        if progress is not None:
+            progress("mutual likes", counts["likes"], time.perf_counter() - started)
+
+        if engine.dialect.name == "postgresql":
+            # Explicit ids bypass the serial sequences; move them past the data
+            for table in ("users", "profiles", "likes", "profile_views"):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+                ))
+
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    return counts
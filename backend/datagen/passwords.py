@@ -0,0 +1,30 @@
+"""Password hashes for generated users."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from app.auth import get_password_hash
+
+
+def password_for(user_id: int, distinct: int) -> str:
+    """Return the plain-text password of a generated user."""
+    if distinct <= 1:
+        return "password123"
+    return f"password{user_id % distinct}"
+
+
+def hash_passwords(distinct: int, workers: Optional[int] = None) -> List[str]:
+    """
+    Hash ``distinct`` passwords; user ``i`` gets entry ``i % distinct``.
+
+    bcrypt costs a few hundred milliseconds per hash, so hashing every
+    user's password would dominate generation. One shared hash is the
+    default; a larger pool is hashed across processes.
+    """
+    plain = [password_for(index, distinct) for index in range(max(distinct, 1))]
+    if len(plain) == 1:
+        return [get_password_hash(plain[0])]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(get_password_hash, plain, chunksize=max(1, len(plain) // (workers * 4))))
@@ -0,0 +1 @@
+"""HTTP load generator that replays swipe sessions against the whole ASGI stack."""
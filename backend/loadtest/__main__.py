@@ -0,0 +1,158 @@
+"""
+Command-line entry point.
+
+Usage (from ``backend/``)::
+
+    python -m datagen --users 10000 --swipes 200000 --database-url sqlite:///./data/load.db
+    python -m loadtest --database-url sqlite:///./data/load.db --workers 4 --users 10000
+    python -m loadtest --url http://127.0.0.1:8000 --users 10000 --concurrency 8,16,32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loadtest.harness import find_saturation, http_client, in_process_client, ramp, spawn_server
+from loadtest.scenario import Mix, UserPool
+
+
+DEFAULT_SERVER_LOG = Path("./data/loadtest-server.log")
+
+
+def _levels(value: str) -> List[int]:
+    return [int(level) for level in value.split(",") if level.strip()]
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Load an already running server instead of spawning one")
+    target.add_argument("--in-process", action="store_true", help="Call the app over ASGI in this process")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes to spawn (default: 1)")
+    parser.add_argument("--database-url", help="DATABASE_URL for the spawned or in-process app")
+    parser.add_argument(
+        "--server-log", type=Path, default=DEFAULT_SERVER_LOG, help="Where the spawned server's output goes"
+    )
+    parser.add_argument("--users", type=int, required=True, help="Accounts to log in as: datagen's user1..userN")
+    parser.add_argument("--passwords", type=int, default=1, help="The --passwords the data was generated with")
+    parser.add_argument("--concurrency", type=_levels, default=[1, 2, 4, 8, 16, 32, 64], help="Comma-separated ramp")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unrecorded seconds before the ramp")
+    parser.add_argument("--like", type=float, default=Mix.like, help="Weight of likes")
+    parser.add_argument("--skip", type=float, default=Mix.skip, help="Weight of skips")
+    parser.add_argument("--matches", type=float, default=Mix.matches, help="Weight of match-list polls")
+    parser.add_argument("--page-size", type=int, default=Mix.page_size, help="Feed page size")
+    parser.add_argument("--actions", type=int, default=Mix.actions_per_session, help="Actions per session")
+    parser.add_argument("--think-time", type=float, default=Mix.think_time, help="Mean pause between actions (s)")
+    parser.add_argument("--slo-ms", type=float, help="p95 above this counts as saturated")
+    parser.add_argument("--min-gain", type=float, default=0.10, help="Throughput gain a step must add (default: 0.10)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate counted as saturated")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the virtual users' choices")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def _print_step(step: Dict[str, Any]) -> None:
+    latency = step["latency"]
+    print(
+        f"{step['concurrency']:>11}{step['rps']:>10.1f}{step['error_rate']:>9.2%}"
+        f"{latency.get('p50_ms', 0.0):>10.1f}{latency.get('p95_ms', 0.0):>10.1f}{latency.get('p99_ms', 0.0):>10.1f}",
+        flush=True,
+    )
+
+
+def _print_routes(step: Dict[str, Any]) -> None:
+    header = f"{'route':<26}{'rps':>9}{'errors':>9}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header)
+    print("-" * len(header))
+    for route, result in step["routes"].items():
+        print(
+            f"{route:<26}{result['rps']:>9.1f}{result['error_rate']:>9.2%}"
+            f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+        )
+    print("(milliseconds)")
+
+
+async def _run(args: argparse.Namespace, base_url: Optional[str]) -> List[Dict[str, Any]]:
+    # Imports app.config, which must not happen before --in-process sets DATABASE_URL
+    from datagen.passwords import password_for
+
+    mix = Mix(
+        like=args.like,
+        skip=args.skip,
+        matches=args.matches,
+        page_size=args.page_size,
+        actions_per_session=args.actions,
+        think_time=args.think_time,
+    )
+    pool = UserPool([
+        (f"user{user_id}@example.com", password_for(user_id, args.passwords))
+        for user_id in range(1, args.users + 1)
+    ])
+    header = f"{'concurrency':>11}{'rps':>10}{'errors':>9}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header)
+    print("-" * len(header))
+
+    if base_url is None:
+        from app.main import app
+
+        client_context = in_process_client(app)
+    else:
+        client_context = http_client(base_url, max(args.concurrency))
+    async with client_context as client:
+        return await ramp(
+            client, pool, mix,
+            levels=args.concurrency, duration=args.duration, warmup=args.warmup,
+            seed=args.seed, progress=_print_step,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.users < max(args.concurrency):
+        print("❌ --users must be at least the highest concurrency level; each virtual user needs its own account")
+        return 1
+    env = {"DATABASE_URL": args.database_url} if args.database_url else {}
+
+    if args.url:
+        mode = args.url
+        steps = asyncio.run(_run(args, args.url))
+    elif args.in_process:
+        mode = "in-process"
+        # Must be set before app.config is imported
+        os.environ.update(env)
+        steps = asyncio.run(_run(args, None))
+    else:
+        mode = f"uvicorn --workers {args.workers}"
+        print(f"Starting {mode}; server output goes to {args.server_log}")
+        with spawn_server(workers=args.workers, env=env, log_path=args.server_log) as url:
+            steps = asyncio.run(_run(args, url))
+
+    saturation = find_saturation(
+        steps, min_gain=args.min_gain, max_error_rate=args.max_error_rate, slo_ms=args.slo_ms
+    )
+    print()
+    if saturation is None:
+        print(f"❌ Saturated at the first level ({mode}); lower --concurrency")
+    else:
+        print(
+            f"Saturation ({mode}): ~{saturation['rps']:.0f} req/s at concurrency "
+            f"{saturation['concurrency']}, p95 {saturation['p95_ms']:.1f} ms ({saturation['reason']})"
+        )
+        best = next(step for step in steps if step["concurrency"] == saturation["concurrency"])
+        print()
+        _print_routes(best)
+
+    if args.output:
+        report = {"mode": mode, "workers": args.workers, "steps": steps, "saturation": saturation}
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Drive the app at increasing concurrency and find where throughput stops scaling."""
+
+import asyncio
+import contextlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from loadtest.recorder import Recorder
+from loadtest.scenario import Mix, UserPool, run_session
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def spawn_server(
+    *,
+    workers: int = 1,
+    env: Optional[Dict[str, str]] = None,
+    backend_dir: Path = BACKEND_DIR,
+    log_path: Optional[Path] = None,
+    startup_timeout: float = 30.0,
+) -> Iterator[str]:
+    """
+    Run ``uvicorn app.main:app`` in a subprocess and yield its base URL.
+
+    ``backend_dir`` selects the build: point it at another checkout's
+    ``backend/`` to load that version of the app. The server's output goes
+    to ``log_path`` when given, so slow-request and event-loop warnings do
+    not drown the load report.
+
+    Raises:
+        RuntimeError: If the server exits or stays unhealthy during startup
+    """
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers),
+        "--no-access-log", "--log-level", "warning",
+    ]
+    with contextlib.ExitStack() as stack:
+        log = None
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            log = stack.enter_context(log_path.open("ab"))
+        process = subprocess.Popen(
+            command, cwd=backend_dir, env={**os.environ, **(env or {})}, stdout=log, stderr=log
+        )
+        yield from _serve(process, f"http://127.0.0.1:{port}", startup_timeout)
+
+
+def _serve(process: subprocess.Popen, url: str, startup_timeout: float) -> Iterator[str]:
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode} during startup")
+            try:
+                if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn did not become healthy within {startup_timeout:g}s")
+            time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@contextlib.asynccontextmanager
+async def http_client(url: str, max_connections: int) -> AsyncIterator[httpx.AsyncClient]:
+    """A keep-alive client for a real server."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        yield client
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(app: Any, *, lifespan: bool = True) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    A client that calls ``app`` directly over ASGI, without sockets.
+
+    The load generator then shares the event loop with the app, so numbers
+    are lower than against a separate server; use it for quick comparisons.
+    """
+    async with contextlib.AsyncExitStack() as stack:
+        if lifespan:
+            await stack.enter_async_context(app.router.lifespan_context(app))
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30.0)
+        )
+        yield client
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    pool: UserPool,
+    mix: Mix,
+    *,
+    concurrency: int,
+    duration: float,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """
+    Run ``concurrency`` virtual users back to back for ``duration`` seconds.
+
+    Each virtual user plays sessions one after another, taking the next
+    free account from ``pool`` for each.
+    """
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    async def virtual_user(index: int) -> None:
+        rng = random.Random(seed * 100_003 + index)
+        while time.monotonic() < deadline:
+            await run_session(client, pool, mix, rng, recorder, deadline)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(index) for index in range(concurrency)))
+    return {"concurrency": concurrency, **recorder.report(time.perf_counter() - started)}
+
+
+async def ramp(
+    client: httpx.AsyncClient,
+    pool: UserPool,
+    mix: Mix,
+    *,
+    levels: List[int],
+    duration: float,
+    warmup: float = 0.0,
+    seed: int = 1,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Run one step per concurrency level, after an unrecorded warmup at the first level."""
+    if warmup > 0 and levels:
+        await run_step(client, pool, mix, concurrency=levels[0], duration=warmup, seed=seed)
+    steps = []
+    for concurrency in levels:
+        step = await run_step(client, pool, mix, concurrency=concurrency, duration=duration, seed=seed)
+        steps.append(step)
+        if progress is not None:
+            progress(step)
+    return steps
+
+
+def find_saturation(
+    steps: List[Dict[str, Any]],
+    *,
+    min_gain: float = 0.10,
+    max_error_rate: float = 0.01,
+    slo_ms: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Pick the highest concurrency that still paid for itself.
+
+    Walking up the ramp, a step ends the search when its error rate exceeds
+    ``max_error_rate``, its overall p95 exceeds ``slo_ms``, or it raised
+    throughput by less than ``min_gain`` over the previous good step.
+
+    Returns:
+        ``{"concurrency", "rps", "p95_ms", "reason"}`` for the last good
+        step, or None when even the first step failed
+    """
+    best = None
+    reason = "not reached"
+    for step in steps:
+        if step["error_rate"] > max_error_rate:
+            reason = f"error rate {step['error_rate']:.1%} at concurrency {step['concurrency']}"
+            break
+        p95 = step["latency"].get("p95_ms", 0.0)
+        if slo_ms is not None and p95 > slo_ms:
+            reason = f"p95 {p95:.0f} ms over the {slo_ms:g} ms SLO at concurrency {step['concurrency']}"
+            break
+        if best is not None and step["rps"] < best["rps"] * (1 + min_gain):
+            reason = f"throughput flat at concurrency {step['concurrency']}"
+            break
+        best = step
+    if best is None:
+        return None
+    return {
+        "concurrency": best["concurrency"],
+        "rps": best["rps"],
+        "p95_ms": best["latency"].get("p95_ms"),
+        "reason": reason,
+    }
@@ -0,0 +1,52 @@
+"""Collect per-route latencies and errors for one load step."""
+
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.stats import summarize
+
+
+class Recorder:
+    """Latencies (seconds) and failures keyed by route template, e.g. ``GET /feed``."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        self.latencies[route].append(seconds)
+        if not ok:
+            self.errors[route] += 1
+
+    @property
+    def requests(self) -> int:
+        return sum(len(samples) for samples in self.latencies.values())
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Summarize everything recorded during ``elapsed`` seconds.
+
+        Returns:
+            Request count, throughput, error rate, overall latency and the
+            same figures per route
+        """
+        requests = self.requests
+        errors = sum(self.errors.values())
+        routes = {}
+        for route in sorted(self.latencies):
+            samples = self.latencies[route]
+            routes[route] = {
+                **summarize(samples),
+                "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "errors": self.errors[route],
+                "error_rate": round(self.errors[route] / len(samples), 4),
+            }
+        return {
+            "requests": requests,
+            "seconds": round(elapsed, 3),
+            "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "latency": summarize([seconds for samples in self.latencies.values() for seconds in samples]),
+            "routes": routes,
+        }
@@ -0,0 +1,138 @@
+"""A virtual user's swipe session: log in, page the feed, like, skip and poll matches."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from loadtest.recorder import Recorder
+
+
+@dataclass(frozen=True)
+class Mix:
+    """Relative weights of the actions in a session, plus its shape."""
+    like: float = 0.35
+    skip: float = 0.55
+    matches: float = 0.10
+    page_size: int = 10
+    actions_per_session: int = 40
+    # Pause between actions; 0 drives the server as hard as possible
+    think_time: float = 0.0
+
+    def choose(self, rng: random.Random) -> str:
+        return rng.choices(("like", "skip", "matches"), (self.like, self.skip, self.matches))[0]
+
+
+class UserPool:
+    """
+    Hand out each account to one virtual user at a time.
+
+    Two sessions acting as the same user would race each other's likes.
+    Logins are also spaced at least a second apart per user: tokens are
+    JWTs with second resolution, so a second login in the same second
+    would collide on the unique session token. A session that comes
+    round sooner resumes with the user's last token instead.
+    """
+
+    def __init__(self, credentials: List[Tuple[str, str]]) -> None:
+        self.credentials = credentials
+        self.tokens: Dict[int, Tuple[str, float]] = {}
+        self.free: "asyncio.Queue[int]" = asyncio.Queue()
+        for index in range(len(credentials)):
+            self.free.put_nowait(index)
+
+    async def acquire(self) -> int:
+        return await self.free.get()
+
+    def release(self, index: int) -> None:
+        self.free.put_nowait(index)
+
+    def reusable_token(self, index: int) -> Optional[str]:
+        token, issued = self.tokens.get(index, (None, 0.0))
+        if token is not None and time.monotonic() - issued < 1.0:
+            return token
+        return None
+
+    def remember(self, index: int, token: str) -> None:
+        self.tokens[index] = (token, time.monotonic())
+
+
+async def timed_request(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    route: str,
+    method: str,
+    url: str,
+    **kwargs,
+) -> Optional[httpx.Response]:
+    """Send one request and record it under ``route``; transport errors count as failures."""
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        recorder.record(route, time.perf_counter() - started, ok=False)
+        return None
+    recorder.record(route, time.perf_counter() - started, ok=response.status_code < 400)
+    return response
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    pool: UserPool,
+    mix: Mix,
+    rng: random.Random,
+    recorder: Recorder,
+    deadline: float,
+) -> None:
+    """
+    Play one session as the next free user until it ends or ``deadline`` passes.
+
+    Swiped profiles drop out of the feed, so the client keeps reloading the
+    first page, as the frontend does, whenever its local queue runs dry.
+    """
+    user = await pool.acquire()
+    try:
+        token = pool.reusable_token(user)
+        if token is None:
+            email, password = pool.credentials[user]
+            response = await timed_request(
+                client, recorder, "POST /auth/login", "POST", "/auth/login",
+                json={"email": email, "password": password},
+            )
+            if response is None or response.status_code != 200:
+                return
+            token = response.json()["token"]
+            pool.remember(user, token)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        queue: List[int] = []
+        for _ in range(mix.actions_per_session):
+            if time.monotonic() >= deadline:
+                return
+            action = mix.choose(rng)
+            if action == "matches":
+                await timed_request(client, recorder, "GET /feed/matches", "GET", "/feed/matches", headers=headers)
+            else:
+                if not queue:
+                    response = await timed_request(
+                        client, recorder, "GET /feed", "GET", "/feed",
+                        params={"page": 1, "size": mix.page_size}, headers=headers,
+                    )
+                    if response is None or response.status_code != 200:
+                        return
+                    queue = [profile["user_id"] for profile in response.json()["profiles"]]
+                    if not queue:
+                        # Nobody left to swipe on
+                        return
+                target = queue.pop(0)
+                await timed_request(
+                    client, recorder, f"POST /feed/{{id}}/{action}", "POST", f"/feed/{target}/{action}",
+                    headers=headers,
+                )
+            if mix.think_time:
+                await asyncio.sleep(rng.expovariate(1.0 / mix.think_time))
+    finally:
+        pool.release(user)
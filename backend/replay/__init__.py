@@ -0,0 +1 @@
+"""Replay captured production traffic against a database snapshot and compare latencies."""
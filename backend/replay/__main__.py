@@ -0,0 +1,160 @@
+"""
+Command-line entry point.
+
+Usage (from ``backend/``)::
+
+    python -m replay snapshot --output snapshots/before.db
+    python -m replay run --trace data/traffic --snapshot snapshots/before.db --speed 10 --output main.json
+    python -m replay run --trace data/traffic --snapshot snapshots/before.db --speed 10 \\
+        --build ../../feature/backend --baseline main.json --output feature.json
+    python -m replay diff main.json feature.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from loadtest.harness import BACKEND_DIR, http_client, spawn_server
+from replay.diff import diff_distributions, format_diff
+from replay.player import mint_tokens, play
+from replay.snapshot import restore_snapshot, take_snapshot
+from replay.trace import read_trace, resolve, user_map
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m replay", description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = commands.add_parser("snapshot", help="Snapshot the database a capture will be replayed against")
+    snapshot.add_argument("--database-url", default=settings.database_url, help="Source (default: DATABASE_URL)")
+    snapshot.add_argument("--output", type=Path, required=True, help="Snapshot file (.db for SQLite, pg_dump otherwise)")
+
+    run = commands.add_parser("run", help="Restore a snapshot and replay a capture against a build")
+    run.add_argument("--trace", type=Path, action="append", required=True, help="Capture directory or file")
+    run.add_argument("--snapshot", type=Path, required=True, help="Snapshot taken when the capture started")
+    run.add_argument("--speed", type=float, default=1.0, help="Replay speed; 10 replays ten times faster")
+    run.add_argument("--limit", type=int, help="Replay only the first N requests")
+    run.add_argument(
+        "--database-url",
+        help="Database to restore into (default: a scratch SQLite copy); required for PostgreSQL snapshots",
+    )
+    target = run.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Replay against a running server that uses --database-url")
+    target.add_argument("--build", type=Path, default=BACKEND_DIR, help="backend/ directory of the build to spawn")
+    run.add_argument("--workers", type=int, default=1, help="uvicorn worker processes to spawn")
+    run.add_argument("--server-log", type=Path, default=Path("./data/replay-server.log"), help="Spawned server output")
+    run.add_argument("--secret", help="Pseudonym key used at capture time (default: capture secret or SECRET_KEY)")
+    run.add_argument("--output", type=Path, help="Write the replay report as JSON")
+    run.add_argument("--baseline", type=Path, help="Diff latencies against an earlier replay report")
+
+    diff = commands.add_parser("diff", help="Compare the latency distributions of two replay reports")
+    diff.add_argument("baseline", type=Path)
+    diff.add_argument("current", type=Path)
+    return parser.parse_args(argv)
+
+
+def _captured_samples(records: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = defaultdict(list)
+    for record in records:
+        samples[f"{record['method']} {record['route']}"].append(record["ms"])
+    return {route: sorted(values) for route, values in samples.items()}
+
+
+def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    records = read_trace(args.trace)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        raise SystemExit("❌ The capture is empty")
+    secret = args.secret or settings.traffic_capture_secret or settings.secret_key
+
+    with tempfile.TemporaryDirectory(prefix="anecdote-replay-") as scratch:
+        database_url = args.database_url or f"sqlite:///{Path(scratch) / 'replay.db'}"
+        print(f"Restoring {args.snapshot} into {database_url}", flush=True)
+        restore_snapshot(args.snapshot, database_url)
+
+        engine = create_engine(database_url)
+        try:
+            users = user_map(engine, secret)
+            requests = [request for request in (resolve(record, users) for record in records) if request]
+            tokens = mint_tokens(engine, [request["user_id"] for request in requests if request["user_id"]])
+        finally:
+            engine.dispose()
+        skipped = len(records) - len(requests)
+        print(f"Replaying {len(requests):,} requests ({skipped:,} skipped) at {args.speed:g}x", flush=True)
+
+        async def replay(url: str) -> Dict[str, Any]:
+            async with http_client(url, max_connections=256) as client:
+                return await play(client, requests, tokens, speed=args.speed)
+
+        if args.url:
+            result = asyncio.run(replay(args.url))
+        else:
+            # Tokens are signed here, so the build must share this process's key
+            env = {"DATABASE_URL": database_url, "SECRET_KEY": settings.secret_key, "TRAFFIC_CAPTURE_ENABLED": "false"}
+            with spawn_server(
+                workers=args.workers, env=env, backend_dir=args.build, log_path=args.server_log
+            ) as url:
+                result = asyncio.run(replay(url))
+
+    return {
+        "meta": {
+            "trace": [str(path) for path in args.trace],
+            "snapshot": str(args.snapshot),
+            "build": args.url or str(args.build),
+            "workers": args.workers,
+            "speed": args.speed,
+            "requests": len(requests),
+            "skipped": skipped,
+        },
+        "replay": result,
+        "captured": _captured_samples(records),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    if args.command == "snapshot":
+        take_snapshot(args.database_url, args.output)
+        print(f"✅ Snapshot written to {args.output}")
+        return 0
+
+    if args.command == "diff":
+        baseline = json.loads(args.baseline.read_text())
+        current = json.loads(args.current.read_text())
+        for line in format_diff(diff_distributions(baseline["replay"]["samples"], current["replay"]["samples"])):
+            print(line)
+        return 0
+
+    report = _run(args)
+    result = report["replay"]
+    print(
+        f"✅ {result['requests']:,} requests in {result['seconds']:.1f} s, "
+        f"{result['error_rate']:.2%} errors, player fell behind by at most {result['max_schedule_lag_ms']:.0f} ms"
+    )
+    if args.baseline:
+        print(f"\nAgainst {args.baseline}:")
+        baseline = json.loads(args.baseline.read_text())["replay"]["samples"]
+    else:
+        print("\nAgainst the captured production latencies:")
+        baseline = report["captured"]
+    for line in format_diff(diff_distributions(baseline, result["samples"])):
+        print(line)
+
+    if args.output:
+        args.output.write_text(json.dumps(report))
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Compare two latency distributions route by route."""
+
+import math
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.stats import percentile
+
+
+def ks_statistic(first: Sequence[float], second: Sequence[float]) -> float:
+    """Two-sample Kolmogorov-Smirnov statistic of two sorted samples."""
+    i = j = 0
+    distance = 0.0
+    while i < len(first) and j < len(second):
+        value = min(first[i], second[j])
+        while i < len(first) and first[i] <= value:
+            i += 1
+        while j < len(second) and second[j] <= value:
+            j += 1
+        distance = max(distance, abs(i / len(first) - j / len(second)))
+    return distance
+
+
+def ks_critical(n: int, m: int, alpha: float = 0.05) -> float:
+    """The KS statistic above which two samples differ at significance ``alpha``."""
+    return math.sqrt(-math.log(alpha / 2) / 2) * math.sqrt((n + m) / (n * m))
+
+
+def diff_distributions(
+    baseline: Dict[str, Sequence[float]],
+    current: Dict[str, Sequence[float]],
+    *,
+    min_samples: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Compare per-route latency samples (sorted, in ms).
+
+    A route's shift counts as significant when the KS test rejects equal
+    distributions at 5%; routes with fewer than ``min_samples`` calls on
+    either side are reported but never flagged.
+    """
+    rows = []
+    for route in sorted(set(baseline) & set(current)):
+        before, after = sorted(baseline[route]), sorted(current[route])
+        if not before or not after:
+            continue
+        row: Dict[str, Any] = {"route": route, "calls": [len(before), len(after)]}
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            old, new = percentile(before, q), percentile(after, q)
+            row[name] = [round(old, 3), round(new, 3)]
+            row[f"{name}_change"] = round(new / old - 1, 4) if old else None
+        statistic = ks_statistic(before, after)
+        row["ks"] = round(statistic, 4)
+        row["significant"] = (
+            min(len(before), len(after)) >= min_samples and statistic > ks_critical(len(before), len(after))
+        )
+        rows.append(row)
+    return rows
+
+
+def format_diff(rows: List[Dict[str, Any]]) -> List[str]:
+    """Render ``diff_distributions`` rows as a fixed-width table."""
+    header = f"{'route':<30}{'calls':>13}{'p50':>24}{'p95':>24}{'p99':>24}{'ks':>8}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        cells = []
+        for name in ("p50", "p95", "p99"):
+            old, new = row[name]
+            change = row[f"{name}_change"]
+            cells.append(f"{old:.1f}→{new:.1f} ({change:+.0%})" if change is not None else f"{old:.1f}→{new:.1f}")
+        marker = " *" if row["significant"] else ""
+        calls = f"{row['calls'][0]}/{row['calls'][1]}"
+        lines.append(
+            f"{row['route']:<30}{calls:>13}{cells[0]:>24}{cells[1]:>24}{cells[2]:>24}{row['ks']:>8.3f}{marker}"
+        )
+    lines.append("(milliseconds; * = distributions differ, KS test at 5%)")
+    return lines
@@ -0,0 +1,74 @@
+"""Send resolved capture records on their original schedule."""
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List
+
+import httpx
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.auth import create_access_token
+from loadtest.recorder import Recorder
+from loadtest.scenario import timed_request
+
+
+def mint_tokens(engine: Engine, user_ids: Iterable[int]) -> Dict[int, str]:
+    """Create one session per replayed user directly in the restored database."""
+    with Session(engine) as db:
+        return {user_id: create_access_token(user_id, db) for user_id in sorted(set(user_ids))}
+
+
+async def play(
+    client: httpx.AsyncClient,
+    requests: List[Dict[str, Any]],
+    tokens: Dict[int, str],
+    *,
+    speed: float = 1.0,
+) -> Dict[str, Any]:
+    """
+    Replay ``requests`` open-loop, each at its captured time offset divided by ``speed``.
+
+    Requests do not wait for earlier responses, so a slower build sees the
+    same arrival pattern and has to queue, as it would in production.
+
+    Returns:
+        The recorder report, raw latencies per route (ms) and how far the
+        player itself fell behind schedule
+    """
+    recorder = Recorder()
+    if not requests:
+        return {**recorder.report(0.0), "samples": {}, "max_schedule_lag_ms": 0.0}
+
+    first = requests[0]["ts"]
+    pending = set()
+    max_lag = 0.0
+    started = time.monotonic()
+
+    async def send(request: Dict[str, Any]) -> None:
+        headers = {}
+        if request["user_id"] is not None:
+            headers["Authorization"] = f"Bearer {tokens[request['user_id']]}"
+        await timed_request(
+            client, recorder, request["route"], request["method"], request["url"],
+            params=request["params"], headers=headers,
+        )
+
+    for request in requests:
+        due = started + (request["ts"] - first) / speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        task = asyncio.create_task(send(request))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    await asyncio.gather(*pending)
+
+    report = recorder.report(time.monotonic() - started)
+    samples = {
+        route: sorted(round(seconds * 1000, 3) for seconds in latencies)
+        for route, latencies in recorder.latencies.items()
+    }
+    return {**report, "samples": samples, "max_schedule_lag_ms": round(max_lag * 1000, 3)}
@@ -0,0 +1,75 @@
+"""Take and restore database snapshots that a capture is replayed against."""
+
+import shutil
+import sqlite3
+import subprocess
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+
+def _sqlite_path(database_url: str) -> Path:
+    database = make_url(database_url).database
+    if not database or database == ":memory:":
+        raise ValueError("Snapshots need a file-backed SQLite database")
+    return Path(database)
+
+
+def _libpq_url(database_url: str) -> str:
+    """Drop the SQLAlchemy driver suffix so pg_dump and pg_restore accept the URL."""
+    url = make_url(database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def take_snapshot(database_url: str, output: Path) -> Path:
+    """
+    Write a consistent snapshot of the database to ``output``.
+
+    SQLite uses the online backup API, so the app can keep serving while
+    the copy is taken. PostgreSQL uses ``pg_dump --format=custom``, which
+    must be on PATH.
+
+    Raises:
+        ValueError: For unsupported databases
+        subprocess.CalledProcessError: If pg_dump fails
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    backend = make_url(database_url).get_backend_name()
+    if backend == "sqlite":
+        source = sqlite3.connect(_sqlite_path(database_url))
+        target = sqlite3.connect(output)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    elif backend == "postgresql":
+        subprocess.run(
+            ["pg_dump", "--format=custom", "--no-owner", f"--file={output}", _libpq_url(database_url)],
+            check=True,
+        )
+    else:
+        raise ValueError(f"Snapshots are not supported for {backend}")
+    return output
+
+
+def restore_snapshot(snapshot: Path, database_url: str) -> None:
+    """
+    Replace the contents of ``database_url`` with ``snapshot``.
+
+    Raises:
+        ValueError: For unsupported databases
+        subprocess.CalledProcessError: If pg_restore fails
+    """
+    backend = make_url(database_url).get_backend_name()
+    if backend == "sqlite":
+        target = _sqlite_path(database_url)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(snapshot, target)
+    elif backend == "postgresql":
+        subprocess.run(
+            ["pg_restore", "--clean", "--if-exists", "--no-owner", f"--dbname={_libpq_url(database_url)}", str(snapshot)],
+            check=True,
+        )
+    else:
+        raise ValueError(f"Snapshots are not supported for {backend}")
@@ -0,0 +1,84 @@
+"""Read capture files and map pseudonyms back to user ids."""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.observability.capture import USER_ID_PARAMS, pseudonym
+
+
+# Requests whose bodies are not captured or that would end the replayed session
+NOT_REPLAYABLE = frozenset({
+    ("POST", "/auth/register"),
+    ("POST", "/auth/login"),
+    ("POST", "/auth/logout"),
+    ("PUT", "/profile/me"),
+})
+
+
+def capture_files(paths: Iterable[Path]) -> List[Path]:
+    """Expand directories into the ``traffic-*.jsonl.gz`` files they contain."""
+    files: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.glob("traffic-*.jsonl.gz")))
+        else:
+            files.append(path)
+    return files
+
+
+def read_trace(paths: Iterable[Path]) -> List[Dict[str, Any]]:
+    """Load every record from the capture files, merged in timestamp order."""
+    records: List[Dict[str, Any]] = []
+    for path in capture_files(paths):
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            records.extend(json.loads(line) for line in handle if line.strip())
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def user_map(engine: Engine, secret: str) -> Dict[str, int]:
+    """Return ``{pseudonym: user id}`` for every user in the database."""
+    with engine.connect() as connection:
+        user_ids = connection.execute(text("SELECT id FROM users")).scalars().all()
+    return {pseudonym(user_id, secret): user_id for user_id in user_ids}
+
+
+def resolve(record: Dict[str, Any], users: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a capture record into a concrete request, or None if it cannot be replayed.
+
+    Returns:
+        ``{"ts", "method", "url", "params", "user_id", "route"}`` with pseudonyms
+        replaced by the snapshot's user ids
+    """
+    if (record["method"], record["route"]) in NOT_REPLAYABLE:
+        return None
+    user_id = None
+    if record.get("user") is not None:
+        user_id = users.get(record["user"])
+        if user_id is None:
+            return None
+    path_params = {}
+    for name, value in record.get("params", {}).items():
+        if name in USER_ID_PARAMS:
+            if value not in users:
+                return None
+            value = users[value]
+        path_params[name] = value
+    try:
+        url = record["route"].format(**path_params)
+    except (KeyError, IndexError, ValueError):
+        return None
+    return {
+        "ts": record["ts"],
+        "method": record["method"],
+        "url": url,
+        "params": record.get("query", {}),
+        "user_id": user_id,
+        "route": f"{record['method']} {record['route']}",
+    }
@@ -11,6 +11,7 @@ from app.db.session import SessionLocal, create_tables
 from app.models.user import User
 from app.models.profile import Profile, GenderEnum
 from app.auth import get_password_hash
+from app.db.bulk import bulk_insert
 
 
 def seed_users():
@@ -182,29 +183,46 @@ def seed_users():
         
         print(f"Creating {len(celebrities)} celebrity users...")
         
-        for celeb_data in celebrities:
-            # Create user
-            user = User(
-                email=celeb_data["email"],
-                username=celeb_data["username"],
-                hashed_password=get_password_hash(celeb_data["password"]),
-                is_celebrity=True
-            )
-            db.add(user)
-            db.flush()  # Flush to get user.id
-            
-            # Create profile
-            profile = Profile(
-                user_id=user.id,
-                display_name=celeb_data["display_name"],
-                gender=celeb_data["gender"],
-                bio=celeb_data["bio"],
-                hobbies=celeb_data["hobbies"],
-                favorite_joke=celeb_data["favorite_joke"],
-                is_active=True
+        # Load users and profiles in two bulk statements (COPY on PostgreSQL)
+        connection = db.connection()
+        bulk_insert(
+            connection,
+            User.__table__,
+            (
+                {
+                    "email": celeb_data["email"],
+                    "username": celeb_data["username"],
+                    "hashed_password": get_password_hash(celeb_data["password"]),
+                    "is_celebrity": True,
+                }
+                for celeb_data in celebrities
+            ),
+        )
+        
+        user_ids = dict(
+            db.query(User.email, User.id).filter(
+                User.email.in_([celeb_data["email"] for celeb_data in celebrities])
             )
-            db.add(profile)
-            
+        )
+        
+        bulk_insert(
+            connection,
+            Profile.__table__,
+            (
+                {
+                    "user_id": user_ids[celeb_data["email"]],
+                    "display_name": celeb_data["display_name"],
+                    "gender": celeb_data["gender"],
+                    "bio": celeb_data["bio"],
+                    "hobbies": celeb_data["hobbies"],
+                    "favorite_joke": celeb_data["favorite_joke"],
+                    "is_active": True,
+                }
+                for celeb_data in celebrities
+            ),
+        )
+        
+        for celeb_data in celebrities:
             print(f"✓ Created user: {celeb_data['display_name']} ({celeb_data['username']})")
         
         db.commit()
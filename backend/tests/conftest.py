@@ -1,10 +1,19 @@
 """Test configuration and fixtures."""
 
+from typing import Callable, Dict, Tuple
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.cache import clear_all
+from app.config import settings
 from app.main import app
+from app.ratelimit import login_throttle, swipe_limiter
 from app.db.session import create_tables
+from app.observability import slow_queries, tracing
+from app.observability.context import reset_route_stats
+from app.observability.jsonl import jsonl_logger
+from app.observability.queries import assert_max_queries as _assert_max_queries
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -14,12 +23,63 @@ def setup_test_database():
     yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def diagnostics_logs(tmp_path_factory):
+    """Write kept traces and slow queries to a temporary directory instead of the configured paths."""
+    logs = tmp_path_factory.mktemp("logs")
+    traces = str(logs / "traces.jsonl")
+    queries = str(logs / "slow_queries.jsonl")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "trace_log_path", traces)
+        patch.setattr(settings, "slow_query_log_path", queries)
+        if tracing.store is not None:
+            patch.setattr(
+                tracing.store, "_log", jsonl_logger(traces, settings.trace_log_max_bytes, settings.trace_log_backups)
+            )
+        if slow_queries.recorder is not None:
+            patch.setattr(
+                slow_queries.recorder,
+                "_log",
+                jsonl_logger(queries, settings.slow_query_log_max_bytes, settings.slow_query_log_backups),
+            )
+        yield
+
+
 @pytest.fixture
 def client() -> TestClient:
     """Create a test client."""
     return TestClient(app)
 
 
+@pytest.fixture
+def register(client: TestClient) -> Callable[[str, str], Tuple[int, Dict[str, str]]]:
+    """Register users through the API; each call returns the user id and Bearer headers."""
+    def register_user(email: str, username: str) -> Tuple[int, Dict[str, str]]:
+        response = client.post(
+            "/auth/register",
+            json={"email": email, "username": username, "password": "password123"},
+        )
+        assert response.status_code == 201, response.text
+        body = response.json()
+        return body["user"]["id"], {"Authorization": f"Bearer {body['token']}"}
+    
+    return register_user
+
+
+@pytest.fixture
+def admin_headers(monkeypatch) -> Dict[str, str]:
+    """Enable admin endpoints for the duration of a test and return headers for them."""
+    monkeypatch.setattr(settings, "admin_token", "test-admin-token")
+    reset_route_stats()
+    return {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Context manager failing the test if a block runs more SQL statements than allowed."""
+    return _assert_max_queries
+
+
 @pytest.fixture
 def db_session():
     """Create a test database session."""
@@ -29,6 +89,7 @@ def db_session():
     from app.models.profile import Profile
     from app.models.like import Like
     from app.models.profile_view import ProfileView
+    from app.models.cache_invalidation import CacheInvalidation
     
     session = SessionLocal()
     try:
@@ -40,5 +101,10 @@ def db_session():
         session.query(SessionModel).delete()
         session.query(Profile).delete()
         session.query(User).delete()
+        session.query(CacheInvalidation).delete()
         session.commit()
-        session.close()
\ No newline at end of file
+        session.close()
+        # Drop cached rows that referenced the deleted data
+        clear_all()
+        swipe_limiter.clear()
+        login_throttle.clear()
\ No newline at end of file
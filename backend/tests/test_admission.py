@@ -0,0 +1,124 @@
+"""Tests for admission control."""
+
+import asyncio
+
+from app.admission import AdaptiveLimit, AdmissionMiddleware, LanePolicy, admission_rejected, classify
+
+
+def _scope(path: str, method: str = "GET", query: bytes = b"") -> dict:
+    return {"type": "http", "path": path, "method": method, "query_string": query, "headers": []}
+
+
+async def _call(app, path: str, method: str = "GET") -> dict:
+    """Run one request through ``app`` and return its status and headers."""
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {name.decode(): value.decode() for name, value in message["headers"]}
+
+    await app(_scope(path, method), receive, send)
+    return response
+
+
+def _blocking_app():
+    """An app whose requests wait until ``release`` is set."""
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app, release
+
+
+def _rejected(lane: str, reason: str) -> float:
+    return sum(
+        value
+        for _, labels, value in admission_rejected.collect().samples
+        if labels == {"lane": lane, "reason": reason}
+    )
+
+
+def test_requests_are_sorted_into_lanes():
+    """Logins, deep feed pages, reads and writes get their own lanes; health checks none."""
+    assert classify(_scope("/auth/login", "POST"), deep_feed_page=10) == "auth"
+    assert classify(_scope("/feed", query=b"page=11&size=20"), deep_feed_page=10) == "deep_feed"
+    assert classify(_scope("/likes/feed", query=b"page=2"), deep_feed_page=10) == "read"
+    assert classify(_scope("/profile/me"), deep_feed_page=10) == "read"
+    assert classify(_scope("/feed/7/like", "POST"), deep_feed_page=10) == "write"
+    assert classify(_scope("/health"), deep_feed_page=10) is None
+    assert classify(_scope("/auth/login", "OPTIONS"), deep_feed_page=10) is None
+
+
+def test_excess_requests_are_rejected_immediately():
+    """Past the limit and a full queue, requests get 503 with Retry-After; /health still answers."""
+    async def scenario():
+        inner, release = _blocking_app()
+        app = AdmissionMiddleware(
+            inner, policies={"read": LanePolicy(max_limit=1, target_latency=10, queue_size=0)}, retry_after=3
+        )
+        running = asyncio.ensure_future(_call(app, "/profile/me"))
+        await asyncio.sleep(0)
+        rejected = await _call(app, "/profile/me")
+        health = asyncio.ensure_future(_call(app, "/health"))
+        await asyncio.sleep(0)
+        assert not health.done(), "health checks bypass the full lane"
+        release.set()
+        return rejected, await running, await health
+
+    before = _rejected("read", "queue_full")
+
+    rejected, admitted, health = asyncio.run(scenario())
+
+    assert rejected["status"] == 503
+    assert rejected["headers"]["retry-after"] == "3"
+    assert admitted["status"] == 200
+    assert health["status"] == 200
+    assert _rejected("read", "queue_full") - before == 1
+
+
+def test_waiters_get_freed_slots_or_time_out():
+    """Queued requests take slots as they free up, and give up after the queue timeout."""
+    async def scenario():
+        inner, release = _blocking_app()
+        policy = LanePolicy(max_limit=1, target_latency=10, queue_size=2, queue_timeout=0.05)
+        app = AdmissionMiddleware(inner, policies={"write": policy})
+        lane = app.lanes["write"]
+        running = asyncio.ensure_future(_call(app, "/feed/1/skip", "POST"))
+        await asyncio.sleep(0)
+        timed_out = await _call(app, "/feed/1/skip", "POST")
+        waiting = asyncio.ensure_future(_call(app, "/feed/1/skip", "POST"))
+        await asyncio.sleep(0)
+        assert lane.queued == 1
+        release.set()
+        results = await running, await waiting
+        assert (lane.in_flight, lane.queued) == (0, 0)
+        return timed_out, results
+
+    timed_out, results = asyncio.run(scenario())
+
+    assert timed_out["status"] == 503
+    assert [result["status"] for result in results] == [200, 200]
+
+
+def test_limit_backs_off_when_slow_and_recovers_when_busy_and_fast():
+    """Slow completions cut the limit by 10% once per target interval; fast busy ones add it back."""
+    limit = AdaptiveLimit(min_limit=1, max_limit=20, target_latency=0.1)
+
+    for _ in range(5):
+        limit.observe(0.5, in_flight=20, now=100.0)
+    assert limit.current == 18
+    limit.observe(0.5, in_flight=18, now=100.2)
+    assert limit.current == 16
+
+    limit.observe(0.01, in_flight=1, now=101.0)
+    assert limit.current == 16, "an idle lane proves nothing about a higher limit"
+    for _ in range(100):
+        limit.observe(0.01, in_flight=16, now=101.0)
+    assert limit.current == 20
@@ -5,6 +5,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.main import app
+from app.observability.instruments import bcrypt_duration
 from app.models.user import User
 from app.models.session import Session as SessionModel
 
@@ -142,6 +143,16 @@ def test_login_invalid_email():
     assert "Invalid email or password" in response.json()["detail"]
 
 
+def test_login_unknown_email_costs_a_password_check():
+    """Unknown emails still run one bcrypt verify, so timing does not reveal which exist."""
+    verifies = bcrypt_duration.count(operation="verify")
+    
+    response = client.post("/auth/login", json={"email": "ghost@example.com", "password": "password123"})
+    
+    assert response.status_code == 401
+    assert bcrypt_duration.count(operation="verify") == verifies + 1
+
+
 def test_login_invalid_password(db_session: Session):
     """Test login with wrong password."""
     # Create user first
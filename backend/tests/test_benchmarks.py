@@ -0,0 +1,51 @@
+"""Smoke tests for the service benchmark suite."""
+
+import sqlite3
+
+from benchmarks.compare import compare
+from benchmarks.dataset import DatasetSpec, build_dataset, celebrity_ids
+from benchmarks.runner import run_benchmarks
+
+
+SPEC = DatasetSpec.per_user(300, 8, celebrity_fraction=0.01)
+
+
+def test_dataset_is_skewed_and_deterministic(tmp_path):
+    """Popular users collect far more likes, and the same seed rebuilds the same data."""
+    first = build_dataset(tmp_path / "a.db", SPEC)
+    second = build_dataset(tmp_path / "b.db", SPEC)
+    
+    query = "SELECT liker_id, target_id, mutual FROM likes ORDER BY liker_id, target_id"
+    with sqlite3.connect(first) as a, sqlite3.connect(second) as b:
+        assert a.execute(query).fetchall() == b.execute(query).fetchall()
+        
+        counts = [row[0] for row in a.execute(
+            "SELECT COUNT(*) FROM profile_views GROUP BY viewed_profile_id ORDER BY 1 DESC"
+        )]
+        assert counts[0] > 10 * counts[len(counts) // 2]
+        
+        celebrities = a.execute("SELECT id FROM users WHERE is_celebrity").fetchall()
+        assert sorted(row[0] for row in celebrities) == sorted(celebrity_ids(SPEC))
+
+
+def test_run_and_compare(tmp_path):
+    """A run reports percentiles and query counts, and compare() flags regressions."""
+    dataset = build_dataset(tmp_path / "bench.db", SPEC)
+    
+    report = run_benchmarks(dataset, SPEC, calls=5, cold_calls=1)
+    
+    feed = report["results"]["feed_json"]
+    assert feed["warm"]["calls"] == 5
+    assert feed["cold"]["calls"] == 1
+    assert feed["queries_per_call"] == 2
+    assert feed["warm"]["p50_ms"] <= feed["warm"]["p99_ms"]
+    assert compare(report, report) == []
+    
+    slower = {"results": {"feed_json": {
+        **feed,
+        "warm": {**feed["warm"], "p95_ms": feed["warm"]["p95_ms"] * 2},
+        "queries_per_call": 3,
+    }}}
+    regressions = compare(slower, report)
+    assert any("p95_ms" in line for line in regressions)
+    assert any("queries per call" in line for line in regressions)
@@ -0,0 +1,76 @@
+"""Tests for Accept-Encoding negotiation and the compression middleware."""
+
+from fastapi.testclient import TestClient
+
+from app.compression import compressed_responses, compression_report, negotiate
+from app.main import app
+
+
+client = TestClient(app)
+
+CODECS = {"zstd": None, "br": None, "gzip": None}
+
+
+def test_negotiate_accept_encoding():
+    """The highest q-value wins; ties go to the server's preference order."""
+    assert negotiate("gzip, deflate, br, zstd", CODECS) == "zstd"
+    assert negotiate("gzip;q=1.0, br;q=0.5", CODECS) == "gzip"
+    assert negotiate("zstd;q=0, *;q=0.1", CODECS) == "br"
+    assert negotiate("identity", CODECS) is None
+    assert negotiate("", CODECS) is None
+    assert negotiate("br", {"gzip": None}) is None
+
+
+def test_large_responses_are_compressed_once():
+    """A reused route is compressed on the first request and served from memory after."""
+    compressed_responses.clear()
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    
+    for _ in range(2):
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(plain.content)
+        # httpx decodes the body transparently
+        assert response.content == plain.content
+    
+    assert len(compressed_responses) == 1
+    report = {row["encoding"]: row for row in compression_report()}
+    assert report["gzip"]["reused"] >= 1
+    assert report["gzip"]["bytes_out"] < report["gzip"]["bytes_in"]
+
+
+def test_small_responses_are_not_compressed():
+    """Bodies under the size threshold are sent as is but still vary on Accept-Encoding."""
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_compressed_representation_has_its_own_etag(db_session):
+    """Compression suffixes strong ETags, and the suffixed tag still validates."""
+    registered = client.post(
+        "/auth/register",
+        json={"email": "gzip@example.com", "username": "gzipuser", "password": "password123"},
+    ).json()
+    headers = {"Authorization": f"Bearer {registered['token']}"}
+    client.put("/profile/me", json={"bio": "b" * 1000, "hobbies": "h" * 1000}, headers=headers)
+    url = f"/profile/profiles/{registered['user']['id']}"
+    
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    
+    response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["etag"] == compressed.headers["etag"], "the 304 echoes the tag the client stored"
+    assert "Accept-Encoding" in response.headers["vary"]
+    
+    # A client holding the uncompressed copy keeps its bare tag
+    response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["etag"] == plain.headers["etag"]
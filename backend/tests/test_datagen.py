@@ -0,0 +1,70 @@
+"""Tests for the synthetic data generator."""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.auth import verify_password
+from datagen import GeneratorSpec, generate, speed_up_sqlite
+from datagen.content import LANGUAGES
+
+
+SPEC = GeneratorSpec(users=200, swipes=1_500, celebrity_fraction=0.01, passwords=1)
+
+
+def _generate(path, spec=SPEC):
+    engine = create_engine(f"sqlite:///{path}")
+    speed_up_sqlite(engine)
+    try:
+        return generate(engine, spec)
+    finally:
+        engine.dispose()
+
+
+def test_generate_is_deterministic(tmp_path):
+    """Equal specs produce identical rows, with swipes close to the requested total."""
+    counts = _generate(tmp_path / "a.db")
+    _generate(tmp_path / "b.db")
+    
+    assert counts["users"] == counts["profiles"] == SPEC.users
+    assert 0.8 * SPEC.swipes <= counts["profile_views"] <= 1.2 * SPEC.swipes
+    
+    query = "SELECT user_id, display_name, bio, hobbies, favorite_joke FROM profiles ORDER BY user_id"
+    with sqlite3.connect(tmp_path / "a.db") as a, sqlite3.connect(tmp_path / "b.db") as b:
+        assert a.execute(query).fetchall() == b.execute(query).fetchall()
+        likes = "SELECT liker_id, target_id, mutual FROM likes ORDER BY liker_id, target_id"
+        assert a.execute(likes).fetchall() == b.execute(likes).fetchall()
+        
+        # Indexes dropped for the load are back afterwards
+        indexes = {row[0] for row in a.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "ix_profile_views_viewer_id" in indexes
+
+
+def test_profiles_are_multilingual(tmp_path):
+    """Bios are drawn from several languages, not just English."""
+    _generate(tmp_path / "data.db")
+    with sqlite3.connect(tmp_path / "data.db") as connection:
+        bios = {row[0] for row in connection.execute("SELECT bio FROM profiles")}
+    
+    languages = {
+        code for code, language in LANGUAGES.items()
+        if any(fragment in bio for bio in bios for fragment in language.bios)
+    }
+    assert len(languages) >= 4
+
+
+def test_generated_users_can_log_in(tmp_path):
+    """The shared password hash verifies against the documented password."""
+    _generate(tmp_path / "data.db")
+    with sqlite3.connect(tmp_path / "data.db") as connection:
+        hashed = connection.execute("SELECT hashed_password FROM users WHERE id = 1").fetchone()[0]
+    
+    assert verify_password("password123", hashed)
+
+
+def test_generate_refuses_non_empty_database(tmp_path):
+    """Generating into a database that already has users is an error."""
+    _generate(tmp_path / "data.db")
+    with pytest.raises(ValueError, match="already contains"):
+        _generate(tmp_path / "data.db")
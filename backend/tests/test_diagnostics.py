@@ -0,0 +1,364 @@
+"""Tests for request instrumentation and admin diagnostics endpoints."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import auth as auth_api
+from app.config import settings
+from app.main import app
+from app.observability import slow_queries, tracing
+from app.observability.loop_lag import LoopLagMonitor
+from app.observability.profiler import profiler
+from app.observability.slow_queries import fingerprint, normalize_sql
+
+
+client = TestClient(app)
+
+
+def route_stats(admin_headers: dict) -> dict:
+    response = client.get("/admin/db/pool", headers=admin_headers)
+    assert response.status_code == 200
+    return response.json()["routes"]
+
+
+def test_admin_disabled_without_token():
+    """Admin endpoints are hidden unless ADMIN_TOKEN is configured."""
+    response = client.get("/admin/db/pool")
+    assert response.status_code == 404
+
+
+def test_admin_rejects_wrong_token(admin_headers):
+    """A wrong admin token is rejected."""
+    response = client.get("/admin/db/pool", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+
+
+def test_health_never_checks_out_connection(admin_headers):
+    """The health check does not touch the connection pool."""
+    client.get("/health")
+    
+    stats = route_stats(admin_headers)["GET /health"]
+    assert stats["requests"] == 1
+    assert stats["pool_checkouts"] == 0
+
+
+def test_cached_session_skips_pool(register, admin_headers, db_session: Session):
+    """Once a token is validated, /auth/me is served without a connection."""
+    _, headers = register("lazy@example.com", "lazyuser")
+    
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    
+    stats = route_stats(admin_headers)["GET /auth/me"]
+    assert stats["requests"] == 2
+    assert stats["requests_with_checkout"] == 1
+
+
+def test_logout_evicts_cached_session(register, db_session: Session):
+    """A revoked token stops working even after it was cached."""
+    _, headers = register("evict@example.com", "evictuser")
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_query_headers(register, db_session: Session):
+    """Responses report the statement count and DB time of the request."""
+    _, headers = register("headers@example.com", "headersuser")
+    
+    response = client.get("/auth/me", headers=headers)
+    
+    assert response.headers["X-DB-Queries"] == "2"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert client.get("/auth/me", headers=headers).headers["X-DB-Queries"] == "0"
+
+
+def test_like_stays_within_query_budget(register, db_session: Session, assert_max_queries):
+    """Liking a profile runs a bounded number of statements."""
+    _, liker = register("liker@example.com", "likeruser")
+    register("target@example.com", "targetuser")
+    client.get("/auth/me", headers=liker)
+    target_id = client.get("/likes/feed", headers=liker).json()["profiles"][0]["user_id"]
+    
+    with assert_max_queries(8):
+        response = client.post(f"/likes/{target_id}", headers=liker)
+    
+    assert response.status_code == 200
+
+
+def test_query_budget_logs_offending_request(register, db_session: Session, monkeypatch, caplog):
+    """Requests above the configured budget are logged with their route."""
+    monkeypatch.setattr(settings, "query_budget", 1)
+    _, headers = register("budget@example.com", "budgetuser")
+    
+    with caplog.at_level("WARNING", logger="app.observability.queries"):
+        client.get("/auth/me", headers=headers)
+    
+    assert "GET /auth/me ran 2 queries" in caplog.text
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    """Statements differing only in values share a fingerprint."""
+    first = "SELECT * FROM likes WHERE liker_id = 1 AND target_id IN (?, ?)"
+    second = "SELECT * FROM likes WHERE liker_id = 42 AND target_id IN (?, ?, ?, ?)"
+    
+    assert fingerprint(first) == fingerprint(second)
+    assert normalize_sql(second) == "SELECT * FROM likes WHERE liker_id = ? AND target_id IN (...)"
+
+
+def test_slow_queries_capture_plan(register, admin_headers, db_session: Session, monkeypatch):
+    """Slow statements are aggregated by fingerprint, with plans captured off the request thread."""
+    recorder = slow_queries.recorder
+    monkeypatch.setattr(recorder, "threshold_ms", 0.0)
+    monkeypatch.setattr(recorder, "_log", None)
+    recorder.clear()
+    _, headers = register("slow@example.com", "slowuser")
+    
+    explained_on = set()
+    explain = recorder._explain
+    
+    def record_thread(statement, parameters):
+        explained_on.add(threading.current_thread().name)
+        return explain(statement, parameters)
+    
+    monkeypatch.setattr(recorder, "_explain", record_thread)
+    client.get("/likes/feed", headers=headers)
+    client.get("/likes/feed", headers=headers)
+    recorder.flush()
+    assert explained_on == {"slow-query-explain"}
+    
+    response = client.get("/admin/slow-queries", headers=admin_headers)
+    assert response.status_code == 200
+    feed_queries = [
+        entry for entry in response.json()
+        if "FROM profiles LEFT OUTER JOIN profile_views" in entry["sql"]
+    ]
+    assert feed_queries
+    entry = feed_queries[0]
+    assert entry["count"] == 2
+    assert entry["routes"] == {"GET /likes/feed": 2}
+    assert entry["plan"]
+    assert entry["full_scan"] in (True, False)
+    
+    client.delete("/admin/slow-queries", headers=admin_headers)
+    assert client.get("/admin/slow-queries", headers=admin_headers).json() == []
+
+
+def test_profiler_idle_by_default():
+    """No sampler thread runs unless a profile was requested."""
+    client.get("/health", headers={"X-Profile": "anything"})
+    
+    assert not profiler.running
+    assert not any(thread.name == "sampling-profiler" for thread in threading.enumerate())
+
+
+def test_profile_single_request(register, admin_headers, db_session: Session):
+    """A request carrying the admin token in X-Profile is sampled."""
+    _, headers = register("profiled@example.com", "profileduser")
+    
+    response = client.get("/feed", headers={**headers, "X-Profile": admin_headers["X-Admin-Token"]})
+    assert response.status_code == 200
+    assert "X-Profile-Id" in response.headers
+    profile_id = response.headers["X-Profile-Id"]
+    
+    collapsed = client.get(f"/admin/profiler/{profile_id}", headers=admin_headers)
+    assert collapsed.status_code == 200
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    
+    speedscope = client.get(
+        f"/admin/profiler/{profile_id}", params={"format": "speedscope"}, headers=admin_headers
+    ).json()
+    assert speedscope["profiles"][0]["type"] == "sampled"
+    
+    assert "X-Profile-Id" not in client.get("/health", headers={"X-Profile": "wrong"}).headers
+
+
+def test_request_profile_skips_other_threads(register, admin_headers, monkeypatch, db_session: Session):
+    """A request profile holds the request's own stacks, not a busy neighbour's."""
+    from app.api import feed as feed_api
+    
+    _, headers = register("scoped@example.com", "scopeduser")
+    stop = threading.Event()
+    
+    def spin_in_request(**kwargs):
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            sum(range(1000))
+        return b"{}"
+    
+    def spin_elsewhere():
+        while not stop.is_set():
+            sum(range(1000))
+    
+    monkeypatch.setattr(feed_api, "feed_json", spin_in_request)
+    neighbour = threading.Thread(target=spin_elsewhere)
+    neighbour.start()
+    try:
+        response = client.get("/feed", headers={**headers, "X-Profile": admin_headers["X-Admin-Token"]})
+    finally:
+        stop.set()
+        neighbour.join()
+    assert response.status_code == 200
+    
+    collapsed = client.get(f"/admin/profiler/{response.headers['X-Profile-Id']}", headers=admin_headers).text
+    assert "spin_in_request" in collapsed
+    assert "spin_elsewhere" not in collapsed
+
+
+def test_profile_worker_for_duration(admin_headers):
+    """A timed profile samples busy threads and stops by itself."""
+    started = client.post("/admin/profiler/start", params={"seconds": 0.3}, headers=admin_headers)
+    assert started.status_code == 200
+    profile_id = started.json()["id"]
+    
+    deadline = time.monotonic() + 0.25
+    while time.monotonic() < deadline:
+        sum(range(1000))
+    time.sleep(0.3)
+    
+    summary = next(p for p in client.get("/admin/profiler", headers=admin_headers).json() if p["id"] == profile_id)
+    assert not summary["running"]
+    assert summary["samples"] > 0
+    
+    collapsed = client.get(f"/admin/profiler/{profile_id}", headers=admin_headers).text
+    assert "test_profile_worker_for_duration" in collapsed
+    assert not profiler.running
+
+
+def test_profile_duration_is_capped(admin_headers):
+    """Profiles longer than the configured maximum are refused."""
+    response = client.post(
+        "/admin/profiler/start",
+        params={"seconds": settings.profiler_max_seconds + 1},
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_loop_lag_monitor_captures_blocking_stack(caplog):
+    """A blocking call on the loop is logged with the stack that caused it."""
+    
+    async def block_loop():
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+    
+    with caplog.at_level("WARNING", logger="app.observability.loop_lag"):
+        monitor = asyncio.run(block_loop())
+    
+    stalls = monitor.stalls()
+    assert len(stalls) == 1
+    assert stalls[0]["lag_ms"] >= 150
+    assert any("block_loop" in line for line in stalls[0]["stack"])
+    assert monitor.quantiles()[0.99] >= 0.15
+    assert "Event loop blocked" in caplog.text
+
+
+def test_loop_lag_names_blocking_route(admin_headers, db_session: Session, monkeypatch):
+    """Stalls caused by a request are attributed to its route template."""
+    # Blocking work inside an async handler runs on the loop
+    monkeypatch.setattr(auth_api, "revoke_token", lambda token, db: time.sleep(0.2))
+    with TestClient(app) as lifespan_client:
+        lifespan_client.post("/auth/logout", headers={"Authorization": "Bearer blocker"})
+        report = lifespan_client.get("/admin/loop-lag", headers=admin_headers).json()
+    
+    assert report["enabled"]
+    assert any(stall["route"] == "POST /auth/logout" for stall in report["stalls"])
+    assert "event_loop_lag_seconds_bucket" in client.get("/metrics").text
+
+
+@pytest.fixture
+def trace_everything(monkeypatch):
+    """Keep every request's trace."""
+    monkeypatch.setattr(settings, "trace_sample_rate", 1.0)
+    tracing.store.clear()
+
+
+def test_like_trace_breaks_down_layers(register, admin_headers, trace_everything, db_session: Session):
+    """A traced like shows auth, service, SQL and validation spans under the request."""
+    _, headers = register("tracer@example.com", "traceruser")
+    target_id, _ = register("traced@example.com", "traceduser")
+    
+    response = client.post(f"/feed/{target_id}/like", headers=headers)
+    assert response.status_code == 200
+    
+    trace = client.get(f"/admin/traces/{response.headers['X-Trace-Id']}", headers=admin_headers).json()
+    assert trace["route"] == "/feed/{target_id}/like"
+    spans = {span["name"]: span for span in trace["spans"]}
+    for name in (
+        "http.request",
+        "auth.get_current_user",
+        "auth.verify_token",
+        "feed.like_profile",
+        "db.query",
+        "endpoint",
+        "response.validate",
+    ):
+        assert name in spans, name
+    
+    root = spans["http.request"]["span_id"]
+    assert spans["endpoint"]["parent_id"] == root
+    assert spans["feed.like_profile"]["parent_id"] == spans["endpoint"]["span_id"]
+    assert any(
+        span["name"] == "db.query" and span["parent_id"] == spans["feed.like_profile"]["span_id"]
+        for span in trace["spans"]
+    )
+
+
+def test_fastapi_hooks_are_in_place():
+    """Every API route records an endpoint span and response validation is wrapped."""
+    import fastapi.routing
+    from app import api
+    
+    assert hasattr(fastapi.routing.serialize_response, "__wrapped__")
+    assert tracing._trace_fastapi()
+    routers = [getattr(api, name) for name in dir(api) if name.endswith("_router")]
+    assert len(routers) == 6
+    for router in [*routers, app.router]:
+        assert router.route_class is tracing.TracedRoute
+        for route in router.routes:
+            if isinstance(route, fastapi.routing.APIRoute):
+                assert isinstance(route, tracing.TracedRoute), route.path
+
+
+def test_missing_patch_target_is_reported(monkeypatch, caplog):
+    """A FastAPI upgrade removing the validation hook is logged, not silently ignored."""
+    import fastapi.routing
+    
+    monkeypatch.delattr(fastapi.routing, "serialize_response")
+    with caplog.at_level("WARNING", logger=tracing.__name__):
+        assert not tracing._trace_fastapi()
+    assert "serialize_response" in caplog.text
+
+
+def test_tail_sampling_keeps_slow_requests(admin_headers, monkeypatch):
+    """Unsampled traces are dropped unless the request was slow."""
+    monkeypatch.setattr(settings, "trace_sample_rate", 0.0)
+    tracing.store.clear()
+    
+    monkeypatch.setattr(settings, "trace_slow_ms", 60_000)
+    client.get("/health")
+    assert client.get("/admin/traces", headers=admin_headers).json() == []
+    
+    monkeypatch.setattr(settings, "trace_slow_ms", 0)
+    trace_id = client.get("/health").headers["X-Trace-Id"]
+    kept = client.get("/admin/traces", params={"route": "/health"}, headers=admin_headers).json()
+    assert [trace["trace_id"] for trace in kept] == [trace_id]
+    assert not kept[0]["sampled"]
+
+
+def test_spans_are_free_outside_requests():
+    """Traced functions called outside a request record nothing."""
+    with tracing.span("outside") as span:
+        assert span is None
+    assert tracing.current_trace() is None
@@ -0,0 +1,131 @@
+"""Tests for the shared-memory host cache."""
+
+import hashlib
+import secrets
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.auth import session_cache, verify_token
+from app.cache.shared import HostCache, HostCacheBuilder, host_cache
+from app.db.session import engine
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+@pytest.fixture
+def segment():
+    """Unique segment name, unlinked after the test."""
+    name = f"anecdote-test-{secrets.token_hex(4)}"
+    writer = HostCache()
+    writer.attach(name, session_slots=64, id_capacity=16, max_age=60)
+    yield writer
+    writer.unlink()
+
+
+def test_workers_read_the_same_snapshot(segment: HostCache):
+    """A second attachment sees what the builder published, without copying it."""
+    expires_at = time.time() + 3600
+    segment.publish(
+        sessions=[(_digest("token-a"), 7, expires_at), (_digest("token-b"), 8, expires_at)],
+        active_ids=[9, 3, 7],
+        celebrity_ids=[8],
+        max_user_id=10,
+    )
+    reader = HostCache()
+    reader.attach(segment.shm.name, session_slots=64, id_capacity=16, max_age=60)
+    try:
+        assert not reader.created
+        assert reader.session(_digest("token-a")) == (7, int(expires_at))
+        assert reader.session(_digest("unknown")) is None
+        assert reader.is_active(7) is True
+        assert reader.is_active(8) is False
+        assert reader.is_celebrity(8) is True
+        # Users created after the snapshot are left to the database
+        assert reader.is_active(11) is None
+    finally:
+        reader.detach()
+
+
+def test_rebuilds_replace_the_snapshot(segment: HostCache):
+    """Each publish flips halves; overflowing or stale snapshots answer nothing."""
+    segment.publish(sessions=[], active_ids=[1], celebrity_ids=[], max_user_id=5)
+    segment.publish(sessions=[], active_ids=[2], celebrity_ids=[], max_user_id=5)
+    assert segment.generation() == 2
+    assert segment.is_active(1) is False
+    assert segment.is_active(2) is True
+    
+    segment.publish(sessions=[], active_ids=list(range(1, 20)), celebrity_ids=[], max_user_id=20)
+    assert segment.is_active(2) is None
+    
+    segment.publish(sessions=[], active_ids=[2], celebrity_ids=[], max_user_id=5, built_at=time.time() - 120)
+    assert segment.is_active(2) is None
+
+
+def test_one_builder_per_host(segment: HostCache, tmp_path, db_session: Session):
+    """Only the worker holding the lock rebuilds the snapshot."""
+    lock_path = str(tmp_path / "host-cache.lock")
+    first = HostCacheBuilder(segment, engine, interval=60, lock_path=lock_path)
+    second = HostCacheBuilder(segment, engine, interval=60, lock_path=lock_path)
+    try:
+        assert first.tick() is True
+        assert second.tick() is False
+        assert segment.generation() == 1
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_verify_token_reads_host_cache(tmp_path, db_session: Session, assert_max_queries):
+    """A cold worker validates a session with one query, and never revives a revoked one."""
+    response = client.post(
+        "/auth/register",
+        json={"email": "host@example.com", "username": "hostuser", "password": "password123"},
+    )
+    token = response.json()["token"]
+    host_cache.attach(f"anecdote-test-{secrets.token_hex(4)}", session_slots=64, id_capacity=16, max_age=60)
+    try:
+        HostCacheBuilder(host_cache, engine, interval=60, lock_path=str(tmp_path / "lock")).tick()
+        session_cache.clear()
+        
+        with assert_max_queries(1):
+            user = verify_token(token, db_session)
+        assert user.email == "host@example.com"
+        
+        client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"})
+        assert host_cache.session(_digest(token)) is not None
+        assert verify_token(token, db_session) is None
+    finally:
+        host_cache.unlink()
+
+
+def test_closed_profile_cannot_be_liked_before_the_next_rebuild(tmp_path, db_session: Session):
+    """A profile closed after the snapshot was built is checked in the database, not trusted."""
+    tokens = {}
+    for name in ("closer", "liker"):
+        response = client.post(
+            "/auth/register",
+            json={"email": f"{name}@example.com", "username": name, "password": "password123"},
+        )
+        tokens[name] = (response.json()["user"]["id"], {"Authorization": f"Bearer {response.json()['token']}"})
+    closer_id, closer_headers = tokens["closer"]
+    _, liker_headers = tokens["liker"]
+    host_cache.attach(f"anecdote-test-{secrets.token_hex(4)}", session_slots=64, id_capacity=16, max_age=60)
+    try:
+        HostCacheBuilder(host_cache, engine, interval=60, lock_path=str(tmp_path / "lock")).tick()
+        
+        assert client.post("/settings/close-profile", headers=closer_headers).status_code == 200
+        assert host_cache.is_active(closer_id) is True
+        response = client.post(f"/feed/{closer_id}/like", headers=liker_headers)
+        
+        assert response.status_code == 404
+    finally:
+        host_cache.unlink()
@@ -0,0 +1,83 @@
+"""Tests for cross-worker cache invalidation."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.auth import _token_digest, session_cache
+from app.cache.bus import InvalidationListener
+from app.db.session import engine
+from app.main import app
+from app.models.cache_invalidation import CacheInvalidation
+from app.services.profiles import get_profile, profile_cache
+
+
+client = TestClient(app)
+
+
+def _listener(bus_engine=engine, **options) -> InvalidationListener:
+    listener = InvalidationListener(bus_engine, **{"interval": 0.1, "max_lag": 5.0, "retention": 600.0, **options})
+    with Session(bus_engine) as db:
+        listener.last_id = max((row.id for row in db.query(CacheInvalidation)), default=0)
+    return listener
+
+
+def test_other_workers_changes_evict_local_entries(register, db_session: Session):
+    """An invalidation published by another worker drops the cached profile and session."""
+    user_id, headers = register("bus@example.com", "bususer")
+    token = headers["Authorization"].removeprefix("Bearer ")
+    client.get("/auth/me", headers=headers)
+    get_profile(db_session, user_id)
+    listener = _listener()
+    
+    db_session.add_all([
+        CacheInvalidation(topic="profile", key=str(user_id), origin="other-worker"),
+        CacheInvalidation(topic="session", key=_token_digest(token).hex(), origin="other-worker"),
+    ])
+    db_session.commit()
+    assert listener.poll() == 2
+    
+    assert len(profile_cache) == 0
+    assert session_cache.get(_token_digest(token)) is None
+
+
+def test_own_writes_are_published_but_not_reapplied(register, db_session: Session):
+    """A profile update publishes in its own transaction and keeps this worker's write-through copy."""
+    user_id, headers = register("own@example.com", "ownuser")
+    listener = _listener()
+    
+    client.put("/profile/me", json={"bio": "Updated"}, headers=headers)
+    
+    rows = db_session.query(CacheInvalidation).filter(CacheInvalidation.id > listener.last_id).all()
+    assert [(row.topic, row.key) for row in rows] == [("profile", str(user_id))]
+    listener.poll()
+    assert profile_cache.get(user_id).bio == "Updated"
+
+
+def test_late_commits_are_not_missed(db_session: Session):
+    """An id that becomes visible after a higher one is still delivered."""
+    listener = _listener()
+    first = listener.last_id + 1
+    
+    db_session.add(CacheInvalidation(id=first + 1, topic="profile", key="999001", origin="other-worker"))
+    db_session.commit()
+    assert listener.poll() == 1
+    
+    # The transaction holding the lower id commits after the poll above
+    db_session.add(CacheInvalidation(id=first, topic="profile", key="999002", origin="other-worker"))
+    db_session.commit()
+    assert listener.poll() == 1
+    assert listener.last_id == first + 1
+
+
+def test_unreadable_log_clears_caches(register, db_session: Session):
+    """Past the lag bound without a successful poll, every cache is emptied."""
+    user_id, _ = register("lag@example.com", "laguser")
+    get_profile(db_session, user_id)
+    assert len(profile_cache) == 1
+    
+    broken = create_engine("sqlite:///file:missing.db?mode=ro&uri=true")
+    listener = InvalidationListener(broken, interval=0.1, max_lag=0.0, retention=600.0)
+    listener.tick()
+    
+    assert len(profile_cache) == 0
@@ -10,6 +10,13 @@ from app.models.profile import Profile, GenderEnum
 from app.models.like import Like
 from app.models.session import Session as SessionModel
 from app.auth import create_access_token, get_password_hash
+from app.cache import SizedLRUCache
+from app.services.cards import FEED_CARD, card_cache
+from app.db.session import engine
+from app.schemas.like import FeedResponse, MatchesResponse
+from app.services.feed import feed_json, matches_json
+from app.services.feed_snapshot import FeedSnapshotBuilder, feed_snapshot
+from app.services.profiles import get_profile, get_profiles, profile_cache
 
 client = TestClient(app)
 
@@ -129,6 +136,18 @@ class TestFeed:
         assert data["has_next"] is False
         assert data["has_prev"] is True
     
+    def test_feed_payload_matches_schema(self, test_users, auth_headers, db_session):
+        """The spliced feed body is exactly what the response schema would render."""
+        users, _ = test_users
+        
+        response = client.get("/feed?page=1&size=2", headers=auth_headers["user1"])
+        assert response.status_code == 200
+        
+        assert feed_json(current_user=users[0], db=db_session, page=1, size=2) == response.content
+        expected = FeedResponse.model_validate_json(response.content)
+        assert response.json() == expected.model_dump(mode="json")
+        assert len(expected.profiles) == 2
+    
     def test_feed_excludes_inactive_profiles(self, test_users, auth_headers, db_session):
         """Test that feed excludes inactive profiles."""
         users, profiles = test_users
@@ -289,6 +308,27 @@ class TestMatches:
         assert data["matches"] == []
         assert data["total"] == 0
     
+    def test_matches_payload_matches_schema(self, test_users, auth_headers, db_session, assert_max_queries):
+        """The spliced matches body is what the response schema would render, in one query however many matches."""
+        users, _ = test_users
+        headers1 = auth_headers["user1"]
+        for index in (1, 2, 3):
+            client.post(f"/likes/{users[index].id}", headers=headers1)
+            client.post(f"/likes/{users[0].id}", headers=auth_headers[f"user{index + 1}"])
+        
+        # The likes, then every matched profile missing from the cache in one batch
+        profile_cache.clear()
+        with assert_max_queries(2):
+            response = client.get("/feed/matches", headers=headers1)
+        assert response.status_code == 200
+        with assert_max_queries(1):
+            assert client.get("/feed/matches", headers=headers1).content == response.content
+        
+        assert matches_json(current_user=users[0], db=db_session) == response.content
+        expected = MatchesResponse.model_validate_json(response.content)
+        assert response.json() == expected.model_dump(mode="json")
+        assert response.json()["total"] == 3
+    
     def test_one_way_like_not_match(self, test_users, auth_headers):
         """Test that one-way likes are not returned as matches."""
         users, profiles = test_users
@@ -358,6 +398,137 @@ class TestProfileClosure:
         assert "not found or inactive" in response.json()["detail"].lower()
 
 
+class TestProfileCards:
+    """Test the pre-encoded profile card cache behind feed and matches."""
+    
+    def test_feed_reuses_cached_cards(self, test_users, auth_headers):
+        """A repeated feed page is assembled from cached cards."""
+        headers = auth_headers["user1"]
+        
+        first = client.get("/feed", headers=headers)
+        hits = card_cache.hits
+        second = client.get("/feed", headers=headers)
+        
+        assert second.content == first.content
+        assert card_cache.hits - hits == 3
+    
+    def test_profile_update_refreshes_card(self, test_users, auth_headers):
+        """Editing or closing a profile drops its cached cards."""
+        users, profiles = test_users
+        client.get("/feed", headers=auth_headers["user1"])
+        assert card_cache.get((FEED_CARD, profiles[1].id)) is not None
+        
+        response = client.put("/profile/me", json={"display_name": "Renamed"}, headers=auth_headers["user2"])
+        assert response.status_code == 200
+        assert card_cache.get((FEED_CARD, profiles[1].id)) is None
+        
+        feed = client.get("/feed", headers=auth_headers["user1"]).json()
+        names = {profile["user_id"]: profile["display_name"] for profile in feed["profiles"]}
+        assert names[users[1].id] == "Renamed"
+        
+        client.post("/settings/close-profile", headers=auth_headers["user2"])
+        assert card_cache.get((FEED_CARD, profiles[1].id)) is None
+    
+    def test_cache_stays_within_byte_budget(self):
+        """The least recently used cards are evicted once the byte budget is spent."""
+        cache = SizedLRUCache(max_bytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"5678")
+        cache.get("a")
+        cache.set("c", b"90ab")
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1234"
+        assert cache.total_bytes == 8
+        
+        cache.set("huge", b"x" * 11)
+        assert cache.get("huge") is None
+
+
+class TestProfileCache:
+    """Test the read-through profile cache shared by likes, matches and profile pages."""
+    
+    def test_get_profiles_reads_through(self, test_users, db_session, assert_max_queries):
+        """Misses are loaded in one query; later lookups never reach the database."""
+        users, _ = test_users
+        user_ids = [user.id for user in users]
+        profile_cache.clear()
+        
+        with assert_max_queries(1):
+            profiles = get_profiles(db_session, user_ids + [user_ids[0]])
+        assert sorted(profiles) == sorted(user_ids)
+        
+        hits = profile_cache.hits
+        with assert_max_queries(0):
+            assert get_profiles(db_session, user_ids).keys() == profiles.keys()
+            assert get_profile(db_session, user_ids[1]).display_name == "User Two"
+        assert profile_cache.hits - hits == len(user_ids) + 1
+    
+    def test_profile_update_writes_through(self, test_users, auth_headers, db_session, assert_max_queries):
+        """Profile edits and closures replace the cached copy instead of waiting for the TTL."""
+        users, _ = test_users
+        get_profile(db_session, users[1].id)
+        
+        client.put("/profile/me", json={"display_name": "Renamed"}, headers=auth_headers["user2"])
+        client.post("/settings/close-profile", headers=auth_headers["user2"])
+        
+        with assert_max_queries(0):
+            cached = get_profile(db_session, users[1].id)
+        assert cached.display_name == "Renamed"
+        assert cached.is_active is False
+        
+        response = client.post(f"/likes/{users[1].id}", headers=auth_headers["user1"])
+        assert response.status_code == 404
+
+
+class TestFeedSnapshot:
+    """Test feed pages picked from the memory-mapped snapshot."""
+    
+    @pytest.fixture
+    def snapshot(self, tmp_path, db_session):
+        path = str(tmp_path / "feed_snapshot.bin")
+        builder = FeedSnapshotBuilder(engine, path, interval=60, full_interval=3600)
+        yield builder
+        feed_snapshot.close()
+        builder.stop()
+    
+    def test_snapshot_pages_match_sql(self, test_users, auth_headers, snapshot):
+        """Pages, totals and exclusions are the same with and without the snapshot."""
+        users, _ = test_users
+        headers = auth_headers["user1"]
+        client.post(f"/likes/{users[2].id}", headers=headers)
+        snapshot.tick()
+        
+        feed_snapshot.open(snapshot.path, max_age=60)
+        assert feed_snapshot.available()
+        from_snapshot = [client.get(f"/feed?page={page}&size=1", headers=headers).json() for page in (1, 2, 3)]
+        feed_snapshot.close()
+        from_sql = [client.get(f"/feed?page={page}&size=1", headers=headers).json() for page in (1, 2, 3)]
+        
+        assert from_snapshot == from_sql
+        assert from_snapshot[0]["total"] == 2
+    
+    def test_refresh_applies_profile_changes(self, test_users, auth_headers, db_session, snapshot):
+        """An incremental refresh drops closed profiles and adds new ones."""
+        users, _ = test_users
+        snapshot.tick()
+        client.post("/settings/close-profile", headers=auth_headers["user2"])
+        newcomer = User(email="new@test.com", username="newcomer", hashed_password="x")
+        db_session.add(newcomer)
+        db_session.flush()
+        db_session.add(Profile(user_id=newcomer.id, display_name="New", gender=GenderEnum.OTHER))
+        db_session.commit()
+        
+        assert snapshot.tick() is True
+        feed_snapshot.open(snapshot.path, max_age=60)
+        response = client.get("/feed", headers=auth_headers["user1"])
+        
+        user_ids = [profile["user_id"] for profile in response.json()["profiles"]]
+        assert users[1].id not in user_ids
+        assert newcomer.id in user_ids
+        assert response.json()["total"] == 3
+
+
 class TestIntegration:
     """Integration tests for the complete workflow."""
     
@@ -0,0 +1,62 @@
+"""Tests for the HTTP load-testing harness."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from loadtest.harness import find_saturation, in_process_client, run_step
+from loadtest.scenario import Mix, UserPool
+
+
+client = TestClient(app)
+
+
+def _step(concurrency, rps, error_rate=0.0, p95_ms=10.0):
+    return {"concurrency": concurrency, "rps": rps, "error_rate": error_rate, "latency": {"p95_ms": p95_ms}}
+
+
+def test_find_saturation_stops_when_throughput_flattens():
+    """The knee is the last level that still added meaningful throughput."""
+    steps = [_step(1, 100), _step(2, 190), _step(4, 300), _step(8, 310), _step(16, 320)]
+    
+    saturation = find_saturation(steps)
+    
+    assert saturation["concurrency"] == 4
+    assert saturation["rps"] == 300
+    assert "flat" in saturation["reason"]
+
+
+def test_find_saturation_respects_errors_and_slo():
+    """Errors or a blown latency SLO end the ramp before throughput does."""
+    steps = [_step(1, 100), _step(2, 200, p95_ms=80.0), _step(4, 400, error_rate=0.05)]
+    
+    assert find_saturation(steps)["concurrency"] == 2
+    assert find_saturation(steps, slo_ms=50.0)["concurrency"] == 1
+    assert find_saturation([_step(1, 100, error_rate=0.5)]) is None
+
+
+def test_in_process_step_replays_sessions(db_session):
+    """Virtual users log in, page the feed, swipe and poll matches without errors."""
+    credentials = []
+    for index in range(4):
+        email = f"load{index}@example.com"
+        response = client.post(
+            "/auth/register",
+            json={"email": email, "username": f"load{index}", "password": "password123"},
+        )
+        assert response.status_code == 201
+        credentials.append((email, "password123"))
+    
+    async def scenario():
+        async with in_process_client(app, lifespan=False) as http:
+            return await run_step(
+                http, UserPool(credentials), Mix(actions_per_session=6), concurrency=2, duration=1.0
+            )
+    
+    step = asyncio.run(scenario())
+    
+    assert step["concurrency"] == 2
+    assert step["requests"] > 0
+    assert step["error_rate"] == 0.0
+    assert {"POST /auth/login", "GET /feed"} <= set(step["routes"])
@@ -0,0 +1,94 @@
+"""Memory diagnostics and leak checks."""
+
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.observability.memory import measure_growth, session_stats, stop_tracing
+
+
+client = TestClient(app)
+
+# Requests served per measured leak run, and the growth tolerated per request.
+# Bounded caches and warm-up allocations settle well below this; a leak of
+# one ORM object per request does not.
+LEAK_ITERATIONS = 300
+LEAK_BYTES_PER_REQUEST = 512
+
+
+@pytest.fixture
+def stop_tracemalloc():
+    """Leave tracemalloc off after the test, even if it failed half-way."""
+    yield
+    if tracemalloc.is_tracing():
+        stop_tracing()
+
+
+def test_memory_report(admin_headers, db_session: Session):
+    """The report covers process, gc, sessions and object types."""
+    response = client.get("/admin/memory", params={"types": 5}, headers=admin_headers)
+    assert response.status_code == 200
+    report = response.json()
+    
+    assert report["process"]["pid"] > 0
+    assert len(report["gc"]["counts"]) == 3
+    assert len(report["largest_types"]) == 5
+    assert "identity_map_objects" in report["sessions"]
+
+
+def test_snapshot_requires_tracing(admin_headers):
+    """Snapshots are refused until tracemalloc is started."""
+    response = client.post("/admin/memory/snapshots/before", headers=admin_headers)
+    assert response.status_code == 409
+
+
+def test_snapshot_diff(admin_headers, stop_tracemalloc):
+    """Two snapshots can be diffed by name over the API."""
+    assert client.post("/admin/memory/tracemalloc/start", headers=admin_headers).json()["tracing"]
+    
+    assert client.post("/admin/memory/snapshots/before", headers=admin_headers).status_code == 200
+    retained = [bytearray(1024) for _ in range(256)]
+    assert client.post("/admin/memory/snapshots/after", headers=admin_headers).status_code == 200
+    
+    diff = client.get(
+        "/admin/memory/diff", params={"before": "before", "after": "after"}, headers=admin_headers
+    ).json()
+    assert diff["size_diff_bytes"] >= 256 * 1024
+    assert any(entry["file"] == __file__ for entry in diff["top"])
+    del retained
+    
+    missing = client.get("/admin/memory/diff", params={"before": "before", "after": "nope"}, headers=admin_headers)
+    assert missing.status_code == 404
+    
+    assert not client.post("/admin/memory/tracemalloc/stop", headers=admin_headers).json()["tracing"]
+
+
+def test_session_tracking(register, db_session: Session):
+    """Sessions that loaded rows show up with their identity-map contents."""
+    from app.models.user import User
+    
+    register("tracked@example.com", "trackeduser")
+    users = db_session.query(User).all()
+    
+    stats = session_stats()
+    assert stats["live_sessions"] >= 1
+    assert stats["identity_map_by_class"].get("User", 0) >= len(users)
+
+
+def test_feed_requests_do_not_leak(register, db_session: Session):
+    """Serving the feed repeatedly leaves no per-request allocations behind."""
+    _, headers = register("leak@example.com", "leakuser")
+    for i in range(5):
+        _, other = register(f"leak{i}@example.com", f"leakuser{i}")
+        client.put("/profile/me", json={"bio": f"bio {i}"}, headers=other)
+    
+    def fetch_feed() -> None:
+        assert client.get("/feed", headers=headers).status_code == 200
+    
+    report = measure_growth(fetch_feed, iterations=LEAK_ITERATIONS, warmup=100)
+    
+    assert not tracemalloc.is_tracing()
+    assert report["bytes_per_iteration"] < LEAK_BYTES_PER_REQUEST, report["top"][:5]
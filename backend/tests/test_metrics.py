@@ -0,0 +1,79 @@
+"""Tests for the metrics registry and the /metrics endpoint."""
+
+import json
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.observability.metrics import MetricsRegistry, merge_snapshots, render, write_snapshot
+
+
+client = TestClient(app)
+
+
+def test_render_text_exposition():
+    """Counters, gauges and histograms render in Prometheus text format."""
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests", "Demo requests", ("route",))
+    latency = registry.histogram("demo_latency_seconds", "Demo latency", buckets=(0.1, 1.0))
+    registry.gauge("demo_in_flight", "Demo in flight").set(3)
+    
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    
+    text = render(registry.collect())
+    
+    assert "# TYPE demo_requests counter" in text
+    assert 'demo_requests_total{route="/a"} 3.0' in text
+    assert "demo_in_flight 3.0" in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'demo_latency_seconds_bucket{le="1.0"} 2.0' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 2.0' in text
+    assert "demo_latency_seconds_count 2.0" in text
+
+
+def test_merge_snapshots_across_workers(tmp_path):
+    """Counters from every worker are summed; gauges of exited workers are dropped."""
+    registry = MetricsRegistry()
+    registry.counter("jobs", "Jobs").inc(2)
+    registry.gauge("busy", "Busy").set(1)
+    write_snapshot(tmp_path, registry.collect())
+    
+    # A worker that has since exited
+    dead_pid = 2 ** 22 + 1
+    (tmp_path / f"metrics_{dead_pid}.json").write_text(json.dumps({
+        "pid": dead_pid,
+        "families": [
+            {"name": "jobs", "type": "counter", "help": "Jobs", "mode": "sum",
+             "samples": [["jobs_total", {}, 5.0]]},
+            {"name": "busy", "type": "gauge", "help": "Busy", "mode": "sum",
+             "samples": [["busy", {}, 7.0]]},
+        ],
+    }))
+    
+    text = render(merge_snapshots(tmp_path))
+    
+    assert "jobs_total 7.0" in text
+    assert "busy 1.0" in text
+    assert os.path.exists(tmp_path / f"metrics_{os.getpid()}.json")
+
+
+def test_metrics_endpoint_reports_route_latency(db_session: Session):
+    """The /metrics endpoint exposes per-route latency and bcrypt timings."""
+    client.post(
+        "/auth/register",
+        json={"email": "metrics@example.com", "username": "metricsuser", "password": "password123"},
+    )
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="POST",route="/auth/register",status="201"}' in response.text
+    assert 'bcrypt_duration_seconds_count{operation="hash"}' in response.text
+    assert "http_requests_in_flight" in response.text
+    assert "db_pool_checked_out" in response.text
@@ -1,9 +1,13 @@
 """Tests for profile endpoints."""
 
+import threading
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.api import etags
+from app.api import profile as profile_api
 from app.main import app
 from app.models.user import User
 from app.models.profile import Profile
@@ -416,3 +420,91 @@ def test_profile_field_length_validation(db_session: Session):
     )
     assert response.status_code == 200
     assert response.json()["user_id"] == user_id
+
+
+def test_public_profile_conditional_get(register, db_session: Session, assert_max_queries):
+    """A matching If-None-Match is answered with 304 from memory, until the profile changes."""
+    user_id, headers = register("etag@example.com", "etaguser")
+    
+    response = client.get(f"/profile/profiles/{user_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "public, no-cache"
+    
+    with assert_max_queries(0):
+        response = client.get(f"/profile/profiles/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    
+    client.put("/profile/me", json={"bio": "Changed"}, headers=headers)
+    response = client.get(f"/profile/profiles/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["bio"] == "Changed"
+    
+    # A closed profile is gone, whatever the client has cached
+    client.post("/settings/close-profile", headers=headers)
+    response = client.get(f"/profile/profiles/{user_id}", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_profile_me_conditional_get(register, db_session: Session):
+    """GET /profile/me carries a private ETag and honours If-None-Match."""
+    _, headers = register("etagme@example.com", "etagme")
+    
+    response = client.get("/profile/me", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    
+    response = client.get("/profile/me", headers={**headers, "If-None-Match": f'W/{response.headers["etag"]}'})
+    assert response.status_code == 304
+
+
+def test_update_profile_if_match(register, db_session: Session):
+    """PUT /profile/me with a stale If-Match fails with 412 and changes nothing."""
+    user_id, headers = register("ifmatch@example.com", "ifmatch")
+    etag = client.get("/profile/me", headers=headers).headers["etag"]
+    
+    response = client.put("/profile/me", json={"bio": "First"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["etag"]
+    assert new_etag != etag
+    
+    response = client.put("/profile/me", json={"bio": "Lost update"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+    
+    # Weak tags never satisfy If-Match
+    response = client.put("/profile/me", json={"bio": "Weak"}, headers={**headers, "If-Match": f"W/{new_etag}"})
+    assert response.status_code == 412
+    
+    assert client.get(f"/profile/profiles/{user_id}").json()["bio"] == "First"
+
+
+def test_concurrent_updates_with_one_etag(register, db_session: Session, monkeypatch):
+    """Two writers that both passed the If-Match check: one update lands, the other gets 412."""
+    user_id, headers = register("racer@example.com", "racer")
+    etag = client.get("/profile/me", headers=headers).headers["etag"]
+    # Hold both requests until each has checked the ETag, then let them race to write
+    both_checked = threading.Barrier(2, timeout=5)
+    
+    def checked_together(if_match, current):
+        met = etags.precondition_met(if_match, current)
+        both_checked.wait()
+        return met
+    
+    monkeypatch.setattr(profile_api, "precondition_met", checked_together)
+    statuses = []
+    
+    def update(bio: str) -> None:
+        response = TestClient(app).put("/profile/me", json={"bio": bio}, headers={**headers, "If-Match": etag})
+        statuses.append(response.status_code)
+    
+    writers = [threading.Thread(target=update, args=(bio,)) for bio in ("Left", "Right")]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(timeout=10)
+    
+    assert sorted(statuses) == [200, 412]
+    assert client.get(f"/profile/profiles/{user_id}").json()["bio"] in ("Left", "Right")
@@ -0,0 +1,218 @@
+"""Tests for swipe rate limiting and the login throttle."""
+
+import secrets
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import auth as auth_api
+from app.auth import create_access_token, get_password_hash
+from app.main import app
+from app.models.profile import Profile
+from app.models.user import User
+from app.observability.instruments import bcrypt_duration
+from app.ratelimit import LoginThrottle, RateLimiter, rate_limit_checks, swipe_limiter
+
+
+client = TestClient(app)
+
+
+def _checks(result: str) -> float:
+    samples = rate_limit_checks.collect().samples
+    return sum(value for _, labels, value in samples if labels == {"limiter": "swipe", "result": result})
+
+
+@pytest.fixture
+def small_quota():
+    """Three swipes back to back, then one per second."""
+    swipe_limiter.configure(per_minute=60, burst=3)
+    yield
+    swipe_limiter.configure(per_minute=60, burst=30)
+    swipe_limiter.clear()
+
+
+def test_swipes_past_the_quota_get_429(db_session: Session, small_quota):
+    """Every swipe reports the remaining quota; the one past it is refused with Retry-After."""
+    users = []
+    for name in ("swiper", "target"):
+        user = User(email=f"{name}@example.com", username=name, hashed_password="x")
+        db_session.add(user)
+        db_session.flush()
+        db_session.add(Profile(user_id=user.id, display_name=name, is_active=True))
+        users.append(user)
+    db_session.commit()
+    swiper, target = users
+    headers = {"Authorization": f"Bearer {create_access_token(user_id=swiper.id, db=db_session)}"}
+    
+    remaining = []
+    for path in (f"/feed/{target.id}/skip", f"/feed/{target.id}/like", f"/likes/{target.id}"):
+        response = client.post(path, headers=headers)
+        assert response.status_code == 200
+        remaining.append(response.headers["X-RateLimit-Remaining"])
+    refused = client.post(f"/feed/{target.id}/skip", headers=headers)
+    
+    assert remaining == ["2", "1", "0"]
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"] == "1"
+    assert refused.headers["X-RateLimit-Limit"] == "3"
+    assert refused.headers["X-RateLimit-Remaining"] == "0"
+    assert refused.headers["X-RateLimit-Reset"] == "3"
+
+
+def test_rejected_swipes_are_refunded(db_session: Session, small_quota):
+    """Swipes answered 404 or 400 use no quota and carry no quota headers."""
+    swiper = User(email="refund@example.com", username="refund", hashed_password="x")
+    db_session.add(swiper)
+    db_session.flush()
+    db_session.add(Profile(user_id=swiper.id, display_name="refund", is_active=True))
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id=swiper.id, db=db_session)}"}
+    
+    rejected = [
+        client.post("/feed/999999/like", headers=headers),
+        client.post(f"/feed/{swiper.id}/skip", headers=headers),
+        client.post("/likes/999999", headers=headers),
+        client.post("/feed/999999/skip", headers=headers),
+    ]
+    
+    assert [response.status_code for response in rejected] == [404, 400, 404, 404]
+    assert all("X-RateLimit-Remaining" not in response.headers for response in rejected)
+    assert swipe_limiter.peek(swiper.id).remaining == 2, "the whole burst of 3 is still available"
+
+
+def test_quota_refills_at_the_sustained_rate():
+    """After a burst, one swipe is allowed per emission interval."""
+    limiter = RateLimiter("swipe", per_minute=60, burst=2, slots=16)
+    
+    assert [limiter.check(7, now=100.0).allowed for _ in range(3)] == [True, True, False]
+    assert limiter.check(7, now=100.5).retry_after == pytest.approx(0.5)
+    assert limiter.check(7, now=101.0).allowed
+    assert not limiter.check(7, now=101.0).allowed
+    assert limiter.check(8, now=101.0).remaining == 1, "users have separate budgets"
+
+
+def test_idle_users_give_up_their_slots():
+    """Once a user's bucket is full again, their slot goes to the next user needing one."""
+    limiter = RateLimiter("swipe", per_minute=60, burst=5, slots=2)
+    untracked = _checks("untracked")
+    
+    limiter.check(1, now=100.0)
+    limiter.check(2, now=100.0)
+    assert limiter.tracked(now=100.0) == 2
+    # Table full of active users: the swipe is let through untracked
+    assert limiter.check(3, now=100.0).allowed
+    assert _checks("untracked") - untracked == 1
+    
+    for _ in range(5):
+        assert limiter.check(3, now=102.0).allowed
+    assert limiter.check(3, now=102.0).allowed is False
+    assert limiter.tracked(now=102.0) == 1
+
+
+def test_workers_share_one_budget(tmp_path):
+    """Limiters attached to the same segment draw from the same per-user quota."""
+    name = f"anecdote-test-{secrets.token_hex(4)}"
+    first = RateLimiter("swipe", per_minute=60, burst=2, slots=16)
+    second = RateLimiter("swipe", per_minute=60, burst=2, slots=16)
+    first.attach(name, str(tmp_path / "swipe.lock"))
+    second.attach(name, str(tmp_path / "swipe.lock"))
+    try:
+        assert first.shared and second.shared
+        assert first.check(5, now=100.0).remaining == 1
+        assert second.check(5, now=100.0).remaining == 0
+        assert not first.check(5, now=100.0).allowed
+    finally:
+        second.detach()
+        first.unlink()
+
+
+@pytest.fixture
+def strict_logins(monkeypatch):
+    """Two failures per email and four per address, refilled over a minute."""
+    throttle = LoginThrottle(email_failures=2, address_failures=4, window=60, slots=64)
+    monkeypatch.setattr(auth_api, "login_throttle", throttle)
+    return throttle
+
+
+def test_failed_logins_are_refused_before_bcrypt(db_session: Session, strict_logins):
+    """Past the email's failure budget from this address, even the right password gets 429 without a bcrypt verify."""
+    db_session.add(User(email="victim@example.com", username="victim", hashed_password=get_password_hash("secret123")))
+    db_session.commit()
+    attempt = {"email": "victim@example.com", "password": "guess"}
+    
+    statuses = [client.post("/auth/login", json=attempt).status_code for _ in range(2)]
+    verifies = bcrypt_duration.count(operation="verify")
+    refused = client.post("/auth/login", json={**attempt, "password": "secret123"})
+    
+    assert statuses == [401, 401]
+    assert refused.status_code == 429
+    assert int(refused.headers["Retry-After"]) == 30
+    assert bcrypt_duration.count(operation="verify") == verifies
+    # Other accounts stay reachable from the same address
+    assert client.post("/auth/login", json={**attempt, "email": "other@example.com"}).status_code == 401
+
+
+def test_throttled_attacker_cannot_lock_the_owner_out(db_session: Session, strict_logins):
+    """While an attacker's address is refused for an email, its owner still logs in from elsewhere."""
+    db_session.add(User(email="victim@example.com", username="victim", hashed_password=get_password_hash("secret123")))
+    db_session.commit()
+    attacker = TestClient(app, client=("198.51.100.66", 50000))
+    owner = TestClient(app, client=("192.0.2.10", 50000))
+    
+    for _ in range(2):
+        attacker.post("/auth/login", json={"email": "VICTIM@example.com", "password": "guess"})
+    refused = attacker.post("/auth/login", json={"email": "victim@example.com", "password": "guess"})
+    response = owner.post("/auth/login", json={"email": "victim@example.com", "password": "secret123"})
+    
+    assert refused.status_code == 429
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "victim@example.com"
+    assert attacker.post("/auth/login", json={"email": "victim@example.com", "password": "guess"}).status_code == 429
+
+
+def test_address_budget_spans_emails():
+    """Failures across many emails exhaust the address; email budgets and successes are per address."""
+    throttle = LoginThrottle(email_failures=2, address_failures=3, window=60, slots=64)
+    
+    for index in range(3):
+        assert throttle.reserve(f"user{index}@example.com", "10.0.0.1", now=100.0) is None
+    assert throttle.reserve("USER9@example.com", "10.0.0.2", now=100.0) is None
+    assert throttle.reserve("user9@example.com", "10.0.0.2", now=100.0) is None
+    
+    assert throttle.reserve("fresh@example.com", "10.0.0.1", now=100.0) == pytest.approx(20.0)
+    assert throttle.reserve("user9@example.com", "10.0.0.2", now=100.0) == pytest.approx(30.0)
+    assert throttle.reserve("user9@example.com", "10.0.0.3", now=100.0) is None
+    # A refused attempt reserved nothing: the address still has one failure left
+    assert throttle.reserve("fresh@example.com", "10.0.0.2", now=100.0) is None
+    assert throttle.reserve("other@example.com", "10.0.0.2", now=100.0) is not None
+    throttle.succeeded("user9@example.com", "10.0.0.3", now=100.0)
+    assert throttle.reserve("user9@example.com", "10.0.0.3", now=100.0) is None
+
+
+def test_parallel_guesses_cannot_overrun_the_budget(db_session: Session, strict_logins, monkeypatch):
+    """Guesses in flight at the same time each reserve a failure before the password check."""
+    checked = []
+    
+    def slow_wrong_password(db, email, password):
+        checked.append(email)
+        time.sleep(0.2)
+        return None
+    
+    monkeypatch.setattr(auth_api, "authenticate_user", slow_wrong_password)
+    statuses = []
+    
+    def guess() -> None:
+        response = client.post("/auth/login", json={"email": "victim@example.com", "password": "guess"})
+        statuses.append(response.status_code)
+    
+    guesses = [threading.Thread(target=guess) for _ in range(6)]
+    for thread in guesses:
+        thread.start()
+    for thread in guesses:
+        thread.join(timeout=10)
+    
+    assert len(checked) == 2
+    assert sorted(statuses) == [401, 401, 429, 429, 429, 429]
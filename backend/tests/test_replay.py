@@ -0,0 +1,81 @@
+"""Tests for traffic capture and replay."""
+
+import gzip
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from app.db.session import engine
+from app.main import app
+from app.observability.capture import TrafficCapture, pseudonym
+from app.observability.context import on_request_finished
+from replay.diff import diff_distributions, ks_statistic
+from replay.snapshot import restore_snapshot, take_snapshot
+from replay.trace import read_trace, resolve, user_map
+
+
+client = TestClient(app)
+SECRET = "capture-test-secret"
+
+
+def test_capture_records_sanitized_requests(register, db_session, tmp_path):
+    """Captured records carry pseudonyms and allow-listed params only, and resolve back to ids."""
+    capture = TrafficCapture(tmp_path, SECRET)
+    on_request_finished(capture.record)
+    capture.start()
+    try:
+        viewer_id, headers = register("capture_viewer@example.com", "capture_viewer")
+        target_id, _ = register("capture_target@example.com", "capture_target")
+        client.get("/feed", params={"page": 1, "size": 5, "q": "private"}, headers=headers)
+        client.post(f"/feed/{target_id}/skip", headers=headers)
+    finally:
+        capture.stop()
+    
+    raw = b"".join(gzip.open(path).read() for path in tmp_path.glob("traffic-*.jsonl.gz"))
+    assert b"capture_viewer" not in raw
+    assert b"private" not in raw
+    
+    records = read_trace([tmp_path])
+    feed = next(record for record in records if record["route"] == "/feed")
+    assert feed["query"] == {"page": "1", "size": "5"}
+    assert feed["user"] == pseudonym(viewer_id, SECRET)
+    assert feed["status"] == 200
+    assert feed["ms"] > 0
+    
+    users = user_map(engine, SECRET)
+    skip = resolve(next(record for record in records if record["route"] == "/feed/{target_id}/skip"), users)
+    assert skip["url"] == f"/feed/{target_id}/skip"
+    assert skip["user_id"] == viewer_id
+    
+    login = next(record for record in records if record["route"] == "/auth/register")
+    assert resolve(login, users) is None
+
+
+def test_snapshot_round_trip(tmp_path):
+    """A SQLite snapshot restores to an identical copy."""
+    source = tmp_path / "live.db"
+    with sqlite3.connect(source) as connection:
+        connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        connection.executemany("INSERT INTO items VALUES (?)", [(index,) for index in range(10)])
+    
+    snapshot = take_snapshot(f"sqlite:///{source}", tmp_path / "snap.db")
+    restore_snapshot(snapshot, f"sqlite:///{tmp_path / 'restored.db'}")
+    
+    with sqlite3.connect(tmp_path / "restored.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 10
+
+
+def test_diff_flags_shifted_distributions():
+    """Equal samples do not differ; a uniformly slower build does, significantly."""
+    before = [float(value) for value in range(1, 101)]
+    slower = [value * 2 for value in before]
+    
+    assert ks_statistic(before, before) == 0.0
+    
+    same = diff_distributions({"GET /feed": before}, {"GET /feed": before})[0]
+    assert same["p50_change"] == 0.0
+    assert not same["significant"]
+    
+    shifted = diff_distributions({"GET /feed": before}, {"GET /feed": slower})[0]
+    assert shifted["p95_change"] == 1.0
+    assert shifted["significant"]
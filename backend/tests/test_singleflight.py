@@ -0,0 +1,110 @@
+"""Tests for single-flight request coalescing."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from app.cache.singleflight import SingleFlight, coalesced_calls
+from app.services import feed
+
+
+def _coalesced(group: str) -> float:
+    return sum(value for _, labels, value in coalesced_calls.collect().samples if labels.get("group") == group)
+
+
+def _run_concurrently(flight: SingleFlight, fn, followers: int = 3) -> list:
+    """Start a leader blocked inside ``fn``, join ``followers`` to it, then let it finish."""
+    release = threading.Event()
+    results = []
+    
+    def call() -> None:
+        try:
+            results.append(flight.do("key", lambda: fn(release)))
+        except Exception as exc:
+            results.append(exc)
+    
+    before = _coalesced(flight.name)
+    threads = [threading.Thread(target=call) for _ in range(followers + 1)]
+    threads[0].start()
+    while len(flight) == 0:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while _coalesced(flight.name) - before < followers:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    """Callers arriving while a call runs receive its result; the work runs once."""
+    flight = SingleFlight("test_share")
+    calls = []
+    
+    def load(release: threading.Event) -> object:
+        calls.append(1)
+        release.wait(5)
+        return object()
+    
+    results = _run_concurrently(flight, load)
+    
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result is results[0] for result in results)
+    assert len(flight) == 0
+
+
+def test_errors_reach_every_waiter():
+    """An exception from the shared call is raised in every caller."""
+    flight = SingleFlight("test_errors")
+    
+    def fail(release: threading.Event) -> None:
+        release.wait(5)
+        raise ValueError("boom")
+    
+    results = _run_concurrently(flight, fail, followers=2)
+    
+    assert len(results) == 3
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_finished_calls_are_not_reused():
+    """Only in-flight work is shared: a later call runs again."""
+    flight = SingleFlight("test_sequential")
+    values = iter([1, 2])
+    
+    assert flight.do("key", lambda: next(values)) == 1
+    assert flight.do("key", lambda: next(values)) == 2
+
+
+def test_feed_reads_after_a_swipe_start_a_new_call(monkeypatch):
+    """A feed read issued after the user's write never joins a read that started before it."""
+    release = threading.Event()
+    calls = []
+    
+    def encode(*, current_user, db, page, size) -> bytes:
+        calls.append(feed._generation(current_user.id))
+        release.wait(5)
+        return b"{}"
+    
+    monkeypatch.setattr(feed, "_encode_feed", encode)
+    user = SimpleNamespace(id=424242)
+    before = _coalesced("feed")
+    leader = threading.Thread(target=lambda: feed.feed_json(current_user=user, db=None, page=1, size=20))
+    leader.start()
+    while not calls:
+        time.sleep(0.001)
+    
+    feed._bump_generations(user.id)
+    follower = threading.Thread(target=lambda: feed.feed_json(current_user=user, db=None, page=1, size=20))
+    follower.start()
+    while len(calls) < 2 and _coalesced("feed") == before:
+        time.sleep(0.001)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+    
+    assert calls[1] == calls[0] + 1
+    assert _coalesced("feed") == before
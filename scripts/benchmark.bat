@@ -0,0 +1,45 @@
+@echo off
+REM Run the service-layer benchmarks against a synthetic SQLite database
+REM Usage: scripts\benchmark.bat [--scale 10k|100k|1m] [--output results.json] [--baseline baseline.json]
+REM All arguments are passed to "python -m benchmarks".
+
+setlocal enabledelayedexpansion
+
+echo ⏱️  Running service benchmarks...
+
+REM Get the directory where this script is located
+set SCRIPT_DIR=%~dp0
+set PROJECT_ROOT=%SCRIPT_DIR:~0,-1%
+for %%A in ("%PROJECT_ROOT%") do set PROJECT_ROOT=%%~dpA
+set PROJECT_ROOT=%PROJECT_ROOT:~0,-1%
+
+REM Change to backend directory
+cd /d "%PROJECT_ROOT%\backend"
+
+REM Check if virtual environment exists
+if not exist ".venv" (
+    echo ❌ Virtual environment not found. Please run install.bat first.
+    pause
+    exit /b 1
+)
+
+REM Activate virtual environment
+call .venv\Scripts\activate.bat
+if errorlevel 1 (
+    echo ❌ Failed to activate virtual environment
+    pause
+    exit /b 1
+)
+
+python -m benchmarks %*
+if errorlevel 1 (
+    echo ❌ Benchmarks failed or regressed against the baseline.
+    pause
+    exit /b 1
+)
+
+echo.
+echo ✅ Benchmarks completed!
+echo.
+
+pause
@@ -0,0 +1,33 @@
+#!/bin/bash
+
+# Run the service-layer benchmarks against a synthetic SQLite database
+# Usage: ./scripts/benchmark.sh [--scale 10k|100k|1m] [--output results.json] [--baseline baseline.json]
+# All arguments are passed to `python -m benchmarks`.
+
+set -e  # Exit on any error
+
+echo "⏱️  Running service benchmarks..."
+
+# Get the directory where this script is located
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+
+# Change to backend directory
+cd "$PROJECT_ROOT/backend"
+
+# Check if virtual environment exists
+if [ ! -d ".venv" ]; then
+    echo "❌ Virtual environment not found. Please run ./scripts/install.sh first."
+    exit 1
+fi
+
+# Activate virtual environment
+echo "🐍 Activating virtual environment..."
+source .venv/bin/activate
+
+export PYTHONPATH="$PROJECT_ROOT/backend:$PYTHONPATH"
+
+python -m benchmarks "$@"
+
+echo ""
+echo "✅ Benchmarks completed!"
@@ -0,0 +1,45 @@
+@echo off
+REM Load-test the full HTTP stack with simulated swipe sessions
+REM Usage: scripts\loadtest.bat --users 10000 [--database-url URL] [--workers N] [--concurrency 1,2,4,8]
+REM All arguments are passed to "python -m loadtest".
+
+setlocal enabledelayedexpansion
+
+echo 🚦 Running load test...
+
+REM Get the directory where this script is located
+set SCRIPT_DIR=%~dp0
+set PROJECT_ROOT=%SCRIPT_DIR:~0,-1%
+for %%A in ("%PROJECT_ROOT%") do set PROJECT_ROOT=%%~dpA
+set PROJECT_ROOT=%PROJECT_ROOT:~0,-1%
+
+REM Change to backend directory
+cd /d "%PROJECT_ROOT%\backend"
+
+REM Check if virtual environment exists
+if not exist ".venv" (
+    echo ❌ Virtual environment not found. Please run install.bat first.
+    pause
+    exit /b 1
+)
+
+REM Activate virtual environment
+call .venv\Scripts\activate.bat
+if errorlevel 1 (
+    echo ❌ Failed to activate virtual environment
+    pause
+    exit /b 1
+)
+
+python -m loadtest %*
+if errorlevel 1 (
+    echo ❌ Load test failed.
+    pause
+    exit /b 1
+)
+
+echo.
+echo ✅ Load test completed!
+echo.
+
+pause
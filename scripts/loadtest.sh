@@ -0,0 +1,33 @@
+#!/bin/bash
+
+# Load-test the full HTTP stack with simulated swipe sessions
+# Usage: ./scripts/loadtest.sh --users 10000 [--database-url URL] [--workers N] [--concurrency 1,2,4,8]
+# All arguments are passed to `python -m loadtest`.
+
+set -e  # Exit on any error
+
+echo "🚦 Running load test..."
+
+# Get the directory where this script is located
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+
+# Change to backend directory
+cd "$PROJECT_ROOT/backend"
+
+# Check if virtual environment exists
+if [ ! -d ".venv" ]; then
+    echo "❌ Virtual environment not found. Please run ./scripts/install.sh first."
+    exit 1
+fi
+
+# Activate virtual environment
+echo "🐍 Activating virtual environment..."
+source .venv/bin/activate
+
+export PYTHONPATH="$PROJECT_ROOT/backend:$PYTHONPATH"
+
+python -m loadtest "$@"
+
+echo ""
+echo "✅ Load test completed!"